@@ -5,6 +5,8 @@ from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.core.exceptions import PermissionDenied
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.urls import path, reverse
@@ -19,11 +21,40 @@ from .forms.blog import BlogForm
 from .forms.product import ProductForm
 from .forms.user import UserChangeForm, UserCreationForm
 from .models import Blog, Product, Sale, SoldProduct, User, PasswordCode, StagingPhaseBanner
+from .services.bulk_deletion import delete_blogs, delete_products, delete_sales, schedule_file_cleanup
 from .utils.auth_utils import generate_auth_tokens
+from .utils.pagination import EstimatedCountPaginator
 
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# CHANGELIST PERFORMANCE
+# ============================================================================
+
+class LargeTableAdminMixin:
+    """
+    Changelists that render in a constant number of queries on large tables.
+
+    - ``list_select_related`` loads the FKs shown in ``list_display``;
+    - ``list_annotations`` (name -> expression) are added to the queryset, so
+      per-row counts come from the page query instead of one query per row;
+    - ``show_full_result_count = False`` skips the second, unfiltered
+      ``COUNT(*)`` on filtered/searched pages;
+    - ``EstimatedCountPaginator`` takes the unfiltered total from the table
+      statistics on large tables.
+    """
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    list_annotations = {}
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.list_annotations:
+            queryset = queryset.annotate(**self.list_annotations)
+        return queryset
+
+
 # ============================================================================
 # BLOG MANAGEMENT
 # ============================================================================
@@ -35,55 +66,68 @@ class BlogAdmin(AttachmentsAdminMixin, admin.ModelAdmin):
     list_filter = ('category',)
 
     def delete_queryset(self, request, queryset):
-        for obj in queryset:
-            obj.delete()
+        _, file_names = delete_blogs(queryset)
+        schedule_file_cleanup(file_names)
 
 
 # ============================================================================
 # PRODUCT MANAGEMENT
 # ============================================================================
 
-class ProductAdmin(AttachmentsAdminMixin, admin.ModelAdmin):
+class ProductAdmin(LargeTableAdminMixin, AttachmentsAdminMixin, admin.ModelAdmin):
     form = ProductForm
     list_display = ('title', 'category', 'sub_category', 'price')
     search_fields = ('title', 'category', 'sub_category')
     list_filter = ('category', 'sub_category')
 
     def delete_queryset(self, request, queryset):
-        for obj in queryset:
-            obj.delete()
+        _, file_names = delete_products(queryset)
+        schedule_file_cleanup(file_names)
 
 
 # ============================================================================
 # SALES MANAGEMENT
 # ============================================================================
 
-class SoldProductAdmin(admin.ModelAdmin):
+class SoldProductAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('product', 'quantity')
+    list_select_related = ('product',)
     search_fields = ('product__title',)
     list_filter = ('product',)
 
 
-class SaleAdmin(admin.ModelAdmin):
+class SaleAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('email', 'address', 'city', 'state', 'postal_code', 'get_total_products')
     search_fields = ('email', 'city', 'state')
     list_filter = ('state', 'city')
     filter_horizontal = ('sold_products',)
+    # Correlated subquery: evaluated for the page rows only, no GROUP BY over the table.
+    list_annotations = {
+        'total_products': Coalesce(
+            Subquery(
+                Sale.sold_products.through.objects.filter(sale_id=OuterRef('pk'))
+                .values('sale_id').annotate(count=Count('pk')).values('count'),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+    }
 
     def get_total_products(self, obj):
-        return obj.sold_products.count()
+        total = getattr(obj, 'total_products', None)
+        return obj.sold_products.count() if total is None else total
     get_total_products.short_description = 'Total Products'
+    get_total_products.admin_order_field = 'total_products'
 
     def delete_queryset(self, request, queryset):
-        for sale in queryset:
-            sale.delete()
+        delete_sales(queryset)
 
 
 # ============================================================================
 # USER MANAGEMENT
 # ============================================================================
 
-class BaseFeatureUserAdmin(UserAdmin):
+class BaseFeatureUserAdmin(LargeTableAdminMixin, UserAdmin):
     add_form = UserCreationForm
     form = UserChangeForm
     ordering = ('email',)
@@ -160,11 +204,12 @@ class BaseFeatureUserAdmin(UserAdmin):
         return HttpResponseRedirect(f'{settings.FRONTEND_URL}/admin-login?{query}')
 
 
-class PasswordCodeAdmin(admin.ModelAdmin):
-    list_display = ('user', 'code', 'created_at', 'used')
+class PasswordCodeAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('user', 'code', 'created_at', 'expires_at', 'used')
+    list_select_related = ('user',)
     search_fields = ('user__email', 'code')
     list_filter = ('used', 'created_at')
-    readonly_fields = ('created_at',)
+    readonly_fields = ('created_at', 'expires_at')
 
     def has_add_permission(self, request):
         # Don't allow manual creation from admin
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class BaseFeatureAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'base_feature_app'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .authentication import invalidate_user_on_change
+        User = self.get_model('User')
+        post_save.connect(invalidate_user_on_change, sender=User)
+        post_delete.connect(invalidate_user_on_change, sender=User)
@@ -0,0 +1,100 @@
+"""
+JWT authentication classes that avoid a ``User`` SELECT on every request.
+
+- ``CachedJWTAuthentication``: default class; keeps a per-process, short-TTL
+  cache of ``User`` rows keyed by id (``JWT_USER_CACHE_TTL`` seconds),
+  holding at most ``JWT_USER_CACHE_MAX_SIZE`` users (least recently used are
+  evicted first). Entries are dropped when the user is saved or deleted in
+  this process.
+- ``ClaimsJWTAuthentication``: for read-only endpoints such as
+  ``validate_token``; trusts the signed user claims embedded by
+  ``generate_auth_tokens`` and never touches the database. Tokens issued
+  without those claims fall back to the cached lookup.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from base_feature_app.utils.auth_utils import USER_CLAIMS
+from base_feature_project.metrics import record_cache_lookup
+
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+
+def invalidate_cached_user(user_id):
+    """Drop ``user_id`` from this process' user cache."""
+    with _user_cache_lock:
+        _user_cache.pop(str(user_id), None)
+
+
+def clear_user_cache():
+    with _user_cache_lock:
+        _user_cache.clear()
+
+
+def _evict(now, max_size):
+    """Drop expired entries from the least recently used end, then any beyond ``max_size``."""
+    while _user_cache:
+        key, (expires_at, _) = next(iter(_user_cache.items()))
+        if expires_at > now and len(_user_cache) <= max_size:
+            return
+        del _user_cache[key]
+
+
+def invalidate_user_on_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """post_save/post_delete receiver registered in ``BaseFeatureAppConfig.ready``."""
+    invalidate_cached_user(instance.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` with a per-process TTL cache for the user lookup."""
+
+    def get_user(self, validated_token):
+        ttl = settings.JWT_USER_CACHE_TTL
+        if ttl <= 0:
+            return super().get_user(validated_token)
+
+        key = str(validated_token.get(api_settings.USER_ID_CLAIM))
+        now = time.monotonic()
+        with _user_cache_lock:
+            entry = _user_cache.get(key)
+            if entry is not None:
+                _user_cache.move_to_end(key)
+        hit = entry is not None and entry[0] > now
+        record_cache_lookup('jwt_user', hit)
+        if hit:
+            # Hand out a copy so one request can't mutate another's user.
+            return copy.copy(entry[1])
+
+        user = super().get_user(validated_token)
+        with _user_cache_lock:
+            _user_cache[key] = (now + ttl, user)
+            _user_cache.move_to_end(key)
+            _evict(now, settings.JWT_USER_CACHE_MAX_SIZE)
+        return copy.copy(user)
+
+
+class ClaimsUser(TokenUser):
+    """``TokenUser`` exposing the embedded claims with the model's id type."""
+
+    @cached_property
+    def id(self):
+        user_id = self.token[api_settings.USER_ID_CLAIM]
+        return int(user_id) if str(user_id).isdigit() else user_id
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """Stateless authentication backed by the signed claims in the token."""
+
+    def get_user(self, validated_token):
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
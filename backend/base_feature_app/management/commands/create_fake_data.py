@@ -9,6 +9,7 @@ class Command(BaseCommand):
     Examples:
     python3 manage.py create_fake_data 20
     python3 manage.py create_fake_data --blogs 15 --products 25 --users 10 --sales 30
+    python3 manage.py create_fake_data --products 50000 --users 1000000 --sales 1000000 --bulk --seed 42
     """
 
     help = 'Create fake data in the database for all models'
@@ -19,6 +20,9 @@ class Command(BaseCommand):
         parser.add_argument('--products', type=int, default=10)
         parser.add_argument('--users', type=int, default=10)
         parser.add_argument('--sales', type=int, default=10)
+        parser.add_argument('--bulk', action='store_true', help='Use the bulk mode of the product/user/sale commands')
+        parser.add_argument('--workers', type=int, default=None, help='Processes per command in --bulk mode')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
 
     def handle(self, *args, **options):
         number_of_records = options['number_of_records']
@@ -33,19 +37,21 @@ class Command(BaseCommand):
             users = options['users']
             sales = options['sales']
 
+        seeding = {'bulk': options['bulk'], 'workers': options['workers'], 'seed': options['seed']}
+
         self.stdout.write(self.style.SUCCESS('==== Creating Fake Data ===='))
         
         # Create in order: Users, Blogs, Products, Sales (sales depend on products)
         self.stdout.write(self.style.SUCCESS('\n--- Creating Users ---'))
-        call_command('create_users', number_of_users=users)
+        call_command('create_users', number_of_users=users, **seeding)
         
         self.stdout.write(self.style.SUCCESS('\n--- Creating Blogs ---'))
         call_command('create_blogs', number_of_blogs=blogs)
         
         self.stdout.write(self.style.SUCCESS('\n--- Creating Products ---'))
-        call_command('create_products', number_of_products=products)
+        call_command('create_products', number_of_products=products, **seeding)
         
         self.stdout.write(self.style.SUCCESS('\n--- Creating Sales ---'))
-        call_command('create_sales', number_of_sales=sales)
+        call_command('create_sales', number_of_sales=sales, **seeding)
         
         self.stdout.write(self.style.SUCCESS('\n==== Fake Data Creation Complete ===='))
\ No newline at end of file
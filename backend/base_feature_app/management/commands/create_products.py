@@ -1,118 +1,121 @@
+import hashlib
+import mimetypes
 import os
-import io
 import random
+from io import BytesIO
+from types import SimpleNamespace
+
 from faker import Faker
 from django.core.files import File
 from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
 from base_feature_app.models import Product
-from django.core.management.base import BaseCommand
-from django_attachments.models import Attachment, Library
-from PIL import Image, ImageDraw
-
-GRADIENT_PALETTES = [
-    ((255, 107, 107), (255, 142, 83)),
-    ((108, 99, 255), (168, 130, 255)),
-    ((0, 184, 148), (85, 239, 196)),
-    ((253, 203, 110), (255, 159, 67)),
-    ((9, 132, 227), (116, 185, 255)),
-    ((232, 67, 147), (255, 118, 117)),
-    ((0, 206, 209), (72, 219, 251)),
-    ((255, 71, 87), (255, 107, 129)),
-    ((46, 213, 115), (123, 237, 159)),
-    ((255, 165, 2), (255, 200, 87)),
+from base_feature_app.utils.seeding import GRADIENT_PALETTES, bulk_create_with_pks, file_writer, render_gradient
+from django.core.management.base import BaseCommand, CommandError
+from django_attachments.models import (
+    Attachment,
+    Library,
+    content_addressed_name,
+    is_content_addressed,
+    upload_path_handler,
+)
+from PIL import Image
+
+# List of test images
+TEST_IMAGES = [
+    'media/temp/product/image_temp1.webp',
+    'media/temp/product/image_temp2.webp',
+    'media/temp/product/image_temp3.webp',
+    'media/temp/product/image_temp4.webp',
 ]
 
+CATEGORIES = [
+    'Aesthetic Candles',
+    'Decor',
+    'Gift & Party Favors'
+]
+SUB_CATEGORIES = {
+    'Aesthetic Candles': [
+        'Greek Sculptures',
+        'Love & Romance',
+        'Minimalist Modern',
+        'Cute Animals',
+        'Flowers',
+        'Holiday Glow',
+        'New Arrivals'
+    ],
+    'Decor': [
+        'Trending Now',
+        'New Arrivals'
+    ],
+    'Gift & Party Favors': [
+        "Valentine's Day",
+        'Birthdays',
+        'Wedding',
+        'Christmas',
+        "Mother's Day",
+        'Gender Reveal & Baby Showers',
+        'Trending Now'
+    ]
+}
+
+
+def _existing_test_images():
+    return [p for p in TEST_IMAGES if os.path.isfile(os.path.join(os.getcwd(), p))]
+
+
 class Command(BaseCommand):
+    """
+    python3 manage.py create_products [number_of_products]
+
+    ``--bulk`` seeds large catalogs: every image is rendered (or read) once
+    and reused, libraries/attachments/products are inserted with
+    ``bulk_create`` in ``--batch-size`` chunks with precomputed ranks and
+    dimensions, and the media files are written by ``--workers`` processes.
+    """
+
     help = 'Create Product records in the database'
 
     def add_arguments(self, parser):
         parser.add_argument('number_of_products', type=int, nargs='?', default=10)
+        parser.add_argument('--bulk', action='store_true', help='Seed with bulk inserts and parallel file writes')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Products per transaction in --bulk mode')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='File writer processes in --bulk mode (default: CPU count, 1 = in-process)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
 
     def handle(self, *args, **options):
         number_of_products = options['number_of_products']
         fake = Faker()
+        if options['seed'] is not None:
+            Faker.seed(options['seed'])
+            random.seed(options['seed'])
 
-        # List of test images
-        test_images = [
-            'media/temp/product/image_temp1.webp',
-            'media/temp/product/image_temp2.webp',
-            'media/temp/product/image_temp3.webp',
-            'media/temp/product/image_temp4.webp',
-        ]
-
-        def _generate_gradient_image(index):
-            """Generate a colorful gradient placeholder image."""
-            w, h = 800, 600
-            c1, c2 = GRADIENT_PALETTES[index % len(GRADIENT_PALETTES)]
-            img = Image.new('RGB', (w, h))
-            for y in range(h):
-                t = y / h
-                r = int(c1[0] + (c2[0] - c1[0]) * t)
-                g = int(c1[1] + (c2[1] - c1[1]) * t)
-                b = int(c1[2] + (c2[2] - c1[2]) * t)
-                row = Image.new('RGB', (w, 1), (r, g, b))
-                img.paste(row, (0, y))
-            draw = ImageDraw.Draw(img, 'RGBA')
-            for _ in range(4):
-                cx, cy = random.randint(0, w), random.randint(0, h)
-                cr = random.randint(80, 200)
-                draw.ellipse([cx - cr, cy - cr, cx + cr, cy + cr], fill=(255, 255, 255, 35))
-            buffer = io.BytesIO()
-            img.convert('RGB').save(buffer, format='WEBP', quality=85)
-            buffer.seek(0)
-            return ContentFile(buffer.read(), name=f'placeholder_{index}.webp')
+        if options['bulk']:
+            if options['batch_size'] < 1:
+                raise CommandError('--batch-size must be at least 1')
+            self._handle_bulk(fake, number_of_products, options['batch_size'], options['workers'])
+            return
 
         def _get_image_file(index):
-            existing = [p for p in test_images if os.path.isfile(os.path.join(os.getcwd(), p))]
+            existing = _existing_test_images()
             if existing:
                 selected = existing[index % len(existing)]
                 full_image_path = os.path.join(os.getcwd(), selected)
                 with open(full_image_path, 'rb') as image_file:
                     return File(image_file, name=os.path.basename(full_image_path))
 
-            return _generate_gradient_image(index)
-
-        categories = [
-            'Aesthetic Candles',
-            'Decor',
-            'Gift & Party Favors'    
-        ]
-        sub_categories = {
-            'Aesthetic Candles': [
-                'Greek Sculptures',
-                'Love & Romance',
-                'Minimalist Modern',
-                'Cute Animals',
-                'Flowers',
-                'Holiday Glow',
-                'New Arrivals'
-            ],
-            'Decor': [
-                'Trending Now',
-                'New Arrivals'
-            ],
-            'Gift & Party Favors': [
-                "Valentine's Day",
-                'Birthdays',
-                'Wedding',
-                'Christmas',
-                "Mother's Day",
-                'Gender Reveal & Baby Showers',
-                'Trending Now'
-            ]  
-        }
+            return ContentFile(render_gradient(index), name=f'placeholder_{index}.webp')
 
         for _ in range(number_of_products):
-            category = random.choice(categories)
-            sub_category = random.choice(sub_categories[category])
-            title = fake.word().capitalize()
-            description  = fake.text(max_nb_chars=300)
+            fields = self._fake_product(fake)
 
             # Create a new gallery (library)
-            gallery = Library.objects.create(title=title)
+            gallery = Library.objects.create(title=fields['title'])
 
             # Add test images to the gallery
-            for idx, _ in enumerate(test_images):
+            for idx, _ in enumerate(TEST_IMAGES):
                 upload = _get_image_file(idx)
                 Attachment.objects.create(
                     library=gallery,
@@ -121,15 +124,107 @@ class Command(BaseCommand):
                     rank=0,
                 )
 
-            new_product = Product.objects.create(
-                category=category + ' (EN)',
-                sub_category=sub_category + ' (EN)',
-                title=title + ' (EN)',
-                description=description + ' (EN)',
-                price=fake.random_int(min=100, max=190),
-                gallery=gallery,
-            )
+            new_product = Product.objects.create(gallery=gallery, **self._localized(fields))
 
             self.stdout.write(self.style.SUCCESS(f'Product "{new_product}" created'))
 
-        self.stdout.write(self.style.SUCCESS(f'"{Product.objects.count()}" Product records created'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f'"{Product.objects.count()}" Product records created'))
+
+    def _fake_product(self, fake):
+        category = random.choice(CATEGORIES)
+        return {
+            'category': category,
+            'sub_category': random.choice(SUB_CATEGORIES[category]),
+            'title': fake.word().capitalize(),
+            'description': fake.text(max_nb_chars=300),
+            'price': fake.random_int(min=100, max=190),
+        }
+
+    def _localized(self, fields):
+        return {
+            'category': fields['category'] + ' (EN)',
+            'sub_category': fields['sub_category'] + ' (EN)',
+            'title': fields['title'] + ' (EN)',
+            'description': fields['description'] + ' (EN)',
+            'price': fields['price'],
+        }
+
+    def _image_variants(self):
+        """``[(original name, bytes, (width, height)), ...]`` rendered or read once."""
+        existing = _existing_test_images()
+        if existing:
+            sources = []
+            for path in existing:
+                with open(os.path.join(os.getcwd(), path), 'rb') as fh:
+                    sources.append((os.path.basename(path), fh.read()))
+        else:
+            sources = [
+                (f'placeholder_{i}.webp', render_gradient(i)) for i in range(len(GRADIENT_PALETTES))
+            ]
+        return [(name, content, Image.open(BytesIO(content)).size) for name, content in sources]
+
+    def _handle_bulk(self, fake, number_of_products, batch_size, workers):
+        storage = Attachment._meta.get_field('file').storage
+        try:
+            storage.path('')
+        except NotImplementedError:
+            raise CommandError('--bulk writes files directly and needs a filesystem storage')
+
+        variants = self._image_variants()
+        contents = [content for _, content, _ in variants]
+        images_per_product = len(TEST_IMAGES)
+        created = 0
+
+        # One writer pool for the whole run, started before any transaction is open.
+        with file_writer(contents, workers=workers) as write:
+            shared_names = None
+            if is_content_addressed():
+                # Every attachment of a variant points at one stored file.
+                shared_names = [
+                    content_addressed_name(hashlib.sha256(content).hexdigest(), name) for name, content, _ in variants
+                ]
+                used = {i % len(variants) for i in range(number_of_products + images_per_product - 1)}
+                write([(storage.path(shared_names[i]), i) for i in sorted(used) if not storage.exists(shared_names[i])])
+
+            for start in range(0, number_of_products, batch_size):
+                rows = [self._fake_product(fake) for _ in range(min(batch_size, number_of_products - start))]
+                now = timezone.now()
+                with transaction.atomic():
+                    libraries = bulk_create_with_pks(
+                        Library, [Library(title=row['title'], created=now, updated=now) for row in rows],
+                    )
+                    attachments = []
+                    jobs = []
+                    for offset, library in enumerate(libraries):
+                        for rank in range(images_per_product):
+                            index = (start + offset + rank) % len(variants)
+                            original_name, content, (width, height) = variants[index]
+                            if shared_names:
+                                name = shared_names[index]
+                            else:
+                                name = upload_path_handler(SimpleNamespace(library=library), original_name)
+                                jobs.append((storage.path(name), index))
+                            attachments.append(Attachment(
+                                library=library,
+                                file=name,
+                                original_name=original_name,
+                                rank=rank,
+                                filesize=len(content),
+                                mimetype=mimetypes.guess_type(original_name)[0] or '',
+                                image_width=width,
+                                image_height=height,
+                                created=now,
+                                updated=now,
+                            ))
+                    Attachment.objects.bulk_create(attachments, batch_size=batch_size)
+                    Product.objects.bulk_create(
+                        [Product(gallery=library, **self._localized(row)) for row, library in zip(rows, libraries)],
+                        batch_size=batch_size,
+                    )
+                    # Inside the transaction: a failed write rolls the batch back.
+                    # The writers were forked before it began; nothing forks here.
+                    write(jobs)
+                created += len(rows)
+                self.stdout.write(f'{created}/{number_of_products} products created')
+
+        self.stdout.write(self.style.SUCCESS(f'"{Product.objects.count()}" Product records created'))
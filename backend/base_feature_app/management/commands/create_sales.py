@@ -1,17 +1,73 @@
 import random
 from faker import Faker
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from base_feature_app.models import Sale, SoldProduct, Product
+from base_feature_app.utils.seeding import next_pk, reset_sequences, run_chunks
+
+# Upper bound of products per sale; also the SoldProduct key stride per sale in --bulk mode.
+MAX_PRODUCTS_PER_SALE = 5
+
+
+def _create_sales_chunk(index, start, count, *, seed, first_sale_pk, first_sold_pk, product_ids, batch_size):
+    """
+    Insert sales ``first_sale_pk + start ...`` with their sold products and M2M rows.
+
+    Every sale owns ``MAX_PRODUCTS_PER_SALE`` SoldProduct keys, so chunks never
+    collide and the data depends only on ``seed`` and ``index``.
+    """
+    fake = Faker()
+    fake.seed_instance(seed + index)
+    rng = random.Random(seed + index)
+    Through = Sale.sold_products.through
+
+    sales, sold_products, links = [], [], []
+    for offset in range(count):
+        row = start + offset
+        sale = Sale(
+            id=first_sale_pk + row,
+            email=fake.email(),
+            address=fake.street_address(),
+            city=fake.city(),
+            state=fake.state(),
+            postal_code=fake.postcode(),
+        )
+        sales.append(sale)
+        num_products = rng.randint(1, min(MAX_PRODUCTS_PER_SALE, len(product_ids)))
+        for slot, product_id in enumerate(rng.sample(product_ids, num_products)):
+            sold_pk = first_sold_pk + row * MAX_PRODUCTS_PER_SALE + slot
+            sold_products.append(SoldProduct(id=sold_pk, product_id=product_id, quantity=rng.randint(1, 5)))
+            links.append(Through(sale_id=sale.id, soldproduct_id=sold_pk))
+
+    with transaction.atomic():
+        Sale.objects.bulk_create(sales, batch_size=batch_size)
+        SoldProduct.objects.bulk_create(sold_products, batch_size=batch_size)
+        Through.objects.bulk_create(links, batch_size=batch_size)
+    return count
+
 
 class Command(BaseCommand):
     help = 'Create Sale records in the database'
 
     def add_arguments(self, parser):
         parser.add_argument('number_of_sales', type=int, nargs='?', default=10)
+        parser.add_argument('--bulk', action='store_true', help='Seed with bulk inserts across processes')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Sales per chunk in --bulk mode')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processes in --bulk mode (default: CPU count, 1 = in-process)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
 
     def handle(self, *args, **options):
         number_of_sales = options['number_of_sales']
+
+        if options['bulk']:
+            self._handle_bulk(number_of_sales, options)
+            return
+
         fake = Faker()
+        if options['seed'] is not None:
+            Faker.seed(options['seed'])
+            random.seed(options['seed'])
 
         # Check if there are products in the database
         products = list(Product.objects.all())
@@ -30,20 +86,40 @@ class Command(BaseCommand):
             )
 
             # Add random products to the sale (between 1 and 5 products)
-            num_products = random.randint(1, min(5, len(products)))
+            num_products = random.randint(1, min(MAX_PRODUCTS_PER_SALE, len(products)))
             selected_products = random.sample(products, num_products)
 
-            for product in selected_products:
-                quantity = random.randint(1, 5)
-                sold_product = SoldProduct.objects.create(
-                    product=product,
-                    quantity=quantity,
-                )
-                new_sale.sold_products.add(sold_product)
-
-            new_sale.save()
+            new_sale.sold_products.add(*[
+                SoldProduct.objects.create(product=product, quantity=random.randint(1, 5))
+                for product in selected_products
+            ])
             self.stdout.write(self.style.SUCCESS(
                 f'Sale "{new_sale.email}" created with {num_products} products'
             ))
 
         self.stdout.write(self.style.SUCCESS(f'{number_of_sales} Sale records created'))
+
+    def _handle_bulk(self, number_of_sales, options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        product_ids = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+        if not product_ids:
+            self.stdout.write(self.style.WARNING('No products found in database. Please create products first.'))
+            return
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 31)
+        self.stdout.write(f'Seeding {number_of_sales} sales with --seed {seed}')
+
+        created = 0
+        for count in run_chunks(
+            _create_sales_chunk, number_of_sales, options['chunk_size'], options['workers'],
+            seed=seed,
+            first_sale_pk=next_pk(Sale),
+            first_sold_pk=next_pk(SoldProduct),
+            product_ids=product_ids,
+            batch_size=1000,
+        ):
+            created += count
+            self.stdout.write(f'{created}/{number_of_sales} sales created')
+
+        reset_sequences(Sale, SoldProduct, Sale.sold_products.through)
+        self.stdout.write(self.style.SUCCESS(f'{number_of_sales} Sale records created'))
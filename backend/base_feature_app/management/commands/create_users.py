@@ -1,18 +1,64 @@
+import random
+
 from faker import Faker
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from base_feature_app.models import User
+from base_feature_app.utils.seeding import next_pk, reset_sequences, run_chunks
+
+ROLES = [User.Role.CUSTOMER, User.Role.ADMIN]
+
+
+def _create_users_chunk(index, start, count, *, seed, first_pk, password_hash, batch_size):
+    """Insert users ``first_pk + start ...``; data depends only on ``seed`` and ``index``."""
+    fake = Faker()
+    fake.seed_instance(seed + index)
+    users = []
+    for offset in range(count):
+        pk = first_pk + start + offset
+        first_name = fake.first_name()
+        last_name = fake.last_name()
+        role = fake.random_element(elements=ROLES)
+        users.append(User(
+            id=pk,
+            # The key makes the address unique without a cross-process registry.
+            email=f'{first_name}.{last_name}.{pk}@{fake.free_email_domain()}'.lower(),
+            password=password_hash,
+            first_name=first_name,
+            last_name=last_name,
+            phone=fake.phone_number(),
+            role=role,
+            is_active=True,
+            is_staff=(role == User.Role.ADMIN),
+        ))
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+    return count
+
 
 class Command(BaseCommand):
     help = 'Create User records in the database'
 
     def add_arguments(self, parser):
         parser.add_argument('number_of_users', type=int, nargs='?', default=10)
+        parser.add_argument('--bulk', action='store_true', help='Seed with bulk inserts across processes')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Users per chunk in --bulk mode')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processes in --bulk mode (default: CPU count, 1 = in-process)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
 
     def handle(self, *args, **options):
         number_of_users = options['number_of_users']
+        if options['bulk']:
+            self._handle_bulk(number_of_users, options)
+            return
+
         fake = Faker()
+        if options['seed'] is not None:
+            Faker.seed(options['seed'])
 
-        roles = [User.Role.CUSTOMER, User.Role.ADMIN]
+        roles = ROLES
 
         for i in range(number_of_users):
             # Generate unique email
@@ -37,3 +83,24 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f'User "{user.email}" created with role {role}'))
 
         self.stdout.write(self.style.SUCCESS(f'{number_of_users} User records created'))
+
+    def _handle_bulk(self, number_of_users, options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 31)
+        self.stdout.write(f'Seeding {number_of_users} users with --seed {seed}')
+
+        created = 0
+        for count in run_chunks(
+            _create_users_chunk, number_of_users, options['chunk_size'], options['workers'],
+            seed=seed,
+            first_pk=next_pk(User),
+            # Hashing is deliberately slow; every fake user shares one hash.
+            password_hash=make_password('password'),
+            batch_size=1000,
+        ):
+            created += count
+            self.stdout.write(f'{created}/{number_of_users} users created')
+
+        reset_sequences(User)
+        self.stdout.write(self.style.SUCCESS(f'{number_of_users} User records created'))
@@ -1,5 +1,14 @@
 from django.core.management.base import BaseCommand, CommandError
+from django_attachments.cleanup import delete_unreferenced_files
+from django_attachments.models import Attachment
 from base_feature_app.models import Product, Blog, Sale, User
+from base_feature_app.services.bulk_deletion import (
+    delete_blogs,
+    delete_in_pk_ranges,
+    delete_products,
+    delete_rows,
+    delete_sales,
+)
 
 class Command(BaseCommand):
     help = 'Delete fake records from the database'
@@ -7,6 +16,10 @@ class Command(BaseCommand):
     """
     To delete fake data via console, run:
     python3 manage.py delete_fake_data --confirm
+    python3 manage.py delete_fake_data --confirm --bulk --batch-size 5000 --workers 16
+
+    --bulk deletes rows set-based in primary-key ranges and removes the
+    attachment files and thumbnails afterwards with a thread pool.
     
     Note: This command will NOT delete superusers or admin users to protect system administrators.
     """
@@ -17,10 +30,19 @@ class Command(BaseCommand):
             action='store_true',
             help='Confirm deletion of all fake data.',
         )
+        parser.add_argument('--bulk', action='store_true', help='Set-based deletion with batched file cleanup')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per transaction in --bulk mode')
+        parser.add_argument('--workers', type=int, default=8, help='File deletion threads in --bulk mode')
 
     def handle(self, *args, **options):
         if not options.get('confirm'):
             raise CommandError('Deletion not confirmed. Re-run with --confirm.')
+
+        if options['bulk']:
+            if options['batch_size'] < 1:
+                raise CommandError('--batch-size must be at least 1')
+            self._handle_bulk(options['batch_size'], options['workers'])
+            return
         
         self.stdout.write(self.style.SUCCESS('==== Deleting Fake Data ===='))
         
@@ -58,4 +80,35 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'{user_count} Users deleted'))
         self.stdout.write(self.style.WARNING(f'{protected_count} Admin/Superuser accounts protected and not deleted'))
         
-        self.stdout.write(self.style.SUCCESS('\n==== Fake Data Deletion Complete ===='))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('\n==== Fake Data Deletion Complete ===='))
+
+    def _handle_bulk(self, batch_size, workers):
+        self.stdout.write(self.style.SUCCESS('==== Deleting Fake Data (bulk) ===='))
+        users_to_delete = User.objects.filter(is_superuser=False, is_staff=False)
+        protected_count = User.objects.exclude(pk__in=users_to_delete.values('pk')).count()
+
+        # Sales first: sold products protect their products.
+        steps = [
+            ('Sales', Sale.objects.all(), delete_sales),
+            ('Products', Product.objects.all(), delete_products),
+            ('Blogs', Blog.objects.all(), delete_blogs),
+            ('Users', users_to_delete, delete_rows),
+        ]
+        file_names = []
+        for label, queryset, delete_batch in steps:
+            self.stdout.write(self.style.SUCCESS(f'\n--- Deleting {label} ---'))
+            total = queryset.count()
+            deleted, names = delete_in_pk_ranges(
+                queryset, delete_batch, batch_size,
+                on_batch=lambda done, label=label, total=total: self.stdout.write(f'{done}/{total} {label} deleted'),
+            )
+            file_names.extend(names)
+            self.stdout.write(self.style.SUCCESS(f'{deleted} {label} deleted'))
+
+        self.stdout.write(self.style.SUCCESS('\n--- Deleting Files ---'))
+        # Content-addressed files may still be shared with attachments that remain.
+        removed = delete_unreferenced_files(Attachment, 'file', file_names, workers=workers)
+        self.stdout.write(self.style.SUCCESS(f'{removed} files and thumbnails deleted'))
+        self.stdout.write(self.style.WARNING(f'{protected_count} Admin/Superuser accounts protected and not deleted'))
+
+        self.stdout.write(self.style.SUCCESS('\n==== Fake Data Deletion Complete ===='))
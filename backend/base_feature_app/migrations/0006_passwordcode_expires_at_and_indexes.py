@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_expires_at(apps, schema_editor):
+    PasswordCode = apps.get_model('base_feature_app', 'PasswordCode')
+    PasswordCode.objects.filter(expires_at__isnull=True).update(
+        expires_at=F('created_at') + timedelta(minutes=15)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base_feature_app', '0005_create_staging_phase_banner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordcode',
+            name='expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='passwordcode',
+            name='expires_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AddIndex(
+            model_name='passwordcode',
+            index=models.Index(fields=['user', 'code', 'used'], name='passwordcode_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordcode',
+            index=models.Index(fields=['expires_at'], name='passwordcode_expires_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base_feature_app', '0006_passwordcode_expires_at_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlacklistedRefreshToken',
+            fields=[
+                ('jti_hash', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Blacklisted refresh token',
+            },
+        ),
+    ]
@@ -3,4 +3,5 @@ from .product import Product
 from .sale import SoldProduct, Sale
 from .user import User
 from .password_code import PasswordCode
-from .staging_phase_banner import StagingPhaseBanner
\ No newline at end of file
+from .staging_phase_banner import StagingPhaseBanner
+from .blacklisted_refresh_token import BlacklistedRefreshToken
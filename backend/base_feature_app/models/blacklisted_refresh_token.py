@@ -0,0 +1,39 @@
+import hashlib
+
+from django.db import models
+from django.utils import timezone
+
+
+class BlacklistedRefreshTokenQuerySet(models.QuerySet):
+    def expired(self):
+        """Entries whose token would be rejected by its own ``exp`` anyway."""
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class BlacklistedRefreshToken(models.Model):
+    """
+    Refresh token revoked by rotation.
+
+    Only a fixed-width hash of the ``jti`` is stored, as the primary key, so
+    both the lookup and the insert on ``/api/token/refresh/`` are a single
+    index probe. Rows are useless once ``expires_at`` passes and are pruned by
+    the ``prune_blacklisted_refresh_tokens`` Huey task.
+    """
+    jti_hash = models.CharField(max_length=32, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = BlacklistedRefreshTokenQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Blacklisted refresh token'
+
+    def __str__(self):
+        return f'BlacklistedRefreshToken({self.jti_hash})'
+
+    @staticmethod
+    def hash_jti(jti):
+        return hashlib.blake2b(str(jti).encode(), digest_size=16).hexdigest()
+
+    @classmethod
+    def is_blacklisted(cls, jti):
+        return cls.objects.filter(jti_hash=cls.hash_jti(jti)).exists()
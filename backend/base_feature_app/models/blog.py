@@ -2,6 +2,13 @@ from django.db import models
 from django_attachments.models import Library
 from django_attachments.fields import SingleImageField
 
+
+class BlogQuerySet(models.QuerySet):
+    def with_image(self):
+        """Load the image library and its attachments up front (serializers build the image URL)."""
+        return self.select_related('image').prefetch_related('image__attachment_set')
+
+
 class Blog(models.Model):
     """
     Blog model.
@@ -21,6 +28,8 @@ class Blog(models.Model):
     category = models.CharField(max_length=40)
     image = SingleImageField(related_name='blog_image', on_delete=models.CASCADE)
 
+    objects = BlogQuerySet.as_manager()
+
     def __str__(self):
         return self.title
     
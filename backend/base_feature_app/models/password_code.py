@@ -1,23 +1,52 @@
+from datetime import timedelta
+
 from django.db import models
+from django.utils import timezone
+
 from base_feature_app.models import User
 
+
+class PasswordCodeQuerySet(models.QuerySet):
+    def active(self):
+        """Codes that are unused and not yet expired (checked in SQL)."""
+        return self.filter(used=False, expires_at__gt=timezone.now())
+
+    def purgeable(self):
+        """Codes that can never be redeemed again: used or expired."""
+        return self.filter(models.Q(used=True) | models.Q(expires_at__lte=timezone.now()))
+
+
 class PasswordCode(models.Model):
     """
     Password reset code model.
-    
+
     Stores 6-digit codes for password reset functionality.
     """
+    TTL = timedelta(minutes=15)
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='password_codes')
     code = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
     used = models.BooleanField(default=False)
-    
+
+    objects = PasswordCodeQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
-    
+        indexes = [
+            models.Index(fields=['user', 'code', 'used'], name='passwordcode_lookup_idx'),
+            models.Index(fields=['expires_at'], name='passwordcode_expires_idx'),
+        ]
+
     def __str__(self):
         return f"Code for {self.user.email} - {self.code}"
-    
+
+    def save(self, *args, **kwargs):
+        if self.expires_at is None:
+            self.expires_at = timezone.now() + self.TTL
+        super().save(*args, **kwargs)
+
     @classmethod
     def generate_code(cls, user):
         """
@@ -26,15 +55,11 @@ class PasswordCode(models.Model):
         import random
         code = ''.join([str(random.randint(0, 9)) for _ in range(6)])
         return cls.objects.create(user=user, code=code)
-    
+
     def is_valid(self):
         """
-        Check if code is still valid (not used and less than 15 minutes old).
+        Check if code is still valid (not used and not past ``expires_at``).
         """
         if self.used:
             return False
-        
-        from django.utils import timezone
-        from datetime import timedelta
-        age = timezone.now() - self.created_at
-        return age < timedelta(minutes=15)
+        return timezone.now() < self.expires_at
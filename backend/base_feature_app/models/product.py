@@ -2,6 +2,13 @@ from django.db import models
 from django_attachments.models import Library
 from django_attachments.fields import GalleryField
 
+
+class ProductQuerySet(models.QuerySet):
+    def with_gallery(self):
+        """Load the gallery and its attachments up front (serializers list their URLs)."""
+        return self.select_related('gallery').prefetch_related('gallery__attachment_set')
+
+
 class Product(models.Model):
     """
     Product model.
@@ -29,6 +36,8 @@ class Product(models.Model):
     price = models.IntegerField()
     gallery = GalleryField(related_name='products_with_attachment', on_delete=models.CASCADE)
 
+    objects = ProductQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
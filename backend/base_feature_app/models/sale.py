@@ -1,6 +1,16 @@
 from django.db import models
 from base_feature_app.models import Product
 
+
+class SaleQuerySet(models.QuerySet):
+    def with_products(self):
+        """Prefetch sold products with their product, gallery and attachments."""
+        return self.prefetch_related(
+            models.Prefetch('sold_products', queryset=SoldProduct.objects.select_related('product__gallery')),
+            'sold_products__product__gallery__attachment_set',
+        )
+
+
 class SoldProduct(models.Model):
     """
     Model representing a product in the cart.
@@ -22,6 +32,8 @@ class Sale(models.Model):
     postal_code = models.CharField(max_length=20)
     sold_products = models.ManyToManyField(SoldProduct)
 
+    objects = SaleQuerySet.as_manager()
+
     def __str__(self):
         return self.email
 
@@ -82,3 +82,11 @@ class StagingPhaseBanner(models.Model):
         except cls.DoesNotExist:
             instance, _ = cls.objects.get_or_create(pk=1)
             return instance
+
+    @classmethod
+    async def aget_solo(cls):
+        try:
+            return await cls.objects.aget(pk=1)
+        except cls.DoesNotExist:
+            instance, _ = await cls.objects.aget_or_create(pk=1)
+            return instance
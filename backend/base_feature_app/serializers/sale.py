@@ -19,10 +19,17 @@ class SaleSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         sold_products_data = validated_data.pop('sold_products')
+        products = Product.objects.in_bulk({item['product_id'] for item in sold_products_data})
+        missing = sorted({item['product_id'] for item in sold_products_data} - products.keys())
+        if missing:
+            raise serializers.ValidationError({'sold_products': [f'Product {pk} does not exist.' for pk in missing]})
+
         sale = Sale.objects.create(**validated_data)
-        for sold_product_data in sold_products_data:
-            product_id = sold_product_data.pop('product_id')
-            product = Product.objects.get(id=product_id)
-            sold_product = SoldProduct.objects.create(product=product, **sold_product_data)
-            sale.sold_products.add(sold_product)
-        return sale
\ No newline at end of file
+        # Row by row: bulk_create() does not return primary keys on MySQL.
+        sold_products = [
+            SoldProduct.objects.create(product=products[item.pop('product_id')], **item)
+            for item in sold_products_data
+        ]
+        sale.sold_products.add(*sold_products)
+        # Reload with the nested products prefetched for the response.
+        return Sale.objects.with_products().get(pk=sale.pk)
\ No newline at end of file
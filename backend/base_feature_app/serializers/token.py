@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from base_feature_app.tokens import BlacklistingRefreshToken
+from base_feature_app.utils.auth_utils import add_user_claims
+from base_feature_project.db_routers import pin_to_primary
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token pair for /api/token/ carrying the same user claims as sign in."""
+
+    @classmethod
+    def get_token(cls, user):
+        pin_to_primary(user)
+        return add_user_claims(super().get_token(user), user)
+
+
+class BlacklistTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer whose tokens check and fill ``BlacklistedRefreshToken``.
+
+    simplejwt only rotates jti/exp/iat, so the user claims are re-stamped from
+    the current user on every refresh; otherwise a demoted user would keep
+    ``role``/``is_staff`` in every rotated token.
+    """
+
+    token_class = BlacklistingRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first() if user_id else None
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        add_user_claims(refresh, user)
+        pin_to_primary(user)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+
+        return data
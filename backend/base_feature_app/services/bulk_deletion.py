@@ -0,0 +1,147 @@
+"""
+Set-based deletion of catalog rows and their attachment files.
+
+``Product.delete()``, ``Blog.delete()`` and ``Sale.delete()`` and the
+attachment file-cleanup signals work one object at a time. The functions
+here delete a whole batch with a handful of statements and return the
+attachment file names instead of removing them inline; pass those to
+``schedule_file_cleanup`` (background) or to
+``django_attachments.cleanup.delete_files_by_name`` (inline) once the rows
+are gone.
+"""
+from django.db import transaction
+from django_attachments.cleanup import schedule_file_deletions
+from django_attachments.models import Attachment, Library
+
+from base_feature_app.models import Blog, Product, Sale, SoldProduct
+
+
+def delete_libraries(library_ids) -> list[str]:
+    """
+    Delete libraries and their attachments without per-object signals.
+
+    Args:
+        library_ids: Primary keys of the libraries to delete.
+
+    Returns:
+        list[str]: Storage names of the deleted attachments' files.
+    """
+    library_ids = [pk for pk in library_ids if pk is not None]
+    if not library_ids:
+        return []
+    attachments = Attachment.objects.filter(library_id__in=library_ids)
+    names = list(attachments.exclude(file='').values_list('file', flat=True))
+    Library.objects.filter(pk__in=library_ids).update(primary_attachment=None)
+    # A raw delete skips the post_delete file handlers; the caller removes
+    # the returned files in bulk instead.
+    attachments._raw_delete(attachments.db)
+    Library.objects.filter(pk__in=library_ids).delete()
+    return names
+
+
+def delete_products(queryset) -> tuple[int, list[str]]:
+    """
+    Delete products with their galleries (like ``Product.delete()``).
+
+    Raises ``ProtectedError`` when a product was sold, like a single delete.
+
+    Returns:
+        tuple[int, list[str]]: Products deleted and attachment file names.
+    """
+    rows = list(queryset.values_list('pk', 'gallery_id'))
+    if not rows:
+        return 0, []
+    with transaction.atomic():
+        Product.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+        names = delete_libraries([gallery_id for _, gallery_id in rows])
+    return len(rows), names
+
+
+def delete_blogs(queryset) -> tuple[int, list[str]]:
+    """
+    Delete blogs with their image libraries (like ``Blog.delete()``).
+
+    Returns:
+        tuple[int, list[str]]: Blogs deleted and attachment file names.
+    """
+    rows = list(queryset.values_list('pk', 'image_id'))
+    if not rows:
+        return 0, []
+    with transaction.atomic():
+        Blog.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+        names = delete_libraries([image_id for _, image_id in rows])
+    return len(rows), names
+
+
+def delete_sales(queryset) -> tuple[int, list[str]]:
+    """
+    Delete sales with their sold products (like ``Sale.delete()``).
+
+    Returns:
+        tuple[int, list[str]]: Sales deleted and (always empty) file names.
+    """
+    sale_ids = list(queryset.values_list('pk', flat=True))
+    if not sale_ids:
+        return 0, []
+    sold_product_ids = list(
+        Sale.sold_products.through.objects.filter(sale_id__in=sale_ids).values_list('soldproduct_id', flat=True)
+    )
+    with transaction.atomic():
+        Sale.objects.filter(pk__in=sale_ids).delete()
+        SoldProduct.objects.filter(pk__in=sold_product_ids).delete()
+    return len(sale_ids), []
+
+
+def delete_rows(queryset) -> tuple[int, list[str]]:
+    """
+    Plain ``QuerySet.delete()`` for models without custom ``delete()`` cleanup.
+
+    Returns:
+        tuple[int, list[str]]: Rows of ``queryset``'s model deleted and no file names.
+    """
+    _, per_model = queryset.delete()
+    return per_model.get(queryset.model._meta.label, 0), []
+
+
+def schedule_file_cleanup(names) -> None:
+    """
+    Remove attachment files ``names`` in the background after the transaction commits.
+
+    Args:
+        names: Storage names returned by the ``delete_*`` functions.
+    """
+    if names:
+        schedule_file_deletions(Attachment, 'file', names)
+
+
+def delete_in_pk_ranges(queryset, delete_batch, batch_size=1000, on_batch=None) -> tuple[int, list[str]]:
+    """
+    Delete ``queryset`` in primary-key ranges of up to ``batch_size`` rows.
+
+    Each range is passed to ``delete_batch`` (one of the functions above) and
+    deleted in its own transaction, so no lock is held for the whole wipe.
+
+    Args:
+        queryset: Rows to delete.
+        delete_batch: Callable taking a queryset, returning ``(deleted, file names)``.
+        batch_size: Rows per range.
+        on_batch: Optional callable receiving the running total after each range.
+
+    Returns:
+        tuple[int, list[str]]: Rows deleted and the attachment file names to remove.
+    """
+    deleted = 0
+    names = []
+    last_pk = None
+    while True:
+        remaining = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(remaining.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted, names
+        last_pk = pks[-1]
+        with transaction.atomic():
+            count, batch_names = delete_batch(queryset.filter(pk__gte=pks[0], pk__lte=last_pk))
+        deleted += count
+        names.extend(batch_names)
+        if on_batch is not None:
+            on_batch(deleted)
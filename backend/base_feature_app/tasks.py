@@ -0,0 +1,68 @@
+"""
+Scheduled application tasks with Huey (auto-discovered by djhuey).
+
+Tasks:
+- purge_password_codes: Hourly batched delete of used/expired password reset codes
+- prune_blacklisted_refresh_tokens: Hourly batched delete of expired blacklist entries
+"""
+
+import logging
+
+from django.conf import settings
+from huey import crontab
+from huey.contrib.djhuey import db_periodic_task
+
+logger = logging.getLogger(__name__)
+
+
+def delete_in_batches(queryset, batch_size):
+    """
+    Delete the rows of ``queryset`` in primary-key batches.
+
+    Each batch is a short ``DELETE ... WHERE id IN (...)`` so the table is
+    never locked for the whole purge.
+
+    :return: Total number of rows deleted.
+    """
+    total = 0
+    while True:
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return total
+        deleted, _ = queryset.model._default_manager.filter(pk__in=pks).delete()
+        total += deleted
+
+
+@db_periodic_task(crontab(minute='15'))
+def purge_password_codes():
+    """
+    Hourly purge of password reset codes that can no longer be redeemed.
+    """
+    from base_feature_app.models import PasswordCode
+
+    deleted = delete_in_batches(
+        PasswordCode.objects.purgeable(),
+        settings.PASSWORD_CODE_PURGE_BATCH_SIZE,
+    )
+    if deleted:
+        logger.info('Password codes purge: deleted %d row(s).', deleted)
+    return deleted
+
+
+@db_periodic_task(crontab(minute='45'))
+def prune_blacklisted_refresh_tokens():
+    """
+    Hourly prune of blacklist entries whose refresh token has expired.
+
+    An expired token fails signature/exp validation before the blacklist is
+    consulted, so its entry only costs index space.
+    """
+    from base_feature_app.models import BlacklistedRefreshToken
+
+    deleted = delete_in_batches(
+        BlacklistedRefreshToken.objects.expired(),
+        settings.BLACKLISTED_TOKEN_PRUNE_BATCH_SIZE,
+    )
+    if deleted:
+        logger.info('Refresh token blacklist prune: deleted %d row(s).', deleted)
+    return deleted
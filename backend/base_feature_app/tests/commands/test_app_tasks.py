@@ -0,0 +1,57 @@
+"""Tests for base_feature_app Huey tasks: purge_password_codes, prune_blacklisted_refresh_tokens."""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from freezegun import freeze_time
+
+from base_feature_app.models import BlacklistedRefreshToken, PasswordCode
+from base_feature_app.tasks import (
+    delete_in_batches,
+    prune_blacklisted_refresh_tokens,
+    purge_password_codes,
+)
+
+
+@pytest.mark.django_db
+@freeze_time('2026-01-15 10:00:00')
+def test_purge_password_codes_deletes_used_and_expired_codes(settings):
+    """purge_password_codes removes used/expired codes in batches and keeps redeemable ones."""
+    settings.PASSWORD_CODE_PURGE_BATCH_SIZE = 2
+    user = get_user_model().objects.create_user(email='purge@example.com', password='pass1234')
+    fresh = PasswordCode.objects.create(user=user, code='000000')
+    for i in range(3):
+        PasswordCode.objects.create(user=user, code=f'10000{i}', used=True)
+        PasswordCode.objects.create(
+            user=user, code=f'20000{i}', expires_at=timezone.now() - timedelta(minutes=1),
+        )
+
+    deleted = purge_password_codes.call_local()
+
+    assert deleted == 6
+    assert list(PasswordCode.objects.all()) == [fresh]
+
+
+@pytest.mark.django_db
+def test_delete_in_batches_returns_zero_for_empty_queryset():
+    assert delete_in_batches(PasswordCode.objects.none(), 10) == 0
+
+
+@pytest.mark.django_db
+@freeze_time('2026-01-15 10:00:00')
+def test_prune_blacklisted_refresh_tokens_keeps_unexpired_entries(settings):
+    """prune_blacklisted_refresh_tokens deletes only entries past their token's exp."""
+    settings.BLACKLISTED_TOKEN_PRUNE_BATCH_SIZE = 2
+    now = timezone.now()
+    for i in range(5):
+        BlacklistedRefreshToken.objects.create(
+            jti_hash=BlacklistedRefreshToken.hash_jti(f'old-{i}'), expires_at=now - timedelta(seconds=1),
+        )
+    live = BlacklistedRefreshToken.objects.create(
+        jti_hash=BlacklistedRefreshToken.hash_jti('live'), expires_at=now + timedelta(days=1),
+    )
+
+    assert prune_blacklisted_refresh_tokens.call_local() == 5
+    assert list(BlacklistedRefreshToken.objects.all()) == [live]
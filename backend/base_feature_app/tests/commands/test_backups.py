@@ -0,0 +1,245 @@
+"""Tests for backups: incremental media snapshots, streaming DB dumps, sharded parallel archives."""
+
+import gzip
+import os
+import sys
+import tarfile
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from base_feature_project import backups
+
+
+@pytest.fixture
+def backup_settings(settings, tmp_path):
+    media = tmp_path / 'media'
+    (media / 'attachments' / '01').mkdir(parents=True)
+    (media / 'attachments' / '01' / 'a.txt').write_bytes(b'alpha')
+    (media / 'attachments' / '01' / 'b.txt').write_bytes(b'bravo')
+    settings.MEDIA_ROOT = str(media)
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'dbbackup': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            'OPTIONS': {'location': str(tmp_path / 'backups')},
+        },
+    }
+    return media
+
+
+def test_second_snapshot_hard_links_unchanged_files(backup_settings):
+    """Only new/changed files are copied; unchanged ones share an inode with the previous snapshot."""
+    media = backup_settings
+    first = backups.create_media_snapshot(timestamp='2026-01-01_000000')
+    (media / 'attachments' / '01' / 'b.txt').write_bytes(b'bravo v2')
+    (media / 'c.txt').write_bytes(b'alpha')
+    second = backups.create_media_snapshot(timestamp='2026-01-02_000000')
+
+    assert first['copied'] == 2
+    assert second['copied'] == 1
+    assert second['linked'] == 2
+    a_old = first['path'] / 'files' / 'attachments' / '01' / 'a.txt'
+    a_new = second['path'] / 'files' / 'attachments' / '01' / 'a.txt'
+    assert os.stat(a_old).st_ino == os.stat(a_new).st_ino
+    assert os.stat(second['path'] / 'files' / 'c.txt').st_ino == os.stat(a_old).st_ino
+    assert (second['path'] / 'files' / 'attachments' / '01' / 'b.txt').read_bytes() == b'bravo v2'
+    assert backups.load_manifest(second['path'])['previous'] == '2026-01-01_000000'
+
+
+def test_changed_file_with_known_content_is_linked_without_copying(backup_settings):
+    media = backup_settings
+    first = backups.create_media_snapshot(timestamp='2026-01-01_000000')
+    (media / 'attachments' / '01' / 'b.txt').write_bytes(b'alpha')
+
+    with patch.object(backups, 'copy_with_sha256', wraps=backups.copy_with_sha256) as copy:
+        second = backups.create_media_snapshot(timestamp='2026-01-02_000000')
+
+    copy.assert_not_called()
+    assert second['copied'] == 0
+    a_old = first['path'] / 'files' / 'attachments' / '01' / 'a.txt'
+    assert os.stat(second['path'] / 'files' / 'attachments' / '01' / 'b.txt').st_ino == os.stat(a_old).st_ino
+
+
+def test_verify_snapshot_reports_corruption(backup_settings):
+    snapshot = backups.create_media_snapshot(timestamp='2026-01-01_000000')['path']
+    assert backups.verify_snapshot(snapshot) == []
+
+    (snapshot / 'files' / 'attachments' / '01' / 'a.txt').write_bytes(b'ALPHA')
+    (snapshot / 'files' / 'attachments' / '01' / 'b.txt').unlink()
+    (snapshot / 'files' / 'stray.txt').write_bytes(b'x')
+
+    assert sorted(backups.verify_snapshot(snapshot)) == [
+        'checksum mismatch: attachments/01/a.txt',
+        'missing: attachments/01/b.txt',
+        'not in manifest: stray.txt',
+    ]
+
+
+def test_prune_snapshots_keeps_shared_data(backup_settings):
+    for day in range(1, 4):
+        backups.create_media_snapshot(timestamp=f'2026-01-0{day}_000000')
+
+    removed = backups.prune_snapshots(keep=1)
+
+    assert removed == ['2026-01-01_000000', '2026-01-02_000000']
+    assert backups.verify_snapshot(backups.list_snapshots()[-1]) == []
+
+
+@pytest.mark.django_db
+def test_dump_database_streams_gzip_with_checksum(backup_settings, tmp_path):
+    dump = backups.dump_database(dest=tmp_path / 'out' / 'db.sql.gz')
+
+    with gzip.open(dump, 'rt') as fh:
+        sql = fh.read()
+    assert 'CREATE TABLE' in sql
+    assert backups.verify_db_dump(dump)
+    assert not (tmp_path / 'out' / 'db.sql.gz.partial').exists()
+
+    dump.write_bytes(dump.read_bytes() + b'x')
+    assert not backups.verify_db_dump(dump)
+
+
+def test_native_dump_drains_stderr_while_streaming(tmp_path):
+    # More warnings than a pipe buffer holds, written before any stdout.
+    script = "import sys; sys.stderr.write('w' * 200000); sys.stdout.write('SELECT 1;'); sys.exit(3)"
+    with patch.object(backups, '_dump_command', return_value=([sys.executable, '-c', script], os.environ.copy())):
+        with gzip.open(tmp_path / 'db.sql.gz', 'wb') as gz:
+            with pytest.raises(backups.BackupError) as excinfo:
+                backups._stream_native_dump({}, gz)
+
+    assert str(excinfo.value) == f'{sys.executable} exited with 3: ' + 'w' * 500
+    assert gzip.decompress((tmp_path / 'db.sql.gz').read_bytes()) == b'SELECT 1;'
+
+
+@pytest.mark.django_db
+def test_incremental_backup_then_restore_roundtrip(backup_settings, tmp_path):
+    out = StringIO()
+    call_command('incremental_backup', stdout=out)
+    assert 'Incremental backup completed' in out.getvalue()
+
+    target = tmp_path / 'restored'
+    out = StringIO()
+    call_command('restore_backup', target=str(target), stdout=out)
+
+    assert 'manifest verified' in out.getvalue()
+    assert 'checksum verified' in out.getvalue()
+    assert (target / 'attachments' / '01' / 'a.txt').read_bytes() == b'alpha'
+
+
+def test_restore_backup_refuses_corrupted_snapshot(backup_settings, tmp_path):
+    snapshot = backups.create_media_snapshot(timestamp='2026-01-01_000000')['path']
+    (snapshot / 'files' / 'attachments' / '01' / 'a.txt').write_bytes(b'oops!')
+
+    with pytest.raises(CommandError, match='failed verification'):
+        call_command('restore_backup', target=str(tmp_path / 'restored'), stdout=StringIO(), stderr=StringIO())
+    assert not (tmp_path / 'restored').exists()
+
+
+def test_scheduled_backup_uses_incremental_mode(settings):
+    from base_feature_project.tasks import scheduled_backup
+
+    settings.BACKUP_MODE = 'incremental'
+    with patch('django.core.management.call_command') as mock_call_command:
+        assert scheduled_backup.call_local() is True
+
+    mock_call_command.assert_called_once()
+    assert mock_call_command.call_args.args == ('incremental_backup',)
+
+
+# ---------------------------------------------------------------------------
+# Sharded parallel backups
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def sharded_media(backup_settings):
+    media = backup_settings
+    (media / 'attachments' / 'ff' / '255').mkdir(parents=True)
+    (media / 'attachments' / 'ff' / '255' / 'c.jpg').write_bytes(b'charlie')
+    (media / 'thumbs').mkdir()
+    (media / 'thumbs' / 't.jpg').write_bytes(b'thumb')
+    return media
+
+
+def test_list_media_shards_splits_on_attachment_dirs(sharded_media):
+    assert backups.list_media_shards(sharded_media) == ['attachments/01', 'attachments/ff', backups.ROOT_SHARD]
+
+
+def test_list_media_shards_splits_content_addressed_dir_by_prefix(sharded_media):
+    for prefix in ('ab', 'cd'):
+        (sharded_media / 'attachments' / 'sha256' / prefix / '00').mkdir(parents=True)
+        (sharded_media / 'attachments' / 'sha256' / prefix / '00' / f'{prefix}.jpg').write_bytes(prefix.encode())
+
+    shards = backups.list_media_shards(sharded_media)
+
+    assert shards == ['attachments/01', 'attachments/ff', 'attachments/sha256/ab', 'attachments/sha256/cd',
+                      backups.ROOT_SHARD]
+    files = [rel for shard in shards for rel, _ in backups._shard_files(sharded_media, shard, shards)]
+    assert sorted(files) == sorted(rel for rel, _ in backups.iter_files(sharded_media))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_sharded_backup_archives_every_file_once(sharded_media, workers):
+    result = backups.create_sharded_backup(timestamp='2026-01-01_000000', workers=workers)
+
+    manifest = backups.load_manifest(result['path'])
+    assert result['shards'] == 3
+    assert result['files'] == 4
+    assert set(manifest['shards']['attachments/01']['files']) == {
+        'attachments/01/a.txt', 'attachments/01/b.txt',
+    }
+    assert set(manifest['shards'][backups.ROOT_SHARD]['files']) == {'thumbs/t.jpg'}
+    with tarfile.open(result['path'] / 'attachments-ff.tar.gz') as tar:
+        assert tar.extractfile('attachments/ff/255/c.jpg').read() == b'charlie'
+    assert backups.verify_sharded_backup(result['path'], workers=workers) == []
+
+
+def test_verify_sharded_backup_detects_tampered_archive(sharded_media):
+    path = backups.create_sharded_backup(timestamp='2026-01-01_000000', workers=1)['path']
+    archive = path / 'attachments-01.tar.gz'
+    archive.write_bytes(archive.read_bytes()[:-10])
+    (path / 'attachments-ff.tar.gz').unlink()
+
+    assert sorted(backups.verify_sharded_backup(path, workers=1)) == [
+        'archive checksum mismatch: attachments-01.tar.gz',
+        'missing archive: attachments-ff.tar.gz',
+    ]
+
+
+def test_verify_shard_detects_member_mismatch(sharded_media):
+    path = backups.create_sharded_backup(timestamp='2026-01-01_000000', workers=1)['path']
+    entry = backups.load_manifest(path)['shards']['attachments/01']
+    entry['files']['attachments/01/a.txt']['sha256'] = '0' * 64
+    entry['files']['attachments/01/gone.txt'] = {'sha256': '0' * 64, 'size': 1}
+
+    assert backups.verify_shard(path / entry['archive'], entry) == [
+        'checksum mismatch: attachments/01/a.txt',
+        'missing: attachments/01/gone.txt',
+    ]
+
+
+def test_parallel_media_backup_and_verify_commands(sharded_media):
+    out = StringIO()
+    call_command('parallel_media_backup', workers=1, stdout=out)
+    assert '3 shards, 4 files' in out.getvalue()
+
+    out = StringIO()
+    call_command('verify_media_backup', workers=1, stdout=out)
+    assert 'all shards verified' in out.getvalue()
+
+
+def test_verify_media_backup_without_backups_fails(backup_settings):
+    with pytest.raises(CommandError, match='No sharded backups found'):
+        call_command('verify_media_backup', stdout=StringIO())
+
+
+def test_scheduled_backup_uses_sharded_mode(settings):
+    from base_feature_project.tasks import scheduled_backup
+
+    settings.BACKUP_MODE = 'sharded'
+    with patch('django.core.management.call_command') as mock_call_command:
+        assert scheduled_backup.call_local() is True
+
+    assert [c.args[0] for c in mock_call_command.call_args_list] == ['incremental_backup', 'parallel_media_backup']
@@ -0,0 +1,38 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from base_feature_project.management.commands.benchmark_db_connections import simulate_requests
+
+
+@pytest.mark.django_db
+def test_persistent_connection_connects_once(tmp_path):
+    settings_dict = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(tmp_path / 'db.sqlite3')}
+
+    per_request, per_request_connects = simulate_requests({**settings_dict, 'CONN_MAX_AGE': 0}, 5, 2)
+    persistent, persistent_connects = simulate_requests(
+        {**settings_dict, 'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True}, 5, 2,
+    )
+
+    assert len(per_request) == len(persistent) == 5
+    assert per_request_connects == 5
+    assert persistent_connects == 1
+
+
+@pytest.mark.django_db
+def test_benchmark_command_reports_every_mode():
+    out = StringIO()
+
+    call_command('benchmark_db_connections', '--stand-in', '--requests', '3', stdout=out)
+
+    output = out.getvalue()
+    assert 'SQLite stand-in' in output
+    for mode in ('new connection per request', 'persistent', 'persistent + health checks'):
+        assert mode in output
+    assert 'save' in output
+
+
+def test_benchmark_command_rejects_unknown_alias():
+    with pytest.raises(CommandError, match='Unknown database alias'):
+        call_command('benchmark_db_connections', '--database', 'missing', stdout=StringIO())
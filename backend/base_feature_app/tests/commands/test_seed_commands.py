@@ -0,0 +1,173 @@
+"""Tests for the bulk seeding modes of the fake-data commands."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django_attachments.models import Attachment, Library
+
+from base_feature_app.models import Product, Sale, SoldProduct, User
+from base_feature_app.utils import seeding
+from base_feature_app.utils.seeding import bulk_create_with_pks, file_writer, render_gradient, run_chunks, write_files
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def test_render_gradient_blends_palette_top_to_bottom():
+    from io import BytesIO
+
+    from PIL import Image
+
+    class CornerRandom:
+        # Every highlight circle lands at (0, 0) with the smallest radius.
+        def randint(self, low, high):
+            return low
+
+    image = Image.open(BytesIO(render_gradient(0, rng=CornerRandom())))
+
+    assert image.size == (800, 600)
+    top, bottom = image.getpixel((799, 0)), image.getpixel((799, 599))
+    assert abs(top[0] - 255) <= 3 and abs(top[1] - 107) <= 3
+    assert abs(bottom[1] - 142) <= 3 and abs(bottom[2] - 83) <= 3
+
+
+@pytest.mark.django_db
+def test_bulk_create_with_pks_sets_primary_keys():
+    now = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+    libraries = bulk_create_with_pks(Library, [Library(title=f'L{i}', created=now, updated=now) for i in range(3)])
+
+    assert [Library.objects.get(pk=library.pk).title for library in libraries] == ['L0', 'L1', 'L2']
+
+
+def test_write_files_in_process_and_in_pool(tmp_path):
+    contents = [b'alpha', b'bravo']
+    jobs = [(str(tmp_path / 'a' / f'{i}.bin'), i % 2) for i in range(6)]
+
+    assert write_files(jobs[:3], contents, workers=1) == 3
+    assert write_files(jobs[3:], contents, workers=2, chunk_size=1) == 3
+
+    assert [(tmp_path / 'a' / f'{i}.bin').read_bytes() for i in range(6)] == [b'alpha', b'bravo'] * 3
+
+
+def test_file_writer_reuses_one_pool_across_writes(tmp_path):
+    with patch.object(seeding, 'ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool_class:
+        with file_writer([b'alpha'], workers=2) as write:
+            assert write([(str(tmp_path / 'a.bin'), 0)]) == 1
+            assert write([(str(tmp_path / 'b.bin'), 0)]) == 1
+
+    assert pool_class.call_count == 1
+    assert (tmp_path / 'b.bin').read_bytes() == b'alpha'
+
+
+@pytest.mark.django_db
+def test_create_products_bulk_mode(media_root):
+    out = StringIO()
+
+    call_command('create_products', 5, '--bulk', '--batch-size', '2', '--workers', '1', '--seed', '7', stdout=out)
+
+    assert Product.objects.count() == 5
+    assert Attachment.objects.count() == 20
+    for product in Product.objects.with_gallery():
+        attachments = list(product.gallery.attachment_set.all())
+        assert sorted(a.rank for a in attachments) == [0, 1, 2, 3]
+        assert all((a.image_width, a.image_height) == (800, 600) for a in attachments)
+        assert all(a.mimetype == 'image/webp' for a in attachments)
+        assert all(os.path.getsize(a.file.path) == a.filesize for a in attachments)
+    assert '5/5 products created' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_create_products_default_mode_still_creates_galleries(media_root):
+    call_command('create_products', 1, stdout=StringIO())
+
+    product = Product.objects.get()
+    assert product.gallery.attachment_set.count() == 4
+
+
+@pytest.mark.django_db
+def test_create_users_bulk_mode_shares_one_password_hash():
+    call_command('create_users', 25, '--bulk', '--chunk-size', '10', '--workers', '1', '--seed', '3',
+                 stdout=StringIO())
+
+    users = list(User.objects.order_by('pk'))
+    assert len(users) == 25
+    assert len({user.email for user in users}) == 25
+    assert len({user.password for user in users}) == 1
+    assert users[0].check_password('password')
+    assert all(user.is_staff == (user.role == User.Role.ADMIN) for user in users)
+
+
+@pytest.mark.django_db
+def test_create_users_bulk_mode_is_reproducible_from_seed():
+    def seed():
+        call_command('create_users', 12, '--bulk', '--chunk-size', '5', '--workers', '1', '--seed', '9',
+                     stdout=StringIO())
+        return list(User.objects.order_by('pk').values_list('pk', 'email', 'first_name', 'role'))
+
+    first = seed()
+    User.objects.all().delete()
+
+    assert seed() == first
+
+
+@pytest.mark.django_db
+def test_create_sales_bulk_mode_writes_sold_products_and_links():
+    # With a single product every sale gets exactly one sold product.
+    product = Product.objects.create(category='C', sub_category='S', title='P', description='D', price=100,
+                                     gallery=Library.objects.create(title='G'))
+    existing = Sale.objects.create(email='a@example.com', address='A', city='C', state='S', postal_code='1')
+
+    call_command('create_sales', 20, '--bulk', '--chunk-size', '7', '--workers', '1', '--seed', '5',
+                 stdout=StringIO())
+
+    sales = Sale.objects.exclude(pk=existing.pk).with_products()
+    assert sales.count() == 20
+    assert SoldProduct.objects.count() == 20
+    for sale in sales:
+        assert [item.product_id for item in sale.sold_products.all()] == [product.pk]
+    assert Sale.sold_products.through.objects.count() == 20
+
+    # Regular inserts continue after the explicitly keyed rows.
+    assert Sale.objects.create(email='b@example.com', address='A', city='C', state='S', postal_code='1').pk > \
+        Sale.objects.exclude(email='b@example.com').order_by('-pk').first().pk
+
+
+@pytest.mark.django_db
+def test_create_sales_bulk_mode_without_products_warns():
+    out = StringIO()
+
+    call_command('create_sales', 5, '--bulk', '--workers', '1', stdout=out)
+
+    assert 'No products found' in out.getvalue()
+    assert not Sale.objects.exists()
+
+
+def test_run_chunks_covers_every_row_once():
+    results = list(run_chunks(_chunk_bounds, 23, 5, workers=1))
+
+    assert results == [(0, 0, 5), (1, 5, 5), (2, 10, 5), (3, 15, 5), (4, 20, 3)]
+
+
+def _chunk_bounds(index, start, count):
+    return index, start, count
+
+
+@pytest.mark.django_db
+def test_create_products_bulk_mode_stores_shared_files_once(media_root, settings):
+    settings.ATTACHMENTS_CONTENT_ADDRESSED = True
+
+    call_command('create_products', 5, '--bulk', '--workers', '1', stdout=StringIO())
+
+    names = set(Attachment.objects.values_list('file', flat=True))
+    stored = [path for path in media_root.rglob('*') if path.is_file()]
+    assert Attachment.objects.count() == 20
+    assert len(stored) == len(names) < 20
+    assert all(name.startswith('attachments/sha256/') for name in names)
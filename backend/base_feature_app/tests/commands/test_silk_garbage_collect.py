@@ -8,19 +8,29 @@ from base_feature_project.management.commands.silk_garbage_collect import Comman
 
 def _run_command(out, **options):
     """Instantiate and execute the command directly against a StringIO buffer."""
-    defaults = {'days': 7, 'dry_run': False}
+    defaults = {'days': 7, 'dry_run': False, 'batch_size': 500, 'sleep': 0, 'max_runtime': 0}
     defaults.update(options)
     cmd = Command(stdout=out, no_color=True)
     cmd.handle(**defaults)
 
 
+def _mock_old_requests(mock_request_cls, count, batches):
+    """
+    Wire Request.objects.filter(...) to a queryset mock whose successive
+    pk batches are ``batches`` and whose batch deletes report one row per pk.
+    """
+    mock_qs = MagicMock()
+    mock_qs.count.return_value = count
+    mock_qs.order_by.return_value.values_list.return_value.__getitem__.side_effect = list(batches) + [[]]
+    mock_qs.filter.return_value.delete.side_effect = [(len(b), {}) for b in batches]
+    mock_request_cls.objects.filter.return_value = mock_qs
+    return mock_qs
+
+
 @patch('silk.models.Request')
 def test_silk_garbage_collect_deletes_old_records_with_default_days(mock_request_cls):
     """Running the command without --days uses 7-day retention and deletes matching records."""
-    mock_qs = MagicMock()
-    mock_qs.count.return_value = 3
-    mock_qs.delete.return_value = (3, {})
-    mock_request_cls.objects.filter.return_value = mock_qs
+    mock_qs = _mock_old_requests(mock_request_cls, 3, [['a', 'b', 'c']])
 
     out = StringIO()
     _run_command(out)
@@ -28,16 +38,13 @@ def test_silk_garbage_collect_deletes_old_records_with_default_days(mock_request
     output = out.getvalue()
     assert 'Requests to delete: 3' in output
     assert 'Deleted 3 records' in output
-    mock_qs.delete.assert_called_once()
+    mock_qs.filter.return_value.delete.assert_called_once()
 
 
 @patch('silk.models.Request')
 def test_silk_garbage_collect_deletes_records_with_custom_days(mock_request_cls):
     """--days 14 applies a 14-day retention period when filtering records."""
-    mock_qs = MagicMock()
-    mock_qs.count.return_value = 10
-    mock_qs.delete.return_value = (10, {})
-    mock_request_cls.objects.filter.return_value = mock_qs
+    _mock_old_requests(mock_request_cls, 10, [list(range(10))])
 
     out = StringIO()
     _run_command(out, days=14)
@@ -45,15 +52,12 @@ def test_silk_garbage_collect_deletes_records_with_custom_days(mock_request_cls)
     output = out.getvalue()
     assert 'Requests to delete: 10' in output
     assert 'Deleted 10 records' in output
-    mock_qs.delete.assert_called_once()
 
 
 @patch('silk.models.Request')
 def test_silk_garbage_collect_dry_run_does_not_delete_records(mock_request_cls):
     """--dry-run reports the count but does not call delete on the queryset."""
-    mock_qs = MagicMock()
-    mock_qs.count.return_value = 5
-    mock_request_cls.objects.filter.return_value = mock_qs
+    mock_qs = _mock_old_requests(mock_request_cls, 5, [])
 
     out = StringIO()
     _run_command(out, dry_run=True)
@@ -61,16 +65,13 @@ def test_silk_garbage_collect_dry_run_does_not_delete_records(mock_request_cls):
     output = out.getvalue()
     assert 'Requests to delete: 5' in output
     assert 'DRY RUN' in output
-    mock_qs.delete.assert_not_called()
+    mock_qs.filter.return_value.delete.assert_not_called()
 
 
 @patch('silk.models.Request')
 def test_silk_garbage_collect_output_includes_cutoff_date(mock_request_cls):
     """Command stdout always contains the 'Silk records older than' header line."""
-    mock_qs = MagicMock()
-    mock_qs.count.return_value = 0
-    mock_qs.delete.return_value = (0, {})
-    mock_request_cls.objects.filter.return_value = mock_qs
+    _mock_old_requests(mock_request_cls, 0, [])
 
     out = StringIO()
     _run_command(out)
@@ -82,10 +83,7 @@ def test_silk_garbage_collect_output_includes_cutoff_date(mock_request_cls):
 @patch('silk.models.Request')
 def test_silk_garbage_collect_reports_zero_when_no_records_match(mock_request_cls):
     """When no records match the cutoff, the command reports 0 records to delete and 0 deleted."""
-    mock_qs = MagicMock()
-    mock_qs.count.return_value = 0
-    mock_qs.delete.return_value = (0, {})
-    mock_request_cls.objects.filter.return_value = mock_qs
+    mock_qs = _mock_old_requests(mock_request_cls, 0, [])
 
     out = StringIO()
     _run_command(out)
@@ -93,4 +91,39 @@ def test_silk_garbage_collect_reports_zero_when_no_records_match(mock_request_cl
     output = out.getvalue()
     assert 'Requests to delete: 0' in output
     assert 'Deleted 0 records' in output
-    mock_qs.delete.assert_called_once()
+    mock_qs.filter.return_value.delete.assert_not_called()
+
+
+@patch('base_feature_project.management.commands.silk_garbage_collect.time.sleep')
+@patch('silk.models.Request')
+def test_silk_garbage_collect_deletes_in_batches_with_sleep(mock_request_cls, mock_sleep):
+    """Full batches are deleted oldest first with a pause between them and per-batch progress output."""
+    mock_qs = _mock_old_requests(mock_request_cls, 5, [[1, 2], [3, 4], [5]])
+
+    out = StringIO()
+    _run_command(out, batch_size=2, sleep=0.25)
+
+    output = out.getvalue()
+    assert 'Batch 1: 2 requests (2 rows), 2/5 done' in output
+    assert 'Batch 3: 1 requests (1 rows), 5/5 done' in output
+    assert 'Deleted 5 records' in output
+    mock_qs.order_by.assert_called_with('start_time')
+    assert mock_qs.filter.return_value.delete.call_count == 3
+    assert mock_sleep.call_count == 2
+    mock_sleep.assert_called_with(0.25)
+
+
+@patch('base_feature_project.management.commands.silk_garbage_collect.time.monotonic')
+@patch('silk.models.Request')
+def test_silk_garbage_collect_stops_at_max_runtime(mock_request_cls, mock_monotonic):
+    """Once --max-runtime is spent no further batch is started."""
+    mock_qs = _mock_old_requests(mock_request_cls, 6, [[1, 2], [3, 4], [5, 6]])
+    mock_monotonic.side_effect = [0.0, 5.0, 11.0]
+
+    out = StringIO()
+    _run_command(out, batch_size=2, max_runtime=10)
+
+    output = out.getvalue()
+    assert 'Max runtime of 10s reached' in output
+    assert 'Deleted 4 records' in output
+    assert mock_qs.filter.return_value.delete.call_count == 2
@@ -1,36 +1,20 @@
 """Tests for Silk-related Huey tasks: silk_garbage_collection, weekly_slow_queries_report."""
 
-from types import SimpleNamespace
+import json
 from unittest.mock import MagicMock, patch
 
 from freezegun import freeze_time
 
 
-class _FakeQS(list):
-    """List subclass with a no-arg .count() to mimic a sliced Django queryset."""
-
-    def count(self):
-        return len(self)
-
-
-def _setup_silk_mocks(mock_request_cls, mock_sql_query_cls, *, slow_queries, n_plus_one):
-    slow_qs = _FakeQS(slow_queries)
-    n1_qs = _FakeQS(n_plus_one)
+def _setup_silk_mocks(mock_sql_query_cls, *, rows):
+    """Make the report's SQLQuery values_list(...).iterator() yield ``rows``."""
     (
         mock_sql_query_cls.objects
         .filter.return_value
-        .select_related.return_value
         .order_by.return_value
-        .__getitem__
-    ) = MagicMock(return_value=slow_qs)
-    (
-        mock_request_cls.objects
-        .filter.return_value
-        .annotate.return_value
-        .filter.return_value
-        .order_by.return_value
-        .__getitem__
-    ) = MagicMock(return_value=n1_qs)
+        .values_list.return_value
+        .iterator
+    ) = MagicMock(return_value=iter(rows))
 
 
 # ---------------------------------------------------------------------------
@@ -86,11 +70,8 @@ def test_weekly_slow_queries_report_creates_log_file(settings, tmp_path):
     settings.N_PLUS_ONE_THRESHOLD = 10
     settings.BASE_DIR = tmp_path
 
-    with (
-        patch('silk.models.Request') as mock_request_cls,
-        patch('silk.models.SQLQuery') as mock_sql_query_cls,
-    ):
-        _setup_silk_mocks(mock_request_cls, mock_sql_query_cls, slow_queries=[], n_plus_one=[])
+    with patch('silk.models.SQLQuery') as mock_sql_query_cls:
+        _setup_silk_mocks(mock_sql_query_cls, rows=[])
         from base_feature_project.tasks import weekly_slow_queries_report
         weekly_slow_queries_report.call_local()
 
@@ -105,11 +86,8 @@ def test_weekly_slow_queries_report_log_contains_header(settings, tmp_path):
     settings.N_PLUS_ONE_THRESHOLD = 10
     settings.BASE_DIR = tmp_path
 
-    with (
-        patch('silk.models.Request') as mock_request_cls,
-        patch('silk.models.SQLQuery') as mock_sql_query_cls,
-    ):
-        _setup_silk_mocks(mock_request_cls, mock_sql_query_cls, slow_queries=[], n_plus_one=[])
+    with patch('silk.models.SQLQuery') as mock_sql_query_cls:
+        _setup_silk_mocks(mock_sql_query_cls, rows=[])
         from base_feature_project.tasks import weekly_slow_queries_report
         weekly_slow_queries_report.call_local()
 
@@ -125,11 +103,8 @@ def test_weekly_slow_queries_report_no_slow_queries_message(settings, tmp_path):
     settings.N_PLUS_ONE_THRESHOLD = 10
     settings.BASE_DIR = tmp_path
 
-    with (
-        patch('silk.models.Request') as mock_request_cls,
-        patch('silk.models.SQLQuery') as mock_sql_query_cls,
-    ):
-        _setup_silk_mocks(mock_request_cls, mock_sql_query_cls, slow_queries=[], n_plus_one=[])
+    with patch('silk.models.SQLQuery') as mock_sql_query_cls:
+        _setup_silk_mocks(mock_sql_query_cls, rows=[])
         from base_feature_project.tasks import weekly_slow_queries_report
         weekly_slow_queries_report.call_local()
 
@@ -145,11 +120,8 @@ def test_weekly_slow_queries_report_no_n_plus_one_message(settings, tmp_path):
     settings.N_PLUS_ONE_THRESHOLD = 10
     settings.BASE_DIR = tmp_path
 
-    with (
-        patch('silk.models.Request') as mock_request_cls,
-        patch('silk.models.SQLQuery') as mock_sql_query_cls,
-    ):
-        _setup_silk_mocks(mock_request_cls, mock_sql_query_cls, slow_queries=[], n_plus_one=[])
+    with patch('silk.models.SQLQuery') as mock_sql_query_cls:
+        _setup_silk_mocks(mock_sql_query_cls, rows=[])
         from base_feature_project.tasks import weekly_slow_queries_report
         weekly_slow_queries_report.call_local()
 
@@ -158,60 +130,68 @@ def test_weekly_slow_queries_report_no_n_plus_one_message(settings, tmp_path):
 
 
 @freeze_time('2025-06-09')
-def test_weekly_slow_queries_report_includes_slow_query_data(settings, tmp_path):
-    """Report includes the endpoint path and duration of each detected slow query."""
+def test_weekly_slow_queries_report_aggregates_slow_queries_by_fingerprint(settings, tmp_path):
+    """Queries differing only in literals are reported once with count, percentiles and view."""
     settings.ENABLE_SILK = True
     settings.SLOW_QUERY_THRESHOLD_MS = 500
     settings.N_PLUS_ONE_THRESHOLD = 10
     settings.BASE_DIR = tmp_path
 
-    slow_query = SimpleNamespace(
-        time_taken=1200.0,
-        request=SimpleNamespace(path='/api/products/'),
-        query='SELECT * FROM product WHERE id = 1',
-    )
-
-    with (
-        patch('silk.models.Request') as mock_request_cls,
-        patch('silk.models.SQLQuery') as mock_sql_query_cls,
-    ):
-        _setup_silk_mocks(
-            mock_request_cls,
-            mock_sql_query_cls,
-            slow_queries=[slow_query],
-            n_plus_one=[],
-        )
+    rows = [
+        ('r1', 'product-list', '/api/products-data/', 'SELECT * FROM product WHERE id = 1', 1200.0),
+        ('r2', 'product-list', '/api/products-data/', 'SELECT * FROM product WHERE id = 2', 100.0),
+        ('r3', None, '/api/blogs/', 'SELECT 1', 5.0),
+    ]
+
+    with patch('silk.models.SQLQuery') as mock_sql_query_cls:
+        _setup_silk_mocks(mock_sql_query_cls, rows=rows)
         from base_feature_project.tasks import weekly_slow_queries_report
         weekly_slow_queries_report.call_local()
 
     content = (tmp_path / 'logs' / 'silk-reports' / 'silk-report-2025-06-09.log').read_text()
-    assert '/api/products/' in content
-    assert '1200ms' in content
+    assert '[2x total 1300ms p50 100ms p95 1200ms p99 1200ms max 1200ms] product-list' in content
+    assert 'SELECT * FROM product WHERE id = %s' in content
+    assert 'SELECT %s' not in content
 
 
 @freeze_time('2025-06-09')
-def test_weekly_slow_queries_report_includes_n_plus_one_suspects(settings, tmp_path):
-    """Report includes the endpoint path and query count of each detected N+1 suspect."""
+def test_weekly_slow_queries_report_flags_repeated_fingerprint_as_n_plus_one(settings, tmp_path):
+    """A fingerprint repeated N_PLUS_ONE_THRESHOLD times in one request is reported with its view."""
     settings.ENABLE_SILK = True
     settings.SLOW_QUERY_THRESHOLD_MS = 500
-    settings.N_PLUS_ONE_THRESHOLD = 10
+    settings.N_PLUS_ONE_THRESHOLD = 3
     settings.BASE_DIR = tmp_path
 
-    suspect = SimpleNamespace(query_count=25, path='/api/sales/')
-
-    with (
-        patch('silk.models.Request') as mock_request_cls,
-        patch('silk.models.SQLQuery') as mock_sql_query_cls,
-    ):
-        _setup_silk_mocks(
-            mock_request_cls,
-            mock_sql_query_cls,
-            slow_queries=[],
-            n_plus_one=[suspect],
-        )
+    rows = [('r1', 'sale-list', '/api/sales/', f'SELECT * FROM product WHERE id = {i}', 1.0) for i in range(4)]
+    rows += [('r2', 'sale-list', '/api/sales/', f'SELECT * FROM product WHERE id = {i}', 1.0) for i in range(2)]
+
+    with patch('silk.models.SQLQuery') as mock_sql_query_cls:
+        _setup_silk_mocks(mock_sql_query_cls, rows=rows)
         from base_feature_project.tasks import weekly_slow_queries_report
         weekly_slow_queries_report.call_local()
 
     content = (tmp_path / 'logs' / 'silk-reports' / 'silk-report-2025-06-09.log').read_text()
-    assert '/api/sales/' in content
-    assert '25 queries' in content
+    assert '[4x in one request, 1 request(s)] sale-list - SELECT * FROM product WHERE id = %s' in content
+
+
+@freeze_time('2025-06-09')
+def test_weekly_slow_queries_report_writes_json_alongside_log(settings, tmp_path):
+    """The JSON twin carries the same aggregates for week-over-week diffs."""
+    settings.ENABLE_SILK = True
+    settings.SLOW_QUERY_THRESHOLD_MS = 500
+    settings.N_PLUS_ONE_THRESHOLD = 10
+    settings.BASE_DIR = tmp_path
+
+    rows = [('r1', 'product-list', '/api/products-data/', "SELECT * FROM t WHERE name = 'x'", 900.0)]
+
+    with patch('silk.models.SQLQuery') as mock_sql_query_cls:
+        _setup_silk_mocks(mock_sql_query_cls, rows=rows)
+        from base_feature_project.tasks import weekly_slow_queries_report
+        weekly_slow_queries_report.call_local()
+
+    data = json.loads((tmp_path / 'logs' / 'silk-reports' / 'silk-report-2025-06-09.json').read_text())
+    assert data['date'] == '2025-06-09'
+    assert data['totals'] == {'requests': 1, 'queries': 1, 'fingerprints': 1}
+    assert data['slow_fingerprints'][0]['fingerprint'] == 'SELECT * FROM t WHERE name = %s'
+    assert data['slow_fingerprints'][0]['p99_ms'] == 900.0
+    assert data['n_plus_one'] == []
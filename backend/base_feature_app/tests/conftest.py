@@ -1,7 +1,20 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
+from base_feature_app.authentication import clear_user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Reset the locmem and JWT user caches so state never leaks between tests."""
+    cache.clear()
+    clear_user_cache()
+    yield
+    cache.clear()
+    clear_user_cache()
+
 
 @pytest.fixture
 def api_client():
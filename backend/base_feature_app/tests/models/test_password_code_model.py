@@ -46,7 +46,7 @@ def test_password_code_is_valid_false_when_expired():
     user = User.objects.create_user(email='expired@example.com', password='pass1234')
     password_code = PasswordCode.objects.create(user=user, code='654321')
     PasswordCode.objects.filter(id=password_code.id).update(
-        created_at=timezone.now() - timedelta(minutes=16)
+        expires_at=timezone.now() - timedelta(minutes=1)
     )
     password_code.refresh_from_db()
 
@@ -60,3 +60,29 @@ def test_password_code_is_valid_true_for_recent_code():
     password_code = PasswordCode.objects.create(user=user, code='654321')
 
     assert password_code.is_valid() is True
+
+
+@pytest.mark.django_db
+@freeze_time('2026-01-15 10:00:00')
+def test_password_code_save_sets_expires_at_from_ttl():
+    User = get_user_model()
+    user = User.objects.create_user(email='ttl@example.com', password='pass1234')
+    password_code = PasswordCode.objects.create(user=user, code='123123')
+
+    assert password_code.expires_at == timezone.now() + PasswordCode.TTL
+
+
+@pytest.mark.django_db
+@freeze_time('2026-01-15 10:00:00')
+def test_password_code_active_and_purgeable_querysets():
+    """Verifies active() keeps only unused unexpired codes and purgeable() returns the rest."""
+    User = get_user_model()
+    user = User.objects.create_user(email='sets@example.com', password='pass1234')
+    fresh = PasswordCode.objects.create(user=user, code='111111')
+    used = PasswordCode.objects.create(user=user, code='222222', used=True)
+    expired = PasswordCode.objects.create(
+        user=user, code='333333', expires_at=timezone.now() - timedelta(seconds=1),
+    )
+
+    assert list(PasswordCode.objects.active()) == [fresh]
+    assert set(PasswordCode.objects.purgeable()) == {used, expired}
@@ -0,0 +1,121 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import ProtectedError
+from django_attachments.cleanup import delete_files_by_name
+from django_attachments.models import Attachment, Library
+from easy_thumbnails.files import get_thumbnailer
+from easy_thumbnails.models import Source, Thumbnail
+
+from base_feature_app.models import Blog, Product, Sale, SoldProduct, User
+from base_feature_app.services.bulk_deletion import (
+    delete_blogs,
+    delete_in_pk_ranges,
+    delete_products,
+    delete_sales,
+)
+
+
+@pytest.fixture
+def catalog(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    call_command('create_products', 3, '--bulk', '--workers', '1', '--seed', '1', stdout=StringIO())
+    return list(Product.objects.order_by('pk'))
+
+
+def _storage():
+    return Attachment._meta.get_field('file').storage
+
+
+@pytest.mark.django_db
+def test_delete_products_removes_galleries_and_returns_files(catalog):
+    paths = [a.file.path for a in Attachment.objects.all()]
+
+    deleted, names = delete_products(Product.objects.filter(pk__in=[p.pk for p in catalog[:2]]))
+
+    assert deleted == 2
+    assert len(names) == 8
+    assert list(Product.objects.all()) == [catalog[2]]
+    assert Library.objects.count() == 1
+    assert Attachment.objects.count() == 4
+    # Files are left for the caller to remove after commit.
+    assert all(os.path.exists(path) for path in paths)
+
+
+@pytest.mark.django_db
+def test_delete_products_keeps_sold_products_protected(catalog):
+    sale = Sale.objects.create(email='a@example.com', address='A', city='C', state='S', postal_code='1')
+    sale.sold_products.add(SoldProduct.objects.create(product=catalog[0], quantity=1))
+
+    with pytest.raises(ProtectedError):
+        delete_products(Product.objects.all())
+
+    assert Product.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_delete_blogs_removes_image_libraries():
+    for i in range(2):
+        Blog.objects.create(title=f'B{i}', description='D', category='C', image=Library.objects.create(title='I'))
+
+    deleted, names = delete_blogs(Blog.objects.all())
+
+    assert (deleted, names) == (2, [])
+    assert not Library.objects.exists()
+
+
+@pytest.mark.django_db
+def test_delete_sales_removes_sold_products(catalog):
+    for i in range(2):
+        sale = Sale.objects.create(email=f'{i}@example.com', address='A', city='C', state='S', postal_code='1')
+        sale.sold_products.add(*[SoldProduct.objects.create(product=p, quantity=1) for p in catalog])
+
+    assert delete_sales(Sale.objects.all()) == (2, [])
+    assert not SoldProduct.objects.exists()
+    assert not Sale.sold_products.through.objects.exists()
+
+
+@pytest.mark.django_db
+def test_delete_in_pk_ranges_reports_progress(catalog):
+    progress = []
+
+    deleted, names = delete_in_pk_ranges(Product.objects.all(), delete_products, batch_size=2, on_batch=progress.append)
+
+    assert (deleted, len(names)) == (3, 12)
+    assert progress == [2, 3]
+
+
+@pytest.mark.django_db
+def test_delete_files_by_name_removes_files_thumbnails_and_directories(catalog):
+    attachment = Attachment.objects.first()
+    thumbnail = get_thumbnailer(attachment.file).get_thumbnail({'size': (50, 50)})
+    thumbnail_path = thumbnail.path
+    directory = os.path.dirname(attachment.file.path)
+    names = list(Attachment.objects.filter(library=attachment.library).values_list('file', flat=True))
+
+    removed = delete_files_by_name(_storage(), names, workers=4)
+
+    assert removed == 5
+    assert not os.path.exists(thumbnail_path)
+    assert not os.path.exists(directory)
+    assert not Source.objects.exists() and not Thumbnail.objects.exists()
+
+
+@pytest.mark.django_db
+def test_delete_fake_data_bulk_mode(catalog):
+    sale = Sale.objects.create(email='a@example.com', address='A', city='C', state='S', postal_code='1')
+    sale.sold_products.add(SoldProduct.objects.create(product=catalog[0], quantity=1))
+    User.objects.create_user(email='customer@example.com', password='pw')
+    User.objects.create_user(email='staff@example.com', password='pw', is_staff=True)
+    paths = [a.file.path for a in Attachment.objects.all()]
+    out = StringIO()
+
+    call_command('delete_fake_data', '--confirm', '--bulk', '--batch-size', '2', '--workers', '2', stdout=out)
+
+    assert not Sale.objects.exists() and not SoldProduct.objects.exists()
+    assert not Product.objects.exists() and not Attachment.objects.exists() and not Library.objects.exists()
+    assert list(User.objects.values_list('email', flat=True)) == ['staff@example.com']
+    assert not any(os.path.exists(path) for path in paths)
+    assert '12 files and thumbnails deleted' in out.getvalue()
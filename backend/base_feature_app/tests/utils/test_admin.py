@@ -1,8 +1,17 @@
+import os
+from io import StringIO
+
 import pytest
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.core.exceptions import PermissionDenied
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 from django.test import RequestFactory
-from django_attachments.models import Library
+from freezegun import freeze_time
+from django_attachments.models import Attachment, Library
 
 from base_feature_app.admin import (
     BaseFeatureUserAdmin,
@@ -13,6 +22,7 @@ from base_feature_app.admin import (
     admin_site,
 )
 from base_feature_app.models import Blog, PasswordCode, Product, Sale, SoldProduct, User
+from base_feature_app.utils import pagination
 
 
 def _request_with_messages(user):
@@ -183,3 +193,96 @@ def test_user_admin_login_as_blocks_ineligible_target(build_target):
     assert response.status_code == 302
     assert 'access=' not in response['Location']
     assert f'/user/{target_user.id}/change/' in response['Location']
+
+
+@pytest.mark.django_db
+def test_product_admin_delete_queryset_is_set_based_and_defers_file_cleanup(
+    settings, tmp_path, django_assert_max_num_queries, django_capture_on_commit_callbacks,
+):
+    """Verifies bulk admin deletes use a fixed number of queries and remove files after commit."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    call_command('create_products', 6, '--bulk', '--workers', '1', stdout=StringIO())
+    paths = [attachment.file.path for attachment in Attachment.objects.all()]
+    admin = ProductAdmin(Product, admin_site)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        with django_assert_max_num_queries(15):
+            admin.delete_queryset(RequestFactory().get('/admin/'), Product.objects.all())
+
+    assert not Product.objects.exists() and not Attachment.objects.exists() and not Library.objects.exists()
+    assert all(os.path.exists(path) for path in paths)
+
+    for callback in callbacks:
+        callback()
+
+    assert not any(os.path.exists(path) for path in paths)
+
+
+def _changelist_queries(client, url_name):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse(url_name))
+    assert response.status_code == 200
+    return len(queries)
+
+
+def _add_sales(product, count):
+    for i in range(count):
+        sale = Sale.objects.create(email=f'{i}@example.com', address='A', city='C', state='S', postal_code='1')
+        sale.sold_products.add(*[SoldProduct.objects.create(product=product, quantity=1) for _ in range(2)])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', [
+    'myadmin:base_feature_app_sale_changelist',
+    'myadmin:base_feature_app_soldproduct_changelist',
+    'myadmin:base_feature_app_passwordcode_changelist',
+])
+@freeze_time('2026-01-15 10:00:00')
+def test_large_table_changelists_use_constant_query_count(client, admin_user, url_name):
+    """Verifies changelist query counts do not grow with the number of rows."""
+    client.force_login(admin_user)
+    product = Product.objects.create(
+        title='P', category='C', sub_category='S', description='D', price=1,
+        gallery=Library.objects.create(title='G'),
+    )
+
+    def add_rows(count):
+        _add_sales(product, count)
+        for _ in range(count):
+            PasswordCode.objects.create(user=admin_user, code='123456', expires_at=timezone.now())
+
+    add_rows(2)
+    few = _changelist_queries(client, url_name)
+    add_rows(10)
+
+    assert _changelist_queries(client, url_name) == few
+
+
+@pytest.mark.django_db
+def test_sale_changelist_annotates_total_products(client, admin_user):
+    client.force_login(admin_user)
+    product = Product.objects.create(
+        title='P', category='C', sub_category='S', description='D', price=1,
+        gallery=Library.objects.create(title='G'),
+    )
+    _add_sales(product, 1)
+    Sale.objects.create(email='empty@example.com', address='A', city='C', state='S', postal_code='1')
+
+    response = client.get(reverse('myadmin:base_feature_app_sale_changelist'), {'o': '6'})
+
+    assert [sale.total_products for sale in response.context['cl'].result_list] == [0, 2]
+
+
+@pytest.mark.django_db
+def test_changelist_serves_pages_past_an_underestimated_count(client, admin_user, settings, monkeypatch):
+    client.force_login(admin_user)
+    settings.ESTIMATED_COUNT_THRESHOLD = 1
+    monkeypatch.setattr(pagination, 'estimated_row_count', lambda model, using='default': 3)
+    monkeypatch.setattr(admin_site._registry[Sale], 'list_per_page', 2)
+    for i in range(5):
+        Sale.objects.create(email=f'{i}@example.com', address='A', city='C', state='S', postal_code='1')
+
+    response = client.get(reverse('myadmin:base_feature_app_sale_changelist'), {'p': '3', 'o': '1'})
+
+    assert response.status_code == 200
+    assert [sale.email for sale in response.context['cl'].result_list] == ['4@example.com']
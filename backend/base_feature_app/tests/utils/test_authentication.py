@@ -0,0 +1,112 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from base_feature_app import authentication
+from base_feature_app.authentication import (
+    CachedJWTAuthentication,
+    ClaimsJWTAuthentication,
+    ClaimsUser,
+)
+from base_feature_app.utils.auth_utils import add_user_claims
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        email='claims@example.com', password='pass1234', first_name='Ada', last_name='Lovelace',
+    )
+
+
+@pytest.mark.django_db
+def test_cached_authentication_reuses_user_within_ttl(user, settings, django_assert_num_queries):
+    settings.JWT_USER_CACHE_TTL = 30
+    token = AccessToken.for_user(user)
+    auth = CachedJWTAuthentication()
+
+    with django_assert_num_queries(1):
+        first = auth.get_user(token)
+    with django_assert_num_queries(0):
+        second = auth.get_user(token)
+
+    assert first == second == user
+    assert first is not second
+
+
+@pytest.mark.django_db
+def test_cached_authentication_evicts_least_recently_used_past_max_size(user, settings):
+    settings.JWT_USER_CACHE_TTL = 30
+    settings.JWT_USER_CACHE_MAX_SIZE = 2
+    others = [
+        get_user_model().objects.create_user(email=f'lru{i}@example.com', password='pass1234') for i in range(2)
+    ]
+    auth = CachedJWTAuthentication()
+
+    for cached in (user, *others):
+        auth.get_user(AccessToken.for_user(cached))
+
+    assert list(authentication._user_cache) == [str(other.pk) for other in others]
+
+
+@pytest.mark.django_db
+def test_cached_authentication_drops_expired_entries_on_insert(user, settings):
+    settings.JWT_USER_CACHE_TTL = 30
+    other = get_user_model().objects.create_user(email='later@example.com', password='pass1234')
+    auth = CachedJWTAuthentication()
+    auth.get_user(AccessToken.for_user(user))
+    authentication._user_cache[str(user.pk)] = (0, user)  # expired
+
+    auth.get_user(AccessToken.for_user(other))
+
+    assert list(authentication._user_cache) == [str(other.pk)]
+
+
+@pytest.mark.django_db
+def test_cached_authentication_is_invalidated_on_user_save(user, settings):
+    settings.JWT_USER_CACHE_TTL = 30
+    token = AccessToken.for_user(user)
+    auth = CachedJWTAuthentication()
+    auth.get_user(token)
+
+    user.is_active = False
+    user.save()
+
+    with pytest.raises(AuthenticationFailed):
+        auth.get_user(token)
+
+
+@pytest.mark.django_db
+def test_cached_authentication_disabled_with_zero_ttl(user, settings, django_assert_num_queries):
+    settings.JWT_USER_CACHE_TTL = 0
+    token = AccessToken.for_user(user)
+    auth = CachedJWTAuthentication()
+
+    with django_assert_num_queries(2):
+        first = auth.get_user(token)
+        second = auth.get_user(token)
+
+    assert first == second == user
+
+
+@pytest.mark.django_db
+def test_claims_authentication_builds_user_from_token(user, django_assert_num_queries):
+    token = add_user_claims(AccessToken.for_user(user), user)
+
+    with django_assert_num_queries(0):
+        claims_user = ClaimsJWTAuthentication().get_user(token)
+
+    assert isinstance(claims_user, ClaimsUser)
+    assert claims_user.id == user.id
+    assert claims_user.email == 'claims@example.com'
+    assert claims_user.first_name == 'Ada'
+    assert claims_user.is_authenticated is True
+
+
+@pytest.mark.django_db
+def test_claims_authentication_falls_back_to_db_without_claims(user):
+    token = AccessToken.for_user(user)
+
+    result = ClaimsJWTAuthentication().get_user(token)
+
+    assert result == user
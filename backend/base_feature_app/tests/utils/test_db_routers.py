@@ -0,0 +1,170 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from base_feature_app.models import Product
+from base_feature_project import db_routers
+from base_feature_project.db_routers import (
+    PIN_COOKIE,
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    pin_to_primary,
+    replica_reads,
+)
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = ['replica1', 'replica2']
+    settings.DATABASE_REPLICA_PIN_SECONDS = 5
+    unhealthy = set()
+    health = db_routers.ReplicaHealth()
+    monkeypatch.setattr(health, 'is_healthy', lambda alias: alias not in unhealthy)
+    monkeypatch.setattr(db_routers, 'replica_health', health)
+    cache.clear()
+    yield unhealthy
+    cache.clear()
+
+
+def _bearer(user_id):
+    token = AccessToken()
+    token['user_id'] = user_id
+    return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+
+def _read_db_during(method, *, write=False, headers=None, cookies=None, issue_tokens_for=None):
+    """Run a request through the middleware and return the read alias seen by the view."""
+    seen = {}
+
+    def view(request):
+        router = ReplicaRouter()
+        seen['read'] = router.db_for_read(Product)
+        if write:
+            router.db_for_write(Product)
+            seen['read_after_write'] = router.db_for_read(Product)
+        if issue_tokens_for is not None:
+            pin_to_primary(SimpleNamespace(pk=issue_tokens_for))
+        return HttpResponse()
+
+    request = getattr(RequestFactory(), method.lower())('/api/products/', **(headers or {}))
+    request.COOKIES.update(cookies or {})
+    seen['response'] = ReplicaRoutingMiddleware(view)(request)
+    return seen
+
+
+def test_outside_requests_reads_go_to_primary(replicas):
+    assert ReplicaRouter().db_for_read(Product) == 'default'
+    with replica_reads():
+        assert ReplicaRouter().db_for_read(Product) in {'replica1', 'replica2'}
+
+
+def test_get_requests_read_from_replicas_round_robin(replicas):
+    aliases = [_read_db_during('GET', headers={'HTTP_AUTHORIZATION': f'Bearer {i}'})['read'] for i in range(4)]
+
+    assert aliases == ['replica1', 'replica2', 'replica1', 'replica2']
+
+
+def test_unsafe_requests_read_from_primary(replicas):
+    assert _read_db_during('POST')['read'] == 'default'
+
+
+def test_reads_after_a_write_use_primary(replicas):
+    seen = _read_db_during('GET', write=True)
+
+    assert seen['read'] in {'replica1', 'replica2'}
+    assert seen['read_after_write'] == 'default'
+
+
+def test_anonymous_writer_is_pinned_by_cookie(replicas):
+    response = _read_db_during('POST')['response']
+
+    assert response.cookies[PIN_COOKIE]['max-age'] == 5
+    assert _read_db_during('GET', cookies={PIN_COOKIE: '1'})['read'] == 'default'
+    assert _read_db_during('GET')['read'] != 'default'
+
+
+def test_signed_in_writer_is_pinned_by_user_id(replicas):
+    response = _read_db_during('POST', headers=_bearer(7))['response']
+
+    assert PIN_COOKIE not in response.cookies
+    # A rotated access token for the same user is still pinned.
+    assert _read_db_during('GET', headers=_bearer(7))['read'] == 'default'
+    assert _read_db_during('GET', headers=_bearer(8))['read'] != 'default'
+
+
+def test_issuing_tokens_pins_the_new_identity(replicas):
+    _read_db_during('POST', issue_tokens_for=7)
+
+    assert _read_db_during('GET', headers=_bearer(7))['read'] == 'default'
+
+
+def test_invalid_token_is_treated_as_anonymous(replicas):
+    headers = {'HTTP_AUTHORIZATION': 'Bearer not-a-token'}
+
+    assert PIN_COOKIE in _read_db_during('POST', headers=headers)['response'].cookies
+
+
+def test_async_middleware_routes_and_pins_like_the_sync_one(replicas):
+    seen = []
+
+    async def view(request):
+        router = ReplicaRouter()
+        seen.append(router.db_for_read(Product))
+        if request.method == 'POST':
+            router.db_for_write(Product)
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(view)
+    factory = RequestFactory()
+
+    assert iscoroutinefunction(middleware) is True
+    asyncio.run(middleware(factory.get('/api/products/', **_bearer(7))))
+    asyncio.run(middleware(factory.post('/api/products/', **_bearer(7))))
+    asyncio.run(middleware(factory.get('/api/products/', **_bearer(7))))
+    assert seen[0] != 'default'
+    assert seen[1:] == ['default', 'default']
+
+
+def test_unhealthy_replicas_are_skipped(replicas):
+    replicas.add('replica1')
+    assert {_read_db_during('GET')['read'] for _ in range(3)} == {'replica2'}
+
+    replicas.add('replica2')
+    assert _read_db_during('GET')['read'] == 'default'
+
+
+@pytest.mark.django_db
+def test_reads_inside_a_transaction_use_primary(replicas):
+    with replica_reads(), transaction.atomic():
+        assert ReplicaRouter().db_for_read(Product) == 'default'
+
+
+def test_health_is_cached_between_checks(settings, monkeypatch):
+    settings.DATABASE_REPLICA_HEALTH_CHECK_SECONDS = 60
+    checks = []
+
+    class DownConnection:
+        def ensure_connection(self):
+            checks.append(1)
+            raise db_routers.DatabaseError('down')
+
+    monkeypatch.setattr(db_routers, 'connections', {'replica1': DownConnection()})
+    health = db_routers.ReplicaHealth()
+
+    assert health.is_healthy('replica1') is False
+    assert health.is_healthy('replica1') is False
+    assert len(checks) == 1
+
+
+def test_migrations_only_run_on_primary():
+    router = ReplicaRouter()
+
+    assert router.allow_migrate('default', 'base_feature_app') is True
+    assert router.allow_migrate('replica1', 'base_feature_app') is False
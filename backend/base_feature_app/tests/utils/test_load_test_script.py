@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+SCRIPT_PATH = REPO_ROOT / "scripts" / "load_test.py"
+
+spec = importlib.util.spec_from_file_location("load_test", SCRIPT_PATH)
+assert spec is not None
+assert spec.loader is not None
+load_test = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = load_test
+spec.loader.exec_module(load_test)
+
+
+async def _serve_and_load(status: int, concurrency: int = 3) -> load_test.Result:
+    body = b'{"status": "ok"}'
+
+    async def handle(reader, writer):
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(
+                    f"HTTP/1.1 {status} OK\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await load_test.run("local", f"http://127.0.0.1:{port}/api/", concurrency, 0.2, 1)
+    finally:
+        server.close()
+
+
+def test_run_measures_keep_alive_requests():
+    result = asyncio.run(_serve_and_load(200))
+
+    assert result.errors == 0
+    assert len(result.latencies_ms) > 3
+    assert result.throughput > 0
+    assert result.percentile(50) <= result.percentile(99)
+
+
+def test_error_statuses_are_counted_not_timed():
+    result = asyncio.run(_serve_and_load(500))
+
+    assert result.latencies_ms == []
+    assert result.errors > 0
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import socket
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from huey.signals import SIGNAL_COMPLETE, SIGNAL_EXECUTING
+
+from base_feature_project import metrics
+from base_feature_project.metrics import InstrumentedLocMemCache, MetricsMiddleware, Registry, collect, render
+
+
+def _select_one():
+    try:
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    finally:
+        connections.close_all()
+
+
+@pytest.fixture
+def metrics_settings(settings, tmp_path, monkeypatch):
+    settings.METRICS_ENABLED = True
+    settings.METRICS_DIR = tmp_path / 'metrics'
+    settings.METRICS_FLUSH_SECONDS = 0
+    settings.METRICS_TOKEN = ''
+    monkeypatch.setattr(metrics, 'registry', Registry())
+    return settings
+
+
+def test_render_emits_prometheus_text_format():
+    registry = Registry()
+    registry.inc('http_requests_total', {'view': 'product-list', 'method': 'GET', 'status': 200})
+    registry.observe('http_request_duration_seconds', 0.03, {'view': 'product-list', 'method': 'GET'})
+
+    text = render(registry.snapshot())
+
+    assert '# TYPE http_requests_total counter' in text
+    assert 'http_requests_total{method="GET",status="200",view="product-list"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",view="product-list",le="0.025"} 0' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",view="product-list",le="0.05"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",view="product-list",le="+Inf"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",view="product-list"} 1' in text
+
+
+def test_collect_sums_process_files(metrics_settings):
+    for pid in (1, 2):
+        registry = Registry()
+        registry.inc('http_requests_total', {'view': 'v'}, 2)
+        registry.observe('db_queries_per_request', 3, {'view': 'v'}, buckets=metrics.QUERY_COUNT_BUCKETS)
+        data = registry.snapshot()
+        data['pid'] = pid
+        metrics_settings.METRICS_DIR.mkdir(exist_ok=True)
+        (metrics_settings.METRICS_DIR / f'other-host-{pid}.json').write_text(json.dumps(data))
+
+    merged = collect()
+
+    assert merged['counter']['http_requests_total']['view="v"'] == 4
+    assert merged['histogram']['db_queries_per_request']['view="v"']['count'] == 2
+
+
+def test_collect_archives_files_of_exited_processes(metrics_settings, monkeypatch):
+    monkeypatch.setattr(metrics, '_pid_alive', lambda pid: pid != 2)
+    directory = metrics_settings.METRICS_DIR
+    directory.mkdir()
+    for pid in (1, 2):
+        registry = Registry()
+        registry.inc('http_requests_total', {'view': 'v'}, 3)
+        data = registry.snapshot()
+        data['gauge']['process_resident_memory_bytes'] = {f'pid="{pid}"': 100}
+        (directory / f'{socket.gethostname()}-{pid}.json').write_text(json.dumps(data))
+
+    first = collect()
+    second = collect()
+
+    assert sorted(path.name for path in directory.glob('*.json')) == [metrics.ARCHIVE_NAME, f'{socket.gethostname()}-1.json']
+    assert first['counter']['http_requests_total']['view="v"'] == 6
+    assert second['counter']['http_requests_total']['view="v"'] == 6
+    assert second['gauge']['process_resident_memory_bytes'] == {'pid="1"': 100}
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_requests_per_url_name(metrics_settings, api_client):
+    metrics_settings.MIDDLEWARE = ['base_feature_project.metrics.MetricsMiddleware', *metrics_settings.MIDDLEWARE]
+
+    api_client.get(reverse('product-list'))
+    response = api_client.get(reverse('metrics'))
+
+    body = response.content.decode()
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert 'http_requests_total{method="GET",status="200",view="product-list"} 1' in body
+    assert 'db_queries_per_request_count{view="product-list"} 1' in body
+    assert 'process_resident_memory_bytes{pid=' in body
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_middleware_counts_queries_run_by_the_async_orm(metrics_settings):
+    async def get_response(request):
+        request.resolver_match = SimpleNamespace(view_name='async-view')
+        await sync_to_async(_select_one)()
+        return HttpResponse()
+
+    middleware = MetricsMiddleware(get_response)
+
+    assert iscoroutinefunction(middleware) is True
+    assert asyncio.run(middleware(RequestFactory().get('/async/'))).status_code == 200
+    snapshot = metrics.registry.snapshot()
+    assert snapshot['counter']['http_requests_total']['method="GET",status="200",view="async-view"'] == 1
+    assert snapshot['histogram']['db_queries_per_request']['view="async-view"']['sum'] == 1
+
+
+def test_async_middleware_flushes_off_the_event_loop(metrics_settings, monkeypatch):
+    calls = []
+    real = metrics.sync_to_async
+
+    def recording_sync_to_async(func, **kwargs):
+        calls.append((func, kwargs))
+        return real(func, **kwargs)
+
+    monkeypatch.setattr(metrics, 'sync_to_async', recording_sync_to_async)
+
+    async def get_response(request):
+        return HttpResponse()
+
+    asyncio.run(MetricsMiddleware(get_response)(RequestFactory().get('/async/')))
+
+    assert calls == [(metrics.registry.flush, {'thread_sensitive': False})]
+    assert [path.name for path in metrics_settings.METRICS_DIR.glob('*.json')] == [f'{socket.gethostname()}-{os.getpid()}.json']
+
+
+def test_metrics_endpoint_is_hidden_when_disabled(settings, api_client):
+    settings.METRICS_ENABLED = False
+    assert api_client.get(reverse('metrics')).status_code == 404
+
+
+def test_metrics_endpoint_requires_token_when_configured(metrics_settings, api_client):
+    metrics_settings.METRICS_TOKEN = 's3cret'
+
+    assert api_client.get(reverse('metrics')).status_code == 403
+    assert api_client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret').status_code == 200
+
+
+def test_instrumented_cache_counts_hits_and_misses(metrics_settings):
+    cache = InstrumentedLocMemCache('metrics-test', {})
+    cache.set('a', 1)
+
+    assert cache.get('a') == 1
+    assert cache.get('missing', 'fallback') == 'fallback'
+    assert cache.get_many(['a', 'b']) == {'a': 1}
+
+    counters = metrics.registry.snapshot()['counter']['cache_requests_total']
+    assert counters['cache="default",result="hit"'] == 2
+    assert counters['cache="default",result="miss"'] == 2
+
+
+def test_huey_signals_record_task_duration(metrics_settings):
+    task = SimpleNamespace(id='t-1', name='purge_password_codes')
+
+    metrics._on_huey_signal(SIGNAL_EXECUTING, task)
+    metrics._on_huey_signal(SIGNAL_COMPLETE, task)
+
+    hist = metrics.registry.snapshot()['histogram']['huey_task_duration_seconds']
+    assert hist['outcome="complete",task="purge_password_codes"']['count'] == 1
+    assert list(metrics_settings.METRICS_DIR.glob('*.json'))
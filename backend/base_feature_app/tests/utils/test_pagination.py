@@ -0,0 +1,94 @@
+import pytest
+from django.core.paginator import EmptyPage
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from base_feature_app.models import Sale
+from base_feature_app.utils import pagination
+from base_feature_app.utils.pagination import (
+    EstimatedCountPagination,
+    EstimatedCountPaginator,
+    estimated_count,
+    estimated_row_count,
+)
+
+
+@pytest.fixture
+def sales(db):
+    for i in range(3):
+        Sale.objects.create(email=f'{i}@example.com', address='A', city='C', state='S', postal_code='1')
+
+
+@pytest.fixture
+def statistics(monkeypatch, settings):
+    settings.ESTIMATED_COUNT_THRESHOLD = 1000
+    rows = {'value': 5000}
+    monkeypatch.setattr(pagination, 'estimated_row_count', lambda model, using='default': rows['value'])
+    return rows
+
+
+@pytest.mark.django_db
+def test_estimated_row_count_is_unavailable_on_sqlite():
+    assert estimated_row_count(Sale) is None
+
+
+def test_estimated_count_uses_statistics_for_large_unfiltered_tables(sales, statistics):
+    assert estimated_count(Sale.objects.order_by('-id')) == 5000
+
+
+def test_estimated_count_is_exact_when_filtered_or_small(sales, statistics):
+    assert estimated_count(Sale.objects.filter(email='0@example.com')) == 1
+    assert estimated_count(Sale.objects.distinct()) == 3
+
+    statistics['value'] = 999
+
+    assert estimated_count(Sale.objects.all()) == 3
+
+
+def test_estimated_count_is_exact_without_statistics(sales, statistics):
+    statistics['value'] = None
+
+    assert estimated_count(Sale.objects.all()) == 3
+
+
+def test_paginator_counts_querysets_with_estimate(sales, statistics):
+    paginator = EstimatedCountPaginator(Sale.objects.order_by('pk'), 2)
+
+    assert paginator.count == 5000
+    assert paginator.num_pages == 2500
+    assert len(paginator.page(1)) == 2
+    assert EstimatedCountPaginator([1, 2, 3], 2).count == 3
+
+
+def test_pagination_is_opt_in(sales):
+    paginator = EstimatedCountPagination()
+    queryset = Sale.objects.order_by('pk')
+
+    assert paginator.paginate_queryset(queryset, Request(RequestFactory().get('/'))) is None
+    page = paginator.paginate_queryset(queryset, Request(RequestFactory().get('/', {'page': '2', 'page_size': '2'})))
+    assert [sale.email for sale in page] == ['2@example.com']
+
+
+def test_paginator_serves_pages_past_an_underestimate(sales, statistics, settings):
+    settings.ESTIMATED_COUNT_THRESHOLD = 1
+    statistics['value'] = 2
+    paginator = EstimatedCountPaginator(Sale.objects.order_by('pk'), 2)
+
+    assert paginator.num_pages == 1
+    assert paginator.page(1).has_next() is True
+    assert [sale.email for sale in paginator.page(2)] == ['2@example.com']
+    assert paginator.page(2).has_next() is False
+    with pytest.raises(EmptyPage):
+        paginator.page(3)
+
+
+def test_next_link_comes_from_rows_not_the_estimate(sales, statistics):
+    paginator = EstimatedCountPagination()
+    request = Request(RequestFactory().get('/', {'page': '2', 'page_size': '2'}))
+
+    paginator.paginate_queryset(Sale.objects.order_by('pk'), request)
+    data = paginator.get_paginated_response([]).data
+
+    assert data['count'] == 5000
+    assert data['next'] is None
+    assert data['previous'] == 'http://testserver/?page_size=2'
@@ -0,0 +1,54 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import make_password
+
+from base_feature_app.utils import password_hashing
+from base_feature_app.utils.password_hashing import BoundedHashingPool, HashingPoolSaturated
+
+
+def test_bounded_pool_returns_function_result():
+    pool = BoundedHashingPool(workers=1, max_queue=0)
+    try:
+        assert async_to_sync(pool.run)(lambda a, b: a + b, 2, 3) == 5
+    finally:
+        pool.shutdown()
+
+
+def test_bounded_pool_rejects_work_when_saturated():
+    """Verifies a job beyond workers + queue is rejected instead of queued."""
+    pool = BoundedHashingPool(workers=1, max_queue=0)
+    assert pool._slots.acquire(blocking=False)
+
+    try:
+        with pytest.raises(HashingPoolSaturated):
+            async_to_sync(pool.run)(lambda: None)
+    finally:
+        pool._slots.release()
+        pool.shutdown()
+
+
+def test_bounded_pool_releases_slot_when_job_raises():
+    pool = BoundedHashingPool(workers=1, max_queue=0)
+
+    def boom():
+        raise ValueError('boom')
+
+    try:
+        with pytest.raises(ValueError):
+            async_to_sync(pool.run)(boom)
+        assert async_to_sync(pool.run)(lambda: 'ok') == 'ok'
+    finally:
+        pool.shutdown()
+
+
+def test_async_hash_helpers_roundtrip(settings, monkeypatch):
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    monkeypatch.setattr(password_hashing, '_pool', None)
+    settings.PASSWORD_HASHING_WORKERS = 1
+    settings.PASSWORD_HASHING_MAX_QUEUE = 1
+
+    encoded = async_to_sync(password_hashing.amake_password)('secret-pass')
+
+    assert async_to_sync(password_hashing.acheck_password)('secret-pass', encoded) is True
+    assert async_to_sync(password_hashing.acheck_password)('wrong', make_password('secret-pass')) is False
+    password_hashing._pool.shutdown()
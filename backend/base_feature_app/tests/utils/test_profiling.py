@@ -0,0 +1,167 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+from base_feature_project import profiling
+from base_feature_project.profiling import (
+    ProfileBuffer,
+    SamplingProfilerMiddleware,
+    aggregate_samples,
+    collect_spool,
+    fingerprint_sql,
+    merge_profiles,
+)
+
+PROFILER = 'base_feature_project.profiling.SamplingProfilerMiddleware'
+
+
+def _select_one():
+    try:
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    finally:
+        connections.close_all()
+
+
+@pytest.fixture
+def profiler_settings(settings, tmp_path):
+    settings.PROFILING_SPOOL_DIR = tmp_path / 'spool'
+    settings.PROFILING_REPORTS_DIR = tmp_path / 'reports'
+    settings.PROFILING_FLUSH_SECONDS = 3600
+    settings.PROFILING_TOP_SQL = 50
+    settings.N_PLUS_ONE_THRESHOLD = 3
+    profiling._buffer = None
+    yield settings
+    profiling._buffer = None
+
+
+def test_fingerprint_sql_strips_literals_and_in_lists():
+    a = fingerprint_sql("SELECT * FROM t WHERE id = 1 AND name = 'it''s'  AND x IN (1, 2, 3)")
+    b = fingerprint_sql("SELECT * FROM t WHERE id = 42 AND name = 'bob' AND x IN (7)")
+
+    assert a == b == 'SELECT * FROM t WHERE id = %s AND name = %s AND x IN (...)'
+    assert fingerprint_sql('SELECT "t1"."id" FROM "t1" WHERE "t1"."pk" IN (%s, %s)') == (
+        'SELECT "t1"."id" FROM "t1" WHERE "t1"."pk" IN (...)'
+    )
+
+
+def _product_list_profile():
+    repeated = [('SELECT * FROM p WHERE id = %s', 1.0)] * 3
+    return aggregate_samples([
+        ('product-list', 12.0, repeated),
+        ('product-list', 700.0, [('SELECT 1', 5.0)]),
+    ])
+
+
+def test_aggregate_samples_builds_latency_histograms(profiler_settings):
+    profile = _product_list_profile()
+
+    view = profile['views']['product-list']
+    assert profile['samples'] == 2
+    assert view['count'] == 2
+    assert view['max_ms'] == 700.0
+    assert view['buckets'][profiling.bucket_index(12.0)] == 1
+    assert view['buckets'][profiling.bucket_index(700.0)] == 1
+
+
+def test_aggregate_samples_counts_queries_and_flags_n_plus_one(profiler_settings):
+    profile = _product_list_profile()
+
+    view = profile['views']['product-list']
+    assert view['queries'] == 4
+    assert view['max_queries'] == 3
+    assert view['n_plus_one'] == 1
+    assert profile['sql']['SELECT * FROM p WHERE id = %s']['count'] == 3
+
+
+def test_merge_profiles_keeps_top_sql_by_total_time(profiler_settings):
+    a = aggregate_samples([('v', 1.0, [('SELECT 1', 10.0), ('SELECT a', 1.0)])])
+    b = aggregate_samples([('v', 2.0, [('SELECT 2', 5.0), ('SELECT b', 0.5)])])
+
+    merged = merge_profiles(a, b, top_n=2)
+
+    assert merged['samples'] == 2
+    assert merged['views']['v']['count'] == 2
+    assert set(merged['sql']) == {'SELECT %s', 'SELECT a'}
+    assert merged['sql']['SELECT %s']['count'] == 2
+
+
+def test_ring_buffer_drops_oldest_samples(profiler_settings):
+    buffer = ProfileBuffer(size=2)
+    for i in range(3):
+        buffer.record(f'view-{i}', 1.0, [])
+
+    assert set(buffer.drain()['views']) == {'view-1', 'view-2'}
+    assert len(buffer) == 0
+
+
+@pytest.mark.django_db
+def test_middleware_samples_requests_and_flushes_to_spool(profiler_settings, api_client):
+    profiler_settings.MIDDLEWARE = [PROFILER, *profiler_settings.MIDDLEWARE]
+    profiler_settings.PROFILING_SAMPLE_RATE = 1.0
+
+    assert api_client.get(reverse('product-list')).status_code == 200
+
+    buffer = profiling.get_buffer()
+    assert len(buffer) == 1
+    path = buffer.flush()
+    data = json.loads(path.read_text())
+    assert data['views']['product-list']['count'] == 1
+    assert data['views']['product-list']['queries'] >= 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_middleware_records_queries_run_by_the_async_orm(profiler_settings):
+    profiler_settings.PROFILING_SAMPLE_RATE = 1.0
+
+    async def get_response(request):
+        request.resolver_match = SimpleNamespace(view_name='async-view')
+        await sync_to_async(_select_one)()
+        return 'response'
+
+    middleware = SamplingProfilerMiddleware(get_response)
+
+    assert iscoroutinefunction(middleware) is True
+    assert asyncio.run(middleware(RequestFactory().get('/async/'))) == 'response'
+    view = profiling.get_buffer().drain()['views']['async-view']
+    assert view['count'] == 1
+    assert view['queries'] == 1
+
+
+@pytest.mark.django_db
+def test_middleware_skips_unsampled_requests(profiler_settings, api_client):
+    profiler_settings.MIDDLEWARE = [PROFILER, *profiler_settings.MIDDLEWARE]
+    profiler_settings.PROFILING_SAMPLE_RATE = 0.0
+
+    api_client.get(reverse('product-list'))
+
+    assert len(profiling.get_buffer()) == 0
+
+
+def test_collect_spool_merges_worker_files_into_daily_summary(profiler_settings):
+    for view in ('a', 'b'):
+        buffer = ProfileBuffer(size=10)
+        buffer.record(view, 3.0, [('SELECT 1', 1.0)])
+        buffer.flush()
+    (profiler_settings.PROFILING_SPOOL_DIR / 'broken.json').write_text('{')
+
+    merged, summary_path = collect_spool(day='2026-01-01')
+
+    summary = json.loads(summary_path.read_text())
+    assert merged == 2
+    assert summary['samples'] == 2
+    assert set(summary['views']) == {'a', 'b'}
+    assert list(profiler_settings.PROFILING_SPOOL_DIR.glob('*.json')) == []
+
+
+def test_aggregate_profiling_data_task_skips_when_disabled(profiler_settings):
+    from base_feature_project.tasks import aggregate_profiling_data
+
+    profiler_settings.PROFILING_ENABLED = False
+    assert aggregate_profiling_data.call_local() is None
@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import reverse
+from django_attachments.models import Attachment, Library
+from rest_framework.views import APIView
+
+from base_feature_app.models import Blog, Product, Sale, SoldProduct
+from base_feature_project import query_budget as query_budget_module
+from base_feature_project.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    get_query_budget,
+    query_budget,
+)
+
+
+def _request_for(view, queries):
+    def get_response(request):
+        request.resolver_match = SimpleNamespace(func=view, view_name='budgeted', _func_path='budgeted')
+        with connection.cursor() as cursor:
+            for _ in range(queries):
+                cursor.execute('SELECT 1')
+        return 'response'
+
+    return QueryBudgetMiddleware(get_response), RequestFactory().get('/budgeted/')
+
+
+@query_budget(2)
+def _budgeted_view(request):
+    return None
+
+
+def _library_with_attachments(count):
+    library = Library.objects.create(title='Gallery')
+    for i in range(count):
+        Attachment.objects.create(library=library, file=SimpleUploadedFile(f'image-{i}.txt', b'x'))
+    return library
+
+
+def test_query_budget_is_found_on_functions_and_classes():
+    @query_budget(4)
+    class BudgetedAPIView(APIView):
+        pass
+
+    assert get_query_budget(_budgeted_view) == 2
+    assert get_query_budget(BudgetedAPIView.as_view()) == 4
+    assert get_query_budget(lambda request: None) is None
+
+
+@pytest.mark.django_db
+def test_middleware_raises_when_budget_is_exceeded(settings):
+    middleware, request = _request_for(_budgeted_view, queries=3)
+
+    with pytest.raises(QueryBudgetExceeded, match='ran 3 queries, budget is 2'):
+        middleware(request)
+
+
+@pytest.mark.django_db
+def test_middleware_passes_requests_within_budget(settings):
+    middleware, request = _request_for(_budgeted_view, queries=2)
+
+    assert middleware(request) == 'response'
+
+
+@pytest.mark.django_db
+def test_middleware_only_logs_in_log_mode(settings):
+    settings.QUERY_BUDGET_MODE = 'log'
+    middleware, request = _request_for(_budgeted_view, queries=3)
+
+    with patch.object(query_budget_module.logger, 'warning') as warning:
+        assert middleware(request) == 'response'
+
+    assert 'ran 3 queries, budget is 2' in warning.call_args.args[0]
+
+
+@pytest.mark.django_db
+def test_product_list_query_count_does_not_grow_with_products(api_client, settings, tmp_path,
+                                                             django_assert_max_num_queries):
+    settings.MEDIA_ROOT = tmp_path
+    for i in range(5):
+        Product.objects.create(
+            title=f'Product {i}', category='Cat', sub_category='Sub', description='Desc', price=10,
+            gallery=_library_with_attachments(2),
+        )
+
+    with django_assert_max_num_queries(2):
+        response = api_client.get(reverse('product-list'))
+
+    assert response.status_code == 200
+    assert all(len(item['gallery_urls']) == 2 for item in response.json())
+
+
+@pytest.mark.django_db
+def test_blog_lists_prefetch_images(api_client, settings, tmp_path, django_assert_max_num_queries):
+    settings.MEDIA_ROOT = tmp_path
+    for i in range(5):
+        Blog.objects.create(title=f'Blog {i}', description='Desc', category='Cat', image=_library_with_attachments(1))
+
+    for url in (reverse('blog-list'), reverse('blogs')):
+        with django_assert_max_num_queries(2):
+            response = api_client.get(url)
+        assert all(item['image_url'] for item in response.json())
+
+
+@pytest.mark.django_db
+def test_sale_detail_prefetches_sold_products(authenticated_client, settings, tmp_path,
+                                              django_assert_max_num_queries):
+    settings.MEDIA_ROOT = tmp_path
+    sale = Sale.objects.create(email='buyer@example.com', address='A', city='C', state='S', postal_code='1')
+    for i in range(4):
+        product = Product.objects.create(
+            title=f'Product {i}', category='Cat', sub_category='Sub', description='Desc', price=10,
+            gallery=_library_with_attachments(2),
+        )
+        sale.sold_products.add(SoldProduct.objects.create(product=product, quantity=1))
+
+    with django_assert_max_num_queries(3):
+        response = authenticated_client.get(reverse('sale-detail', args=[sale.id]))
+
+    assert response.status_code == 200
+    assert len(response.json()['sold_products']) == 4
+
+
+@pytest.mark.django_db
+def test_create_sale_rejects_unknown_products(api_client):
+    payload = {
+        'email': 'buyer@example.com', 'address': 'A', 'city': 'C', 'state': 'S', 'postal_code': '1',
+        'sold_products': [{'product_id': 999, 'quantity': 1}],
+    }
+
+    response = api_client.post(reverse('create-sale'), payload, format='json')
+
+    assert response.status_code == 400
+    assert Sale.objects.count() == 0
@@ -0,0 +1,79 @@
+import asyncio
+import contextvars
+import threading
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import connection, connections
+from django.test import RequestFactory
+
+from base_feature_project.query_budget import QueryBudgetExceeded, QueryBudgetMiddleware, query_budget
+from base_feature_project.query_hooks import instrument_queries
+
+
+class _Recorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+def _run_queries(count):
+    try:
+        with connection.cursor() as cursor:
+            for _ in range(count):
+                cursor.execute('SELECT 1')
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connections.close_all()
+
+
+@query_budget(2)
+def _budgeted_view(request):
+    return None
+
+
+@pytest.mark.django_db
+def test_instrument_queries_sees_connections_opened_in_other_threads():
+    with instrument_queries(_Recorder()) as recorder:
+        # A new thread gets its own connection, like a request's executor thread under ASGI.
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(_run_queries, 2))
+        thread.start()
+        thread.join()
+        _run_queries(1)
+    _run_queries(1)
+
+    assert recorder.queries == ['SELECT 1'] * 3
+
+
+@pytest.mark.django_db
+def test_nested_hooks_wrap_in_activation_order():
+    calls = []
+
+    def hook(name):
+        def wrapper(execute, sql, params, many, context):
+            calls.append(name)
+            return execute(sql, params, many, context)
+        return wrapper
+
+    with instrument_queries(hook('outer')), instrument_queries(hook('inner')):
+        _run_queries(1)
+
+    assert calls == ['outer', 'inner']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_query_budget_middleware_counts_async_orm_queries():
+    async def get_response(request):
+        request.resolver_match = SimpleNamespace(func=_budgeted_view, view_name='budgeted', _func_path='budgeted')
+        await sync_to_async(_run_queries)(3)
+        return 'response'
+
+    middleware = QueryBudgetMiddleware(get_response)
+
+    assert iscoroutinefunction(middleware) is True
+    with pytest.raises(QueryBudgetExceeded, match='ran 3 queries, budget is 2'):
+        asyncio.run(middleware(RequestFactory().get('/budgeted/')))
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from base_feature_app.utils import rate_limit as rate_limit_module
+from base_feature_app.utils.rate_limit import (
+    SlidingWindowRateLimiter,
+    check_rate_limit,
+    get_client_ip,
+    parse_rate,
+    rate_limit,
+)
+
+
+def test_parse_rate_supports_periods():
+    assert parse_rate('5/m') == (5, 60)
+    assert parse_rate('20/h') == (20, 3600)
+
+
+def test_parse_rate_rejects_unknown_period():
+    with pytest.raises(ValueError):
+        parse_rate('5/week')
+
+
+def test_limiter_blocks_after_limit_within_window():
+    limiter = SlidingWindowRateLimiter('test', limit=2, window=60)
+
+    assert limiter.hit('client', now=1000.0) == (True, 0)
+    assert limiter.hit('client', now=1001.0) == (True, 0)
+    allowed, retry_after = limiter.hit('client', now=1002.0)
+
+    assert allowed is False
+    assert 0 < retry_after <= 60
+
+
+def test_limiter_weights_previous_window():
+    """Verifies hits from the previous bucket still count, decaying as the window slides."""
+    limiter = SlidingWindowRateLimiter('test', limit=2, window=60)
+    for identifier in ('early', 'late'):
+        limiter.hit(identifier, now=1190.0)
+        limiter.hit(identifier, now=1191.0)
+
+    # Early in the next bucket most of the previous hits still count.
+    assert limiter.hit('early', now=1201.0)[0] is False
+    # Near the end of the next bucket the previous hits have mostly decayed.
+    assert limiter.hit('late', now=1259.0)[0] is True
+
+
+def test_limiter_keys_are_isolated_per_identifier():
+    limiter = SlidingWindowRateLimiter('test', limit=1, window=60)
+
+    assert limiter.hit('a', now=1000.0)[0] is True
+    assert limiter.hit('b', now=1000.0)[0] is True
+    assert limiter.hit('a', now=1000.0)[0] is False
+
+
+def test_get_client_ip_ignores_forwarded_for_without_trusted_proxy(settings):
+    settings.RATE_LIMIT_PROXY_COUNT = 0
+    request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='1.1.1.1', REMOTE_ADDR='10.0.0.1')
+
+    assert get_client_ip(request) == '10.0.0.1'
+
+
+def test_get_client_ip_uses_hop_added_by_trusted_proxy(settings):
+    settings.RATE_LIMIT_PROXY_COUNT = 1
+    request = RequestFactory().get(
+        '/', HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7', REMOTE_ADDR='127.0.0.1',
+    )
+
+    assert get_client_ip(request) == '203.0.113.7'
+
+
+def test_check_rate_limit_is_noop_when_disabled(settings):
+    settings.RATE_LIMIT_ENABLED = False
+    settings.RATE_LIMITS = {'sign_in': {'ip': '0/m'}}
+    request = RequestFactory().post('/')
+
+    assert check_rate_limit('sign_in', request) is None
+
+
+def test_check_rate_limit_reads_email_from_json_body(settings):
+    settings.RATE_LIMITS = {'sign_in': {'email': '1/m'}}
+    factory = RequestFactory()
+
+    def make_request(ip):
+        return factory.post(
+            '/', data='{"email": "Victim@Example.com"}', content_type='application/json', REMOTE_ADDR=ip,
+        )
+
+    assert check_rate_limit('sign_in', make_request('10.0.0.1')) is None
+    assert check_rate_limit('sign_in', make_request('10.0.0.2')) is not None
+
+
+def test_async_views_check_limits_outside_the_shared_sync_thread(settings, monkeypatch):
+    settings.RATE_LIMITS = {'sign_in': {'ip': '1/m'}}
+    calls = []
+    real = rate_limit_module.sync_to_async
+
+    def recording_sync_to_async(func, **kwargs):
+        calls.append(kwargs)
+        return real(func, **kwargs)
+
+    monkeypatch.setattr(rate_limit_module, 'sync_to_async', recording_sync_to_async)
+
+    @rate_limit('sign_in')
+    async def view(request):
+        return HttpResponse()
+
+    request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.9')
+    assert asyncio.run(view(request)).status_code == 200
+    assert asyncio.run(view(request)).status_code == 429
+    assert calls == [{'thread_sensitive': False}] * 2
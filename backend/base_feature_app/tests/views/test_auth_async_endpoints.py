@@ -0,0 +1,98 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from rest_framework import status
+
+from base_feature_app.utils.password_hashing import HashingPoolSaturated
+from base_feature_app.views import auth_async
+
+
+def _post(view, payload):
+    request = RequestFactory().post('/api/', data=json.dumps(payload), content_type='application/json')
+    return async_to_sync(view)(request)
+
+
+@pytest.fixture(autouse=True)
+def fast_hasher(settings):
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@pytest.mark.django_db
+@patch('base_feature_app.views.auth_async.verify_recaptcha', return_value=True)
+def test_async_sign_up_creates_user(mock_captcha):
+    response = _post(auth_async.sign_up, {
+        'email': 'Async@Example.com',
+        'password': 'pass1234',
+        'first_name': 'Async',
+    })
+
+    assert response.status_code == status.HTTP_201_CREATED
+    body = json.loads(response.content)
+    assert 'access' in body
+    user = get_user_model().objects.get(email='async@example.com')
+    assert user.first_name == 'Async'
+    assert user.check_password('pass1234') is True
+
+
+@pytest.mark.django_db
+@patch('base_feature_app.views.auth_async.verify_recaptcha', return_value=True)
+def test_async_sign_up_rejects_existing_email(mock_captcha):
+    get_user_model().objects.create_user(email='taken@example.com', password='pass1234')
+
+    response = _post(auth_async.sign_up, {'email': 'taken@example.com', 'password': 'pass1234'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert json.loads(response.content)['error'] == 'User with this email already exists'
+
+
+@pytest.mark.django_db
+@patch('base_feature_app.views.auth_async.verify_recaptcha', return_value=True)
+def test_async_sign_in_success_and_wrong_password(mock_captcha):
+    get_user_model().objects.create_user(email='user@example.com', password='pass1234')
+
+    ok = _post(auth_async.sign_in, {'email': 'user@example.com', 'password': 'pass1234'})
+    bad = _post(auth_async.sign_in, {'email': 'user@example.com', 'password': 'wrong'})
+
+    assert ok.status_code == status.HTTP_200_OK
+    assert json.loads(ok.content)['user']['email'] == 'user@example.com'
+    assert bad.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+@patch('base_feature_app.views.auth_async.verify_recaptcha', return_value=True)
+def test_async_sign_in_returns_503_when_hashing_pool_is_saturated(mock_captcha):
+    """Verifies sign-in sheds load with 503 + Retry-After when the hashing pool is full."""
+    get_user_model().objects.create_user(email='busy@example.com', password='pass1234')
+
+    with patch('base_feature_app.views.auth_async.acheck_password', side_effect=HashingPoolSaturated):
+        response = _post(auth_async.sign_in, {'email': 'busy@example.com', 'password': 'pass1234'})
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response['Retry-After'] == '1'
+
+
+@pytest.mark.django_db
+@patch('base_feature_app.views.auth_async.verify_recaptcha', return_value=False)
+def test_async_sign_in_rejects_failed_captcha(mock_captcha):
+    response = _post(auth_async.sign_in, {'email': 'user@example.com', 'password': 'pass1234'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'captcha_token' in json.loads(response.content)
+
+
+def test_async_sign_in_rejects_malformed_json():
+    request = RequestFactory().post('/api/', data='{not json', content_type='application/json')
+
+    response = async_to_sync(auth_async.sign_in)(request)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_async_sign_in_rejects_get():
+    response = async_to_sync(auth_async.sign_in)(RequestFactory().get('/api/'))
+
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
@@ -10,6 +10,8 @@ from freezegun import freeze_time
 from rest_framework import status
 
 from base_feature_app.models import PasswordCode
+from base_feature_app.models.password_code import PasswordCodeQuerySet
+from base_feature_app.utils.auth_utils import generate_auth_tokens
 from base_feature_app.views import auth as auth_views
 
 
@@ -378,12 +380,12 @@ def test_verify_passcode_rejects_invalid_email(api_client):
 @pytest.mark.django_db
 @freeze_time('2026-01-15 10:00:00')
 def test_verify_passcode_rejects_expired_code(api_client):
-    """Verifies passcode verification returns 400 when the code was created more than 15 minutes ago."""
+    """Verifies passcode verification returns 400 when the code is past its expires_at."""
     User = get_user_model()
     user = User.objects.create_user(email='expired@example.com', password='pass1234')
     password_code = PasswordCode.objects.create(user=user, code='111111')
     PasswordCode.objects.filter(id=password_code.id).update(
-        created_at=timezone.now() - timedelta(minutes=16)
+        expires_at=timezone.now() - timedelta(minutes=1)
     )
 
     response = api_client.post(
@@ -406,7 +408,7 @@ def test_verify_passcode_handles_exception(api_client, monkeypatch):
     def boom(_self):
         raise Exception('boom')
 
-    monkeypatch.setattr(PasswordCode, 'is_valid', boom)
+    monkeypatch.setattr(PasswordCodeQuerySet, 'active', boom)
 
     response = api_client.post(
         reverse('verify_passcode_reset'),
@@ -504,3 +506,68 @@ def test_validate_token_success(api_client):
 
     assert response.status_code == status.HTTP_200_OK
     assert response.json()['valid'] is True
+
+
+@pytest.mark.django_db
+def test_validate_token_with_bearer_token_skips_database(api_client, django_assert_num_queries):
+    """Verifies validate_token answers from the signed claims without querying the user table."""
+    User = get_user_model()
+    user = User.objects.create_user(email='token@example.com', password='pass1234', first_name='Ada')
+    access = generate_auth_tokens(user)['access']
+
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+    with django_assert_num_queries(0):
+        response = api_client.get(reverse('validate_token'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['user'] == {
+        'id': user.id,
+        'email': 'token@example.com',
+        'first_name': 'Ada',
+        'last_name': '',
+        'role': user.role,
+        'is_staff': False,
+    }
+
+
+@pytest.mark.django_db
+@patch('base_feature_app.views.auth.verify_recaptcha', return_value=True)
+def test_sign_in_is_throttled_per_email_before_db_lookup(mock_captcha, api_client, settings):
+    """Verifies sign-in answers 429 once the per-email limit is hit, without touching the user table."""
+    settings.RATE_LIMITS = {'sign_in': {'email': '2/m'}}
+    payload = {'email': 'target@example.com', 'password': 'wrong'}
+
+    for _ in range(2):
+        assert api_client.post(reverse('sign_in'), payload, format='json').status_code == status.HTTP_401_UNAUTHORIZED
+
+    with patch.object(get_user_model().objects, 'get') as mock_get:
+        response = api_client.post(reverse('sign_in'), payload, format='json')
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response['Retry-After']) > 0
+    mock_get.assert_not_called()
+    mock_captcha.assert_called()
+    assert mock_captcha.call_count == 2
+
+
+@pytest.mark.django_db
+def test_send_passcode_is_throttled_per_ip(api_client, settings):
+    settings.RATE_LIMITS = {'send_passcode': {'ip': '1/h'}}
+
+    first = api_client.post(reverse('send_passcode'), {'email': 'a@example.com'}, format='json')
+    second = api_client.post(reverse('send_passcode'), {'email': 'b@example.com'}, format='json')
+
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.django_db
+def test_verify_passcode_is_throttled_per_email(api_client, settings):
+    settings.RATE_LIMITS = {'verify_passcode': {'email': '1/h'}}
+    payload = {'email': 'guess@example.com', 'code': '000000', 'new_password': 'newpass'}
+
+    first = api_client.post(reverse('verify_passcode_reset'), payload, format='json')
+    second = api_client.post(reverse('verify_passcode_reset'), payload, format='json')
+
+    assert first.status_code == status.HTTP_400_BAD_REQUEST
+    assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
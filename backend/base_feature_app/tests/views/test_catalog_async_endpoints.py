@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from django_attachments.models import Library
+from rest_framework import status
+
+from base_feature_app.models import Blog, Product, StagingPhaseBanner
+from base_feature_app.views import blog_crud, catalog_async, product_crud, staging_phase_banner
+
+
+def _call(view, method='get', **kwargs):
+    request = getattr(RequestFactory(), method)('/api/')
+    response = view(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def _json(response):
+    return json.loads(response.content)
+
+
+@pytest.fixture
+def catalog(db):
+    for i in range(3):
+        Product.objects.create(
+            title=f'Product {i}', category='Cat', sub_category='Sub', description='Desc', price=10 + i,
+            gallery=Library.objects.create(title=f'Gallery {i}'),
+        )
+        Blog.objects.create(
+            title=f'Blog {i}', description='Desc', category='Cat', image=Library.objects.create(title=f'Image {i}'),
+        )
+
+
+def test_async_lists_match_sync_views(catalog):
+    for async_view, sync_view in ((catalog_async.products, product_crud.products),
+                                  (catalog_async.blogs, blog_crud.blogs)):
+        response = _call(async_to_sync(async_view))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert _json(response) == _json(_call(sync_view))
+        assert len(_json(response)) == 3
+
+
+def test_async_details_match_sync_views(catalog):
+    product = Product.objects.first()
+    blog = Blog.objects.first()
+
+    product_response = _call(async_to_sync(catalog_async.product_detail), product_id=product.id)
+    blog_response = _call(async_to_sync(catalog_async.blog_detail), blog_id=blog.id)
+
+    assert _json(product_response) == _json(_call(product_crud.product_detail, product_id=product.id))
+    assert _json(blog_response) == _json(_call(blog_crud.blog_detail, blog_id=blog.id))
+
+
+@pytest.mark.django_db
+def test_async_details_return_404_for_missing_rows():
+    assert _call(async_to_sync(catalog_async.product_detail), product_id=999).status_code == 404
+    assert _call(async_to_sync(catalog_async.blog_detail), blog_id=999).status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_writes_are_delegated_to_sync_views():
+    response = _call(async_to_sync(catalog_async.products), method='post')
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_async_staging_banner_creates_singleton():
+    response = _call(async_to_sync(catalog_async.staging_banner_state))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert _json(response) == _json(_call(staging_phase_banner.staging_banner_state))
+    assert StagingPhaseBanner.objects.count() == 1
+
+
+def test_async_paginated_lists_are_delegated_to_sync_views(catalog):
+    request = RequestFactory().get('/api/', {'page': '1', 'page_size': '2'})
+    response = async_to_sync(catalog_async.products)(request)
+    response.render()
+
+    body = _json(response)
+    assert body['count'] == 3
+    assert len(body['results']) == 2
+    assert body['next'] is not None
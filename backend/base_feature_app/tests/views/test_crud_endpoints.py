@@ -47,3 +47,23 @@ def test_sales_list_requires_staff(api_client):
     url = reverse('sale-list')
     response = api_client.get(url)
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_sales_list_paginates_on_request(api_client, staff_user):
+    from base_feature_app.models import Sale
+
+    for i in range(3):
+        Sale.objects.create(email=f'{i}@example.com', address='A', city='C', state='S', postal_code='1')
+    api_client.force_authenticate(user=staff_user)
+    url = reverse('sale-list')
+
+    plain = api_client.get(url)
+    first = api_client.get(url, {'page': 1, 'page_size': 2})
+    second = api_client.get(url, {'page': 2, 'page_size': 2})
+
+    assert len(plain.json()) == 3
+    assert first.json()['count'] == 3
+    assert [sale['email'] for sale in first.json()['results']] == ['2@example.com', '1@example.com']
+    assert [sale['email'] for sale in second.json()['results']] == ['0@example.com']
+    assert second.json()['next'] is None
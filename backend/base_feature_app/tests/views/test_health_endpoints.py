@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+from django.urls import reverse
+
+from base_feature_project import health
+
+
+@pytest.fixture(autouse=True)
+def health_probes(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path
+    settings.HEALTH_CHECK_CACHE_SECONDS = 5
+    # No Redis in the test environment.
+    monkeypatch.setitem(health.PROBES, 'redis', lambda: None)
+    health.clear_health_memo()
+    yield
+    health.clear_health_memo()
+
+
+@pytest.mark.django_db
+def test_health_check_returns_identity(api_client):
+    response = api_client.get(reverse('health-check'))
+
+    assert response.status_code == 200
+    assert response.json()['status'] == 'ok'
+    assert 'environment' in response.json()
+
+
+@pytest.mark.django_db
+def test_dependency_health_probes_every_dependency(api_client, tmp_path):
+    response = api_client.get(reverse('health-check-deep'))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['status'] == 'ok'
+    assert set(body['checks']) == {'database', 'redis', 'cache', 'storage'}
+    assert all(check['ok'] and check['latency_ms'] >= 0 for check in body['checks'].values())
+    assert not list((tmp_path / 'health').iterdir())
+
+
+@pytest.mark.django_db
+def test_dependency_health_reports_failed_dependency(api_client, monkeypatch):
+    def broken():
+        raise ConnectionError('redis://secret@host refused')
+
+    monkeypatch.setitem(health.PROBES, 'redis', broken)
+
+    response = api_client.get(reverse('health-check-deep'))
+
+    assert response.status_code == 503
+    body = response.json()
+    assert body['status'] == 'degraded'
+    assert body['checks']['redis'] == {'ok': False, 'latency_ms': body['checks']['redis']['latency_ms'],
+                                       'error': 'ConnectionError'}
+    assert body['checks']['database']['ok'] is True
+
+
+@pytest.mark.django_db
+def test_dependency_health_is_memoized(api_client, monkeypatch):
+    calls = []
+    monkeypatch.setitem(health.PROBES, 'redis', lambda: calls.append(1))
+
+    for _ in range(3):
+        assert api_client.get(reverse('health-check-deep')).status_code == 200
+
+    assert len(calls) == 1
+
+
+def test_run_probes_reports_slow_probe_as_timed_out(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(health, 'PROBES', {'slow': release.wait, 'fast': lambda: None})
+
+    try:
+        checks = health.run_probes(timeout=0.05)
+    finally:
+        release.set()
+
+    assert checks['fast']['ok'] is True
+    assert checks['slow'] == {'ok': False, 'latency_ms': 50.0, 'error': 'timed out'}
+
+
+def test_hung_probe_is_not_resubmitted_and_does_not_starve_the_others(monkeypatch):
+    release = threading.Event()
+    started = []
+
+    def hung():
+        started.append(1)
+        release.wait()
+
+    probes = {'hung': hung, **{f'fast{i}': (lambda: None) for i in range(3)}}
+    monkeypatch.setattr(health, 'PROBES', probes)
+
+    try:
+        rounds = [health.run_probes(timeout=0.05) for _ in range(2)]
+    finally:
+        release.set()
+
+    assert len(started) == 1
+    assert [checks['hung']['error'] for checks in rounds] == ['timed out', 'timed out']
+    assert {checks[f'fast{i}']['ok'] for checks in rounds for i in range(3)} == {True}
+
+
+def test_callers_get_the_previous_result_while_a_round_runs(monkeypatch):
+    monkeypatch.setattr(health, 'run_probes', lambda: {'database': {'ok': True}})
+    previous = health.deep_health(now=100.0)
+
+    with health._refresh_lock:
+        assert health.deep_health(now=200.0) == previous
@@ -2,6 +2,9 @@ import pytest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from base_feature_app.models import BlacklistedRefreshToken
 
 
 @pytest.mark.django_db
@@ -14,3 +17,69 @@ def test_token_obtain_pair_with_email_success(api_client):
     assert response.status_code == status.HTTP_200_OK
     assert 'access' in response.json()
     assert 'refresh' in response.json()
+
+
+@pytest.mark.django_db
+def test_token_obtain_pair_embeds_user_claims(api_client):
+    User = get_user_model()
+    User.objects.create_user(email='claims@example.com', password='pass1234', first_name='Ada')
+
+    response = api_client.post(
+        reverse('token_obtain_pair'), {'email': 'claims@example.com', 'password': 'pass1234'}, format='json',
+    )
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+    user = api_client.get(reverse('validate_token')).json()['user']
+
+    assert user['email'] == 'claims@example.com'
+    assert user['first_name'] == 'Ada'
+
+
+@pytest.mark.django_db
+def test_token_refresh_rotates_and_blacklists_used_token(api_client):
+    User = get_user_model()
+    User.objects.create_user(email='rotate@example.com', password='pass1234')
+    tokens = api_client.post(
+        reverse('token_obtain_pair'), {'email': 'rotate@example.com', 'password': 'pass1234'}, format='json',
+    ).json()
+
+    first = api_client.post(reverse('token_refresh'), {'refresh': tokens['refresh']}, format='json')
+    replay = api_client.post(reverse('token_refresh'), {'refresh': tokens['refresh']}, format='json')
+
+    assert first.status_code == status.HTTP_200_OK
+    assert first.json()['refresh'] != tokens['refresh']
+    assert replay.status_code == status.HTTP_401_UNAUTHORIZED
+    assert BlacklistedRefreshToken.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_token_refresh_accepts_rotated_token(api_client):
+    User = get_user_model()
+    User.objects.create_user(email='rotate2@example.com', password='pass1234')
+    refresh = api_client.post(
+        reverse('token_obtain_pair'), {'email': 'rotate2@example.com', 'password': 'pass1234'}, format='json',
+    ).json()['refresh']
+
+    for _ in range(3):
+        response = api_client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        refresh = response.json()['refresh']
+
+    assert BlacklistedRefreshToken.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_token_refresh_restamps_claims_from_current_user(api_client):
+    User = get_user_model()
+    user = User.objects.create_user(email='demoted@example.com', password='pass1234', role=User.Role.ADMIN,
+                                    is_staff=True)
+    refresh = api_client.post(
+        reverse('token_obtain_pair'), {'email': 'demoted@example.com', 'password': 'pass1234'}, format='json',
+    ).json()['refresh']
+    user.role = User.Role.CUSTOMER
+    user.is_staff = False
+    user.save()
+
+    tokens = api_client.post(reverse('token_refresh'), {'refresh': refresh}, format='json').json()
+
+    assert AccessToken(tokens['access'])['is_staff'] is False
+    assert RefreshToken(tokens['refresh'])['role'] == User.Role.CUSTOMER
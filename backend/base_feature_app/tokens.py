@@ -0,0 +1,44 @@
+"""
+Refresh token class backed by ``BlacklistedRefreshToken``.
+
+``rest_framework_simplejwt.token_blacklist`` keeps every issued token in an
+``OutstandingToken`` table and joins it on each refresh. We only need to know
+whether a rotated token was already used, so the blacklist stores hashed jtis
+and nothing is written for tokens that are merely issued.
+"""
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from base_feature_app.models import BlacklistedRefreshToken
+
+
+class BlacklistingRefreshToken(RefreshToken):
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if BlacklistedRefreshToken.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        """
+        Revoke this token.
+
+        The insert on the primary key is the claim: if two refreshes race with
+        the same token, only one of them gets to rotate it.
+        """
+        try:
+            with transaction.atomic():
+                return BlacklistedRefreshToken.objects.create(
+                    jti_hash=BlacklistedRefreshToken.hash_jti(self.payload[api_settings.JTI_CLAIM]),
+                    expires_at=datetime_from_epoch(self.payload['exp']),
+                )
+        except IntegrityError:
+            raise TokenError(_('Token is blacklisted'))
+
+    def outstand(self):
+        """Issued tokens are not tracked; only revoked ones are stored."""
+        return None
@@ -1,9 +1,14 @@
+from django.conf import settings
 from django.urls import path
-from base_feature_app.views import auth
+from base_feature_app.views import auth, auth_async
+
+# Under ASGI, sign up / sign in are served by async views that hash
+# passwords on a bounded pool (DJANGO_ASYNC_VIEWS=true).
+_auth_views = auth_async if settings.ASYNC_VIEWS_ENABLED else auth
 
 urlpatterns = [
-    path('sign_up/', auth.sign_up, name='sign_up'),
-    path('sign_in/', auth.sign_in, name='sign_in'),
+    path('sign_up/', _auth_views.sign_up, name='sign_up'),
+    path('sign_in/', _auth_views.sign_in, name='sign_in'),
     path('google_login/', auth.google_login, name='google_login'),
     path('send_passcode/', auth.send_passcode, name='send_passcode'),
     path('verify_passcode_and_reset_password/', auth.verify_passcode_and_reset_password, name='verify_passcode_reset'),
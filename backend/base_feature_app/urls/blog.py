@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
 
-from base_feature_app.views import blog, blog_crud
+from base_feature_app.views import blog, blog_crud, catalog_async
+
+# Under ASGI, catalog reads are served by async-native views (DJANGO_ASYNC_VIEWS=true).
+_crud_views = catalog_async if settings.ASYNC_VIEWS_ENABLED else blog_crud
 
 urlpatterns = [
     path('blogs-data/', blog.blog_list, name='blog-list'),
-    path('blogs/', blog_crud.blogs, name='blogs'),
-    path('blogs/<int:blog_id>/', blog_crud.blog_detail, name='blog-detail'),
+    path('blogs/', _crud_views.blogs, name='blogs'),
+    path('blogs/<int:blog_id>/', _crud_views.blog_detail, name='blog-detail'),
 ]
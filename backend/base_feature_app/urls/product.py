@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
 
-from base_feature_app.views import product, product_crud
+from base_feature_app.views import catalog_async, product, product_crud
+
+# Under ASGI, catalog reads are served by async-native views (DJANGO_ASYNC_VIEWS=true).
+_crud_views = catalog_async if settings.ASYNC_VIEWS_ENABLED else product_crud
 
 urlpatterns = [
     path('products-data/', product.product_list, name='product-list'),
-    path('products/', product_crud.products, name='products'),
-    path('products/<int:product_id>/', product_crud.product_detail, name='product-detail'),
+    path('products/', _crud_views.products, name='products'),
+    path('products/<int:product_id>/', _crud_views.product_detail, name='product-detail'),
 ]
@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.urls import path
 
-from base_feature_app.views import staging_phase_banner
+from base_feature_app.views import catalog_async, staging_phase_banner
+
+_banner_views = catalog_async if settings.ASYNC_VIEWS_ENABLED else staging_phase_banner
 
 urlpatterns = [
-    path('staging-banner/', staging_phase_banner.staging_banner_state, name='staging-banner'),
+    path('staging-banner/', _banner_views.staging_banner_state, name='staging-banner'),
 ]
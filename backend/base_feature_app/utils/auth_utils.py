@@ -5,6 +5,37 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.core.mail import send_mail
 from django.conf import settings
 
+from base_feature_project.db_routers import pin_to_primary
+
+
+USER_CLAIMS = ('email', 'first_name', 'last_name', 'role', 'is_staff')
+
+
+def user_claims(user):
+    """
+    Public user data returned by the auth endpoints and embedded in JWTs.
+    
+    :param user: User instance
+    :return: Dictionary with id and the USER_CLAIMS fields
+    """
+    data = {'id': user.id}
+    for claim in USER_CLAIMS:
+        data[claim] = getattr(user, claim)
+    return data
+
+
+def add_user_claims(token, user):
+    """
+    Embed the user claims into a token (copied to access tokens derived from it).
+    
+    :param token: simplejwt Token instance
+    :param user: User instance
+    :return: The same token
+    """
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
 
 def generate_auth_tokens(user):
     """
@@ -13,19 +44,14 @@ def generate_auth_tokens(user):
     :param user: User instance
     :return: Dictionary with refresh, access tokens and user data
     """
-    refresh = RefreshToken.for_user(user)
+    refresh = add_user_claims(RefreshToken.for_user(user), user)
+    # The client's next request carries the new token: let it read its own writes.
+    pin_to_primary(user)
     
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
-        'user': {
-            'id': user.id,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'role': user.role,
-            'is_staff': user.is_staff,
-        }
+        'user': user_claims(user),
     }
 
 
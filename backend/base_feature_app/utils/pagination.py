@@ -0,0 +1,128 @@
+"""
+Pagination that avoids ``COUNT(*)`` on large, unfiltered tables.
+
+Counting every row of a big InnoDB table is a full index scan on each page
+load. When a queryset has no filters, ``estimated_count`` reads the row count
+from the database's table statistics instead (MySQL
+``information_schema.TABLES.TABLE_ROWS``, PostgreSQL ``pg_class.reltuples``).
+Estimates below ``ESTIMATED_COUNT_THRESHOLD`` — and every count on backends
+without statistics, such as SQLite — fall back to an exact ``count()``, so
+small tables stay exact.
+
+The estimate can be off by a few percent, so it is only the displayed total:
+``EstimatedCountPaginator`` fetches one row past each page to tell whether a
+next page exists, and serves pages past the estimated last page while they
+have rows. Filtered querysets are always counted exactly.
+"""
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+TABLE_ROWS_SQL = {
+    'mysql': (
+        'SELECT TABLE_ROWS FROM information_schema.TABLES '
+        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+    ),
+    'postgresql': 'SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)',
+}
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Row count of ``model``'s table from the database statistics.
+
+    Returns None when the backend keeps no statistics or they are missing
+    (PostgreSQL reports -1 for a table that was never analyzed).
+    """
+    connection = connections[using]
+    sql = TABLE_ROWS_SQL.get(connection.vendor)
+    if sql is None:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def estimated_count(queryset):
+    """``queryset.count()``, estimated from table statistics for large unfiltered tables."""
+    query = queryset.query
+    if not query.has_filters() and not query.distinct and not query.is_sliced:
+        estimate = estimated_row_count(queryset.model, using=queryset.db)
+        if estimate is not None and estimate >= settings.ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+    return queryset.count()
+
+
+class EstimatedPage(Page):
+    """Page whose ``has_next`` comes from the row fetched past its end, not from the count."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+    def end_index(self):
+        return (self.number - 1) * self.paginator.per_page + len(self)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator whose ``count`` uses ``estimated_count`` for querysets.
+
+    Page numbers of querysets are not capped by the count; a page is empty
+    only when it has no rows.
+    """
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return estimated_count(self.object_list)
+        return super().count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # Past the (possibly estimated) last page; page() checks for rows.
+            if isinstance(self.object_list, QuerySet) and int(number) > 1:
+                return int(number)
+            raise
+
+    def page(self, number):
+        if not isinstance(self.object_list, QuerySet):
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        return EstimatedPage(rows[:self.per_page], number, self, has_more=len(rows) > self.per_page)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Opt-in page-number pagination for the list API views.
+
+    Only requests with ``?page=`` are paginated (``{count, next, previous,
+    results}``); without it the view keeps returning the plain list.
+    """
+    django_paginator_class = EstimatedCountPaginator
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        if self.page_query_param not in request.query_params:
+            return None
+        return super().get_page_size(request)
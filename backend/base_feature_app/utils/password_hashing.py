@@ -0,0 +1,83 @@
+"""
+Bounded worker pool for password hashing in async views.
+
+Hashing a password takes ~100-300 ms of CPU. Under ASGI the async auth
+views hand that work to a small dedicated thread pool instead of the event
+loop or the shared ``sync_to_async`` executor, and reject new work with
+``HashingPoolSaturated`` once the pool and its queue are full so a login
+spike cannot starve the rest of the process.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class BoundedHashingPool:
+    """
+    Thread pool with a hard cap on in-flight (running + queued) jobs.
+
+    :param workers: Number of hashing threads.
+    :param max_queue: Number of jobs allowed to wait for a free thread.
+    """
+
+    def __init__(self, workers, max_queue):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='password-hashing',
+        )
+
+    async def run(self, func, *args):
+        """
+        Run ``func(*args)`` on the pool and await its result.
+
+        :raises HashingPoolSaturated: If no slot is available right now.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolSaturated()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    """Return the per-process pool, creating it from settings on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BoundedHashingPool(
+                    workers=settings.PASSWORD_HASHING_WORKERS,
+                    max_queue=settings.PASSWORD_HASHING_MAX_QUEUE,
+                )
+    return _pool
+
+
+async def acheck_password(password, encoded):
+    """Async ``check_password`` executed on the bounded hashing pool."""
+    return await get_hashing_pool().run(check_password, password, encoded)
+
+
+async def amake_password(password):
+    """Async ``make_password`` executed on the bounded hashing pool."""
+    return await get_hashing_pool().run(make_password, password)
@@ -0,0 +1,175 @@
+"""
+Sliding-window rate limiting for the authentication endpoints.
+
+Counters live in the shared Django cache (Redis in production, locmem in
+development/tests) and are bumped with atomic ``incr`` calls. Each scope is
+limited per client IP and per submitted email, and the check runs before the
+wrapped view does any captcha, DB or hashing work.
+
+Rates use the ``<count>/<period>`` format, e.g. ``'5/m'`` or ``'20/h'``.
+"""
+import hashlib
+import json
+import math
+import time
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from rest_framework import status
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse ``'<count>/<period>'`` into ``(count, window_seconds)``.
+
+    :raises ValueError: If the rate string is malformed.
+    """
+    count, _, period = rate.partition('/')
+    if period not in PERIODS:
+        raise ValueError(f'Invalid rate {rate!r}; expected "<count>/<s|m|h|d>"')
+    return int(count), PERIODS[period]
+
+
+class SlidingWindowRateLimiter:
+    """
+    Sliding-window counter over two fixed cache buckets.
+
+    The estimate weights the previous bucket by the part of it still inside
+    the window, which approximates a true sliding log with O(1) storage.
+
+    :param scope: Name used to namespace the cache keys.
+    :param limit: Maximum hits allowed within ``window`` seconds.
+    :param window: Window length in seconds.
+    """
+
+    def __init__(self, scope, limit, window, cache_alias=None):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self.cache = caches[cache_alias or settings.RATE_LIMIT_CACHE_ALIAS]
+
+    def _key(self, identifier, bucket):
+        digest = hashlib.sha256(identifier.encode()).hexdigest()[:32]
+        return f'rl:{self.scope}:{digest}:{bucket}'
+
+    def _incr(self, key):
+        self.cache.add(key, 0, timeout=self.window * 2)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # The key expired between add() and incr().
+            self.cache.set(key, 1, timeout=self.window * 2)
+            return 1
+
+    def hit(self, identifier, now=None):
+        """
+        Record one hit for ``identifier``.
+
+        :return: ``(allowed, retry_after_seconds)``.
+        """
+        now = time.time() if now is None else now
+        bucket, offset = divmod(now, self.window)
+        bucket = int(bucket)
+        current = self._incr(self._key(identifier, bucket))
+        previous = self.cache.get(self._key(identifier, bucket - 1), 0)
+        estimated = previous * (1 - offset / self.window) + current
+        if estimated <= self.limit:
+            return True, 0
+        return False, max(1, math.ceil(self.window - offset))
+
+
+def get_client_ip(request):
+    """
+    Return the client IP, honouring ``RATE_LIMIT_PROXY_COUNT`` trusted proxies.
+
+    Only the entries appended by our own proxies are trusted, so a client
+    cannot dodge the limit by sending its own ``X-Forwarded-For`` header.
+    """
+    proxy_count = settings.RATE_LIMIT_PROXY_COUNT
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if proxy_count and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+        if len(hops) >= proxy_count:
+            return hops[-proxy_count]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _request_email(request):
+    data = getattr(request, 'data', None)
+    if data is None:
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                data = {}
+        else:
+            data = request.POST
+    if not hasattr(data, 'get'):
+        return ''
+    email = data.get('email') or ''
+    return email.strip().lower() if isinstance(email, str) else ''
+
+
+def check_rate_limit(scope, request):
+    """
+    Apply every configured limiter for ``scope`` to ``request``.
+
+    :return: Seconds to wait if the request is throttled, otherwise ``None``.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    rates = settings.RATE_LIMITS.get(scope, {})
+    identifiers = {'ip': get_client_ip(request), 'email': _request_email(request)}
+    retry_after = None
+    for kind, rate in rates.items():
+        identifier = identifiers.get(kind)
+        if not identifier:
+            continue
+        limit, window = parse_rate(rate)
+        allowed, wait = SlidingWindowRateLimiter(f'{scope}:{kind}', limit, window).hit(identifier)
+        if not allowed:
+            retry_after = max(retry_after or 0, wait)
+    return retry_after
+
+
+def _throttled_response(retry_after):
+    response = JsonResponse(
+        {'error': 'Too many attempts, please try again later'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(scope):
+    """
+    Decorate a sync or async view so it answers 429 once ``scope`` is exceeded.
+
+    For DRF function views, place it below ``@api_view`` so ``request.data``
+    is available.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # Only cache calls: no need to queue behind the shared sync thread.
+                retry_after = await sync_to_async(check_rate_limit, thread_sensitive=False)(scope, request)
+                if retry_after is not None:
+                    return _throttled_response(retry_after)
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            retry_after = check_rate_limit(scope, request)
+            if retry_after is not None:
+                return _throttled_response(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,170 @@
+"""
+Helpers for the bulk fake-data commands (``create_products --bulk``, ...).
+
+Seeding large datasets is dominated by per-row work. These helpers move it
+out of the loop: images are rendered once and reused, rows are inserted with
+``bulk_create``, and media files are written by a process pool.
+"""
+import io
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import django
+from django.core.management.color import no_style
+from django.db import connection, connections
+from PIL import Image, ImageDraw
+
+GRADIENT_PALETTES = [
+    ((255, 107, 107), (255, 142, 83)),
+    ((108, 99, 255), (168, 130, 255)),
+    ((0, 184, 148), (85, 239, 196)),
+    ((253, 203, 110), (255, 159, 67)),
+    ((9, 132, 227), (116, 185, 255)),
+    ((232, 67, 147), (255, 118, 117)),
+    ((0, 206, 209), (72, 219, 251)),
+    ((255, 71, 87), (255, 107, 129)),
+    ((46, 213, 115), (123, 237, 159)),
+    ((255, 165, 2), (255, 200, 87)),
+]
+
+GRADIENT_SIZE = (800, 600)
+
+
+def render_gradient(index, rng=random):
+    """Render palette ``index`` as an 800x600 vertical gradient with soft circles; returns WEBP bytes."""
+    w, h = GRADIENT_SIZE
+    c1, c2 = GRADIENT_PALETTES[index % len(GRADIENT_PALETTES)]
+    # linear_gradient() is a 256x256 black-to-white ramp, top to bottom.
+    mask = Image.linear_gradient('L').resize((w, h))
+    img = Image.composite(Image.new('RGB', (w, h), c2), Image.new('RGB', (w, h), c1), mask)
+    draw = ImageDraw.Draw(img, 'RGBA')
+    for _ in range(4):
+        cx, cy = rng.randint(0, w), rng.randint(0, h)
+        cr = rng.randint(80, 200)
+        draw.ellipse([cx - cr, cy - cr, cx + cr, cy + cr], fill=(255, 255, 255, 35))
+    buffer = io.BytesIO()
+    img.save(buffer, format='WEBP', quality=85)
+    return buffer.getvalue()
+
+
+def bulk_create_with_pks(model, objs, batch_size=1000):
+    """
+    ``bulk_create`` that sets primary keys on every backend.
+
+    Backends that cannot return rows from a bulk insert (MySQL) get the new
+    keys by reading back the ids above the previous maximum, which assumes
+    nothing else inserts into the table meanwhile — fine for seeding.
+    """
+    if not objs:
+        return objs
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objs, batch_size=batch_size)
+    last_pk = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    model.objects.bulk_create(objs, batch_size=batch_size)
+    pks = model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:len(objs)]
+    for obj, pk in zip(objs, pks):
+        obj.pk = pk
+    return objs
+
+
+def next_pk(model):
+    """
+    First primary key above the current maximum of ``model``.
+
+    Rows created with explicit keys counted up from here need no read-back,
+    so chunks can be inserted by several processes at once. Like
+    ``bulk_create_with_pks`` this assumes nothing else inserts meanwhile;
+    call ``reset_sequences`` afterwards.
+    """
+    last_pk = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    return last_pk + 1
+
+
+def reset_sequences(*models):
+    """Move the PostgreSQL sequences past explicitly inserted keys (no-op elsewhere)."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def _init_django():
+    # Needed under the spawn start method; a no-op for forked workers.
+    django.setup()
+
+
+def run_chunks(worker, total, chunk_size, workers=None, **kwargs):
+    """
+    Call ``worker(index, start, count, **kwargs)`` for each chunk of ``total`` rows.
+
+    Yields each chunk's return value as it completes. Chunks run in a process
+    pool of ``workers`` (default: CPU count; <= 1 runs in this process), so
+    ``worker`` must be a module-level function that derives all of its
+    randomness from its arguments to stay reproducible.
+    """
+    chunks = [
+        (index, start, min(chunk_size, total - start))
+        for index, start in enumerate(range(0, total, chunk_size))
+    ]
+    if workers is not None and workers <= 1:
+        for chunk in chunks:
+            yield worker(*chunk, **kwargs)
+        return
+    # Forked children must not share the parent's database sockets.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_django) as pool:
+        futures = [pool.submit(worker, *chunk, **kwargs) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+_contents = None
+
+
+def _init_writer(contents):
+    global _contents
+    _contents = contents
+
+
+def _write_files(jobs):
+    for path, content_index in jobs:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fh:
+            fh.write(_contents[content_index])
+    return len(jobs)
+
+
+@contextmanager
+def file_writer(contents, workers=None, chunk_size=500):
+    """
+    Yield ``write(jobs)``, writing ``contents[content_index]`` to each ``(absolute path, content_index)`` job.
+
+    One process pool serves every ``write`` call, and the contents are sent to
+    each worker once (pool initializer), so a job is only a path and an index.
+    ``workers`` <= 1 writes in this process. ``write`` returns the number of
+    files written.
+    """
+    if workers is not None and workers <= 1:
+        _init_writer(contents)
+        yield lambda jobs: _write_files(list(jobs))
+        return
+    # Forked children must not share the parent's database sockets; the first
+    # submit starts every forked worker, so do it while no connection is open.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_writer, initargs=(contents,)) as pool:
+        pool.submit(_write_files, []).result()
+
+        def write(jobs):
+            jobs = list(jobs)
+            chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+            return sum(pool.map(_write_files, chunks))
+
+        yield write
+
+
+def write_files(jobs, contents, workers=None, chunk_size=500):
+    """One-off ``file_writer`` call."""
+    with file_writer(contents, workers=workers, chunk_size=chunk_size) as write:
+        return write(jobs)
@@ -3,7 +3,7 @@ Authentication views for user sign up, sign in, and password management.
 """
 import logging
 
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
@@ -13,12 +13,15 @@ from django.conf import settings
 
 import requests
 
+from base_feature_app.authentication import ClaimsJWTAuthentication
 from base_feature_app.models import PasswordCode
 from base_feature_app.utils.auth_utils import (
     generate_auth_tokens, 
     send_password_reset_code,
-    send_verification_code
+    send_verification_code,
+    user_claims,
 )
+from base_feature_app.utils.rate_limit import rate_limit
 from base_feature_app.views.captcha_views import verify_recaptcha
 
 User = get_user_model()
@@ -85,6 +88,7 @@ def sign_up(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit('sign_in')
 def sign_in(request):
     """
     User sign in endpoint.
@@ -240,6 +244,7 @@ def google_login(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit('send_passcode')
 def send_passcode(request):
     """
     Send password reset code to user's email.
@@ -284,6 +289,7 @@ def send_passcode(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit('verify_passcode')
 def verify_passcode_and_reset_password(request):
     """
     Verify passcode and reset password.
@@ -311,14 +317,11 @@ def verify_passcode_and_reset_password(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Find valid code
+    # Find valid code (unused and unexpired, checked in SQL)
     try:
-        password_code = user.password_codes.filter(
-            code=code,
-            used=False
-        ).first()
+        password_code = user.password_codes.active().filter(code=code).first()
         
-        if not password_code or not password_code.is_valid():
+        if not password_code:
             return Response(
                 {'error': 'Invalid or expired code'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -380,20 +383,15 @@ def update_password(request):
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def validate_token(request):
     """
     Validate JWT token and return user info.
+
+    Served from the signed token claims, without a database query.
     """
-    user = request.user
     return Response({
         'valid': True,
-        'user': {
-            'id': user.id,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'role': user.role,
-            'is_staff': user.is_staff,
-        }
+        'user': user_claims(request.user),
     }, status=status.HTTP_200_OK)
@@ -0,0 +1,171 @@
+"""
+Async (ASGI-native) versions of the sign up and sign in views.
+
+Password hashing runs on the bounded pool from
+``base_feature_app.utils.password_hashing``; when that pool is saturated the
+views answer 503 with ``Retry-After`` instead of queueing unbounded work.
+The reCAPTCHA request and token signing do not touch the database, so they run
+with ``thread_sensitive=False`` rather than on the one thread shared by all
+sync code, where a slow reCAPTCHA call would serialize every login.
+Enabled via ``DJANGO_ASYNC_VIEWS`` (see ``base_feature_app.urls.auth``).
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+
+from base_feature_app.utils.auth_utils import generate_auth_tokens
+from base_feature_app.utils.password_hashing import (
+    HashingPoolSaturated,
+    acheck_password,
+    amake_password,
+)
+from base_feature_app.utils.rate_limit import rate_limit
+from base_feature_app.views.captcha_views import verify_recaptcha
+
+User = get_user_model()
+
+RETRY_AFTER_SECONDS = 1
+
+
+def _read_payload(request):
+    """Decode a JSON body (or form data) into a dict, or return None."""
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return payload if isinstance(payload, dict) else None
+    return request.POST.dict()
+
+
+def _busy_response():
+    response = JsonResponse(
+        {'error': 'Authentication service is busy, please retry'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def sign_up(request):
+    """
+    Async user registration endpoint.
+
+    Same contract as ``views.auth.sign_up``.
+    """
+    data = _read_payload(request)
+    if data is None:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+
+    captcha_token = data.get('captcha_token', '')
+    if not await sync_to_async(verify_recaptcha, thread_sensitive=False)(captcha_token):
+        return JsonResponse(
+            {'captcha_token': ['reCAPTCHA verification failed.']},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    email = (data.get('email') or '').strip().lower()
+    password = data.get('password')
+    first_name = (data.get('first_name') or '').strip()
+    last_name = (data.get('last_name') or '').strip()
+
+    if not email or not password:
+        return JsonResponse(
+            {'error': 'Email and password are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if len(password) < 8:
+        return JsonResponse(
+            {'error': 'Password must be at least 8 characters'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if await User.objects.filter(email=email).aexists():
+        return JsonResponse(
+            {'error': 'User with this email already exists'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        encoded_password = await amake_password(password)
+    except HashingPoolSaturated:
+        return _busy_response()
+
+    user = await User.objects.acreate(
+        email=email,
+        first_name=first_name,
+        last_name=last_name,
+        password=encoded_password,
+        is_active=True
+    )
+
+    tokens = await sync_to_async(generate_auth_tokens, thread_sensitive=False)(user)
+
+    return JsonResponse(tokens, status=status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_POST
+@rate_limit('sign_in')
+async def sign_in(request):
+    """
+    Async user sign in endpoint.
+
+    Same contract as ``views.auth.sign_in``.
+    """
+    data = _read_payload(request)
+    if data is None:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+
+    captcha_token = data.get('captcha_token', '')
+    if not await sync_to_async(verify_recaptcha, thread_sensitive=False)(captcha_token):
+        return JsonResponse(
+            {'captcha_token': ['reCAPTCHA verification failed.']},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    email = (data.get('email') or '').strip().lower()
+    password = data.get('password')
+
+    if not email or not password:
+        return JsonResponse(
+            {'error': 'Email and password are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        user = await User.objects.aget(email=email)
+    except User.DoesNotExist:
+        return JsonResponse(
+            {'error': 'Invalid credentials'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    try:
+        password_ok = await acheck_password(password, user.password)
+    except HashingPoolSaturated:
+        return _busy_response()
+
+    if not password_ok:
+        return JsonResponse(
+            {'error': 'Invalid credentials'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    if not user.is_active:
+        return JsonResponse(
+            {'error': 'Account is inactive'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    tokens = await sync_to_async(generate_auth_tokens, thread_sensitive=False)(user)
+
+    return JsonResponse(tokens, status=status.HTTP_200_OK)
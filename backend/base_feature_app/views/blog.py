@@ -4,13 +4,15 @@ from rest_framework.response import Response
 from rest_framework import status
 from base_feature_app.models import Blog
 from base_feature_app.serializers import BlogSerializer
+from base_feature_project.query_budget import query_budget
 
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def blog_list(request):
     """
     List all blogs.
     """
-    blogs = Blog.objects.all()
+    blogs = Blog.objects.with_image()
     serializer = BlogSerializer(blogs, many=True, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
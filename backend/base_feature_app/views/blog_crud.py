@@ -7,13 +7,21 @@ from base_feature_app.models import Blog
 from base_feature_app.serializers.blog_create_update import BlogCreateUpdateSerializer
 from base_feature_app.serializers.blog_detail import BlogDetailSerializer
 from base_feature_app.serializers.blog_list import BlogListSerializer
+from base_feature_app.utils.pagination import EstimatedCountPagination
+from base_feature_project.query_budget import query_budget
 
 
+@query_budget(5)
 @api_view(['GET', 'POST'])
 @permission_classes([AllowAny])
 def blogs(request):
     if request.method == 'GET':
-        queryset = Blog.objects.all().order_by('-id')
+        queryset = Blog.objects.with_image().order_by('-id')
+        paginator = EstimatedCountPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        if page is not None:
+            serializer = BlogListSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
         serializer = BlogListSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -28,11 +36,12 @@ def blogs(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(10)
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([AllowAny])
 def blog_detail(request, blog_id: int):
     try:
-        blog = Blog.objects.get(id=blog_id)
+        blog = Blog.objects.with_image().get(id=blog_id)
     except Blog.DoesNotExist:
         return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -0,0 +1,83 @@
+"""
+Async (ASGI-native) versions of the public catalog read views.
+
+GET requests run on the event loop with the async ORM; no thread hop per
+request. Writes (admin POST/PUT/PATCH/DELETE) are delegated to the sync DRF
+views in ``product_crud`` / ``blog_crud``, and so are paginated lists
+(``?page=``). Same response bodies as the sync views. Enabled via ``DJANGO_ASYNC_VIEWS`` (see ``base_feature_app.urls``).
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from base_feature_app.models import Blog, Product, StagingPhaseBanner
+from base_feature_app.serializers.blog_detail import BlogDetailSerializer
+from base_feature_app.serializers.blog_list import BlogListSerializer
+from base_feature_app.serializers.product_detail import ProductDetailSerializer
+from base_feature_app.serializers.product_list import ProductListSerializer
+from base_feature_app.serializers.staging_phase_banner import StagingPhaseBannerSerializer
+from base_feature_app.views import blog_crud, product_crud, staging_phase_banner
+from base_feature_project.query_budget import query_budget
+
+# Rows fetched per round-trip; prefetch_related() runs once per chunk.
+CHUNK_SIZE = 500
+
+
+def _not_found():
+    return JsonResponse({'detail': 'Not found.'}, status=404)
+
+
+async def _serialize_all(queryset, serializer_class, request):
+    """Serialize a queryset whose relations are preloaded, without leaving the event loop."""
+    instances = [obj async for obj in queryset.aiterator(chunk_size=CHUNK_SIZE)]
+    return serializer_class(instances, many=True, context={'request': request}).data
+
+
+@query_budget(5)
+@csrf_exempt
+async def products(request):
+    if request.method != 'GET' or 'page' in request.GET:
+        return await sync_to_async(product_crud.products)(request)
+    queryset = Product.objects.with_gallery().order_by('-id')
+    return JsonResponse(await _serialize_all(queryset, ProductListSerializer, request), safe=False)
+
+
+@query_budget(12)
+@csrf_exempt
+async def product_detail(request, product_id: int):
+    if request.method != 'GET':
+        return await sync_to_async(product_crud.product_detail)(request, product_id=product_id)
+    try:
+        product = await Product.objects.with_gallery().aget(id=product_id)
+    except Product.DoesNotExist:
+        return _not_found()
+    return JsonResponse(ProductDetailSerializer(product, context={'request': request}).data)
+
+
+@query_budget(5)
+@csrf_exempt
+async def blogs(request):
+    if request.method != 'GET' or 'page' in request.GET:
+        return await sync_to_async(blog_crud.blogs)(request)
+    queryset = Blog.objects.with_image().order_by('-id')
+    return JsonResponse(await _serialize_all(queryset, BlogListSerializer, request), safe=False)
+
+
+@query_budget(10)
+@csrf_exempt
+async def blog_detail(request, blog_id: int):
+    if request.method != 'GET':
+        return await sync_to_async(blog_crud.blog_detail)(request, blog_id=blog_id)
+    try:
+        blog = await Blog.objects.with_image().aget(id=blog_id)
+    except Blog.DoesNotExist:
+        return _not_found()
+    return JsonResponse(BlogDetailSerializer(blog, context={'request': request}).data)
+
+
+@csrf_exempt
+async def staging_banner_state(request):
+    if request.method != 'GET':
+        return await sync_to_async(staging_phase_banner.staging_banner_state)(request)
+    banner = await StagingPhaseBanner.aget_solo()
+    return JsonResponse(StagingPhaseBannerSerializer(banner).data)
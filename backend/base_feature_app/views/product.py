@@ -4,7 +4,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from base_feature_app.models import Product
 from base_feature_app.serializers.product import ProductSerializer
+from base_feature_project.query_budget import query_budget
 
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def product_list(request):
@@ -14,6 +16,6 @@ def product_list(request):
     :param request: The HTTP request object.
     :return: JSON response with the serialized list of products and HTTP status 200.
     """
-    products = Product.objects.all()
+    products = Product.objects.with_gallery()
     serializer = ProductSerializer(products, many=True, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -7,13 +7,21 @@ from base_feature_app.models import Product
 from base_feature_app.serializers.product_create_update import ProductCreateUpdateSerializer
 from base_feature_app.serializers.product_detail import ProductDetailSerializer
 from base_feature_app.serializers.product_list import ProductListSerializer
+from base_feature_app.utils.pagination import EstimatedCountPagination
+from base_feature_project.query_budget import query_budget
 
 
+@query_budget(5)
 @api_view(['GET', 'POST'])
 @permission_classes([AllowAny])
 def products(request):
     if request.method == 'GET':
-        queryset = Product.objects.all().order_by('-id')
+        queryset = Product.objects.with_gallery().order_by('-id')
+        paginator = EstimatedCountPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        if page is not None:
+            serializer = ProductListSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
         serializer = ProductListSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -28,11 +36,12 @@ def products(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(12)
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([AllowAny])
 def product_detail(request, product_id: int):
     try:
-        product = Product.objects.get(id=product_id)
+        product = Product.objects.with_gallery().get(id=product_id)
     except Product.DoesNotExist:
         return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
 
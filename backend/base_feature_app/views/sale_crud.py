@@ -6,8 +6,11 @@ from rest_framework.response import Response
 from base_feature_app.models import Sale
 from base_feature_app.serializers.sale_detail import SaleDetailSerializer
 from base_feature_app.serializers.sale_list import SaleListSerializer
+from base_feature_app.utils.pagination import EstimatedCountPagination
+from base_feature_project.query_budget import query_budget
 
 
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def sales(request):
@@ -15,10 +18,16 @@ def sales(request):
         return Response({'detail': 'Authentication required.'}, status=status.HTTP_403_FORBIDDEN)
 
     queryset = Sale.objects.all().order_by('-id')
+    paginator = EstimatedCountPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    if page is not None:
+        serializer = SaleListSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
     serializer = SaleListSerializer(queryset, many=True, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@query_budget(5)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def sale_detail(request, sale_id: int):
@@ -26,7 +35,7 @@ def sale_detail(request, sale_id: int):
         return Response({'detail': 'Authentication required.'}, status=status.HTTP_403_FORBIDDEN)
 
     try:
-        sale = Sale.objects.get(id=sale_id)
+        sale = Sale.objects.with_products().get(id=sale_id)
     except Sale.DoesNotExist:
         return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
 
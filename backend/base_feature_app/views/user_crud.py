@@ -7,8 +7,11 @@ from base_feature_app.models import User
 from base_feature_app.serializers.user_create_update import UserCreateUpdateSerializer
 from base_feature_app.serializers.user_detail import UserDetailSerializer
 from base_feature_app.serializers.user_list import UserListSerializer
+from base_feature_app.utils.pagination import EstimatedCountPagination
+from base_feature_project.query_budget import query_budget
 
 
+@query_budget(5)
 @api_view(['GET', 'POST'])
 @permission_classes([AllowAny])
 def users(request):
@@ -17,6 +20,11 @@ def users(request):
 
     if request.method == 'GET':
         queryset = User.objects.all().order_by('-id')
+        paginator = EstimatedCountPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        if page is not None:
+            serializer = UserListSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
         serializer = UserListSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -31,6 +39,7 @@ def users(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(8)
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([AllowAny])
 def user_detail(request, user_id: int):
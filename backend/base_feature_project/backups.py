@@ -0,0 +1,548 @@
+"""
+Incremental media snapshots and streaming database dumps.
+
+Layout under the dbbackup storage location (``BACKUP_STORAGE_PATH``):
+
+    snapshots/<timestamp>/manifest.json   {relpath: {sha256, size, mtime_ns}}
+    snapshots/<timestamp>/files/<relpath>
+    sharded/<timestamp>/manifest.json     per-shard archive + file checksums
+    sharded/<timestamp>/<shard>.tar.gz
+    db/<timestamp>.sql.gz                  + <timestamp>.sql.gz.sha256
+
+Every snapshot is a complete tree, but files whose content is already in the
+previous snapshot are hard links to it, so a run only copies new or changed
+attachments and old snapshots can be deleted in any order. Hashes are reused
+from the previous manifest when size and mtime are unchanged, so unchanged
+files are never read.
+
+Sharded backups split MEDIA_ROOT along the ``attachments/<pk%256>/``
+directories created by ``upload_path_handler`` and archive/verify the shards
+in a process pool.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+CHUNK_SIZE = 1024 * 1024
+MANIFEST_NAME = 'manifest.json'
+TIMESTAMP_FORMAT = '%Y-%m-%d_%H%M%S'
+
+
+class BackupError(Exception):
+    pass
+
+
+def backup_root():
+    return Path(settings.STORAGES['dbbackup']['OPTIONS']['location'])
+
+
+def snapshots_dir():
+    return backup_root() / 'snapshots'
+
+
+def db_dumps_dir():
+    return backup_root() / 'db'
+
+
+def new_timestamp():
+    return timezone.now().strftime(TIMESTAMP_FORMAT)
+
+
+# ---------------------------------------------------------------------------
+# Hashing helpers
+# ---------------------------------------------------------------------------
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_with_sha256(src, dest):
+    """Copy ``src`` to ``dest`` (keeping mtime) and return the sha256 of what was copied."""
+    digest = hashlib.sha256()
+    with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+        for chunk in iter(lambda: fin.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            fout.write(chunk)
+    shutil.copystat(src, dest)
+    return digest.hexdigest()
+
+
+def link_or_copy(src, dest):
+    """Hard-link ``src`` to ``dest``; copy when links are unsupported (e.g. across devices)."""
+    try:
+        os.link(src, dest)
+        return True
+    except OSError:
+        shutil.copy2(src, dest)
+        return False
+
+
+class _HashingWriter:
+    """File wrapper hashing the bytes written through it."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self.digest = hashlib.sha256()
+
+    def write(self, data):
+        self.digest.update(data)
+        return self._fh.write(data)
+
+    def flush(self):
+        self._fh.flush()
+
+
+# ---------------------------------------------------------------------------
+# Media snapshots
+# ---------------------------------------------------------------------------
+
+def iter_files(root, exclude=()):
+    """
+    Yield ``(relpath, path)`` for every regular file under ``root``, in a stable order.
+
+    :param exclude: Directory relpaths (posix) not to descend into.
+    """
+    root = Path(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        if exclude:
+            base = Path(dirpath).relative_to(root)
+            dirnames[:] = [d for d in dirnames if (base / d).as_posix() not in exclude]
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            if path.is_file() and not path.is_symlink():
+                yield path.relative_to(root).as_posix(), path
+
+
+def list_snapshots(directory=None):
+    """Completed snapshot directories, oldest first."""
+    directory = Path(directory or snapshots_dir())
+    if not directory.exists():
+        return []
+    return sorted(
+        p for p in directory.iterdir()
+        if p.is_dir() and not p.name.endswith('.partial') and (p / MANIFEST_NAME).exists()
+    )
+
+
+def load_manifest(snapshot):
+    with open(Path(snapshot) / MANIFEST_NAME) as fh:
+        return json.load(fh)
+
+
+def create_media_snapshot(media_root=None, directory=None, timestamp=None):
+    """
+    Snapshot ``media_root`` incrementally against the latest snapshot.
+
+    The snapshot is built in ``<timestamp>.partial`` and renamed once its
+    manifest is written, so an interrupted run never becomes the base of the
+    next one.
+
+    :return: Dict with ``path``, ``files``, ``linked``, ``copied`` and ``bytes_copied``.
+    """
+    media_root = Path(media_root or settings.MEDIA_ROOT)
+    directory = Path(directory or snapshots_dir())
+    timestamp = timestamp or new_timestamp()
+    final = directory / timestamp
+    if final.exists():
+        raise BackupError(f'Snapshot {final} already exists')
+
+    snapshots = list_snapshots(directory)
+    previous = snapshots[-1] if snapshots else None
+    previous_files = load_manifest(previous)['files'] if previous else {}
+    by_hash = {entry['sha256']: rel for rel, entry in previous_files.items()}
+
+    partial = directory / f'{timestamp}.partial'
+    if partial.exists():
+        shutil.rmtree(partial)
+    files_dir = partial / 'files'
+    files_dir.mkdir(parents=True)
+
+    files = {}
+    stats = {'linked': 0, 'copied': 0, 'bytes_copied': 0}
+    for rel, src in iter_files(media_root):
+        st = src.stat()
+        dest = files_dir / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        old = previous_files.get(rel)
+
+        if old and old['size'] == st.st_size and old['mtime_ns'] == st.st_mtime_ns:
+            sha = old['sha256']
+            link_or_copy(previous / 'files' / rel, dest)
+            stats['linked'] += 1
+        else:
+            sha = file_sha256(src) if by_hash else None
+            if sha in by_hash:
+                # Same content under another name/mtime: share the stored copy.
+                link_or_copy(previous / 'files' / by_hash[sha], dest)
+                stats['linked'] += 1
+            else:
+                sha = copy_with_sha256(src, dest)
+                stats['copied'] += 1
+                stats['bytes_copied'] += st.st_size
+
+        files[rel] = {'sha256': sha, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    manifest = {
+        'created_at': timestamp,
+        'previous': previous.name if previous else None,
+        'files': files,
+    }
+    with open(partial / MANIFEST_NAME, 'w') as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    partial.rename(final)
+
+    return {'path': final, 'files': len(files), **stats}
+
+
+def verify_snapshot(snapshot):
+    """
+    Re-hash every file of ``snapshot`` against its manifest.
+
+    :return: List of human-readable problems (empty when the snapshot is intact).
+    """
+    snapshot = Path(snapshot)
+    files_dir = snapshot / 'files'
+    expected = load_manifest(snapshot)['files']
+    problems = []
+
+    for rel, entry in expected.items():
+        path = files_dir / rel
+        if not path.is_file():
+            problems.append(f'missing: {rel}')
+        elif path.stat().st_size != entry['size']:
+            problems.append(f'size mismatch: {rel}')
+        elif file_sha256(path) != entry['sha256']:
+            problems.append(f'checksum mismatch: {rel}')
+
+    for rel, _ in iter_files(files_dir):
+        if rel not in expected:
+            problems.append(f'not in manifest: {rel}')
+    return problems
+
+
+def restore_snapshot(snapshot, target, verify=True):
+    """
+    Copy a snapshot into ``target`` (files not in the snapshot are left alone).
+
+    :raises BackupError: if ``verify`` is set and the snapshot fails verification.
+    :return: Number of files restored.
+    """
+    problems = verify_snapshot(snapshot) if verify else []
+    if problems:
+        raise BackupError(f'Snapshot {Path(snapshot).name} failed verification: {problems[:10]}')
+
+    target = Path(target)
+    restored = 0
+    for rel, src in iter_files(Path(snapshot) / 'files'):
+        dest = target / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dest)
+        restored += 1
+    return restored
+
+
+def prune_snapshots(keep, directory=None):
+    """Delete all but the newest ``keep`` snapshots. Shared hard-linked data survives."""
+    snapshots = list_snapshots(directory)
+    removed = snapshots[:-keep] if keep > 0 else []
+    for path in removed:
+        shutil.rmtree(path)
+    return [p.name for p in removed]
+
+
+# ---------------------------------------------------------------------------
+# Sharded parallel media backups
+# ---------------------------------------------------------------------------
+
+ROOT_SHARD = '_root'
+# attachments/ subdirectories sharded by their children instead (content-addressed storage).
+NESTED_SHARD_DIRS = {'sha256'}
+
+
+def sharded_dir():
+    return backup_root() / 'sharded'
+
+
+def default_workers():
+    return settings.BACKUP_WORKERS or os.cpu_count() or 1
+
+
+def _subdirs(directory):
+    return sorted(p.name for p in directory.iterdir() if p.is_dir() and not p.is_symlink())
+
+
+def list_media_shards(media_root):
+    """
+    ``attachments/<xx>`` directories of ``media_root`` plus ``ROOT_SHARD``.
+
+    Content-addressed files all live under ``attachments/sha256/``, so that
+    directory is split one level deeper (``attachments/sha256/<ab>``).
+    ``ROOT_SHARD`` stands for every file outside those directories
+    (thumbnails, other uploads).
+    """
+    attachments = Path(media_root) / 'attachments'
+    shards = []
+    if attachments.is_dir():
+        for name in _subdirs(attachments):
+            if name in NESTED_SHARD_DIRS:
+                shards.extend(f'attachments/{name}/{sub}' for sub in _subdirs(attachments / name))
+            else:
+                shards.append(f'attachments/{name}')
+    return shards + [ROOT_SHARD]
+
+
+def _shard_files(media_root, shard, all_shards):
+    media_root = Path(media_root)
+    if shard == ROOT_SHARD:
+        return iter_files(media_root, exclude=set(all_shards) - {ROOT_SHARD})
+    return ((f'{shard}/{rel}', path) for rel, path in iter_files(media_root / shard))
+
+
+def _shard_archive_name(shard):
+    return shard.replace('/', '-') + '.tar.gz'
+
+
+class _HashingReader:
+    """File wrapper hashing the bytes read through it."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self._fh.read(size)
+        self.digest.update(data)
+        return data
+
+
+def archive_shard(media_root, shard, all_shards, archive_path):
+    """
+    Write one shard to a streaming ``tar.gz``; runs in a worker process.
+
+    Files and the archive itself are hashed as they are written, so each
+    byte is read once.
+
+    :return: ``(shard, manifest entry)``
+    """
+    files = {}
+    with open(archive_path, 'wb') as raw:
+        writer = _HashingWriter(raw)
+        with tarfile.open(fileobj=writer, mode='w|gz') as tar:
+            for rel, path in _shard_files(media_root, shard, all_shards):
+                info = tar.gettarinfo(str(path), arcname=rel)
+                with open(path, 'rb') as fh:
+                    reader = _HashingReader(fh)
+                    tar.addfile(info, reader)
+                files[rel] = {'sha256': reader.digest.hexdigest(), 'size': info.size}
+    return shard, {
+        'archive': Path(archive_path).name,
+        'sha256': writer.digest.hexdigest(),
+        'files': files,
+    }
+
+
+def verify_shard(archive_path, entry):
+    """
+    Check one shard archive against its manifest entry; runs in a worker process.
+
+    :return: List of problems.
+    """
+    archive_path = Path(archive_path)
+    if not archive_path.is_file():
+        return [f'missing archive: {archive_path.name}']
+    if file_sha256(archive_path) != entry['sha256']:
+        return [f'archive checksum mismatch: {archive_path.name}']
+
+    problems = []
+    seen = set()
+    with tarfile.open(archive_path, mode='r|gz') as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            seen.add(member.name)
+            expected = entry['files'].get(member.name)
+            if expected is None:
+                problems.append(f'not in manifest: {member.name}')
+                continue
+            digest = hashlib.sha256()
+            fh = tar.extractfile(member)
+            for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+            if digest.hexdigest() != expected['sha256']:
+                problems.append(f'checksum mismatch: {member.name}')
+    problems.extend(f'missing: {rel}' for rel in sorted(set(entry['files']) - seen))
+    return problems
+
+
+def _run_parallel(func, jobs, workers):
+    """``func(*job)`` for every job; in-process when ``workers`` is 1."""
+    if workers <= 1:
+        return [func(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(func, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def create_sharded_backup(media_root=None, directory=None, timestamp=None, workers=None):
+    """
+    Archive every media shard in parallel and write a global manifest.
+
+    :return: Dict with ``path``, ``shards`` and ``files``.
+    """
+    media_root = Path(media_root or settings.MEDIA_ROOT)
+    directory = Path(directory or sharded_dir())
+    timestamp = timestamp or new_timestamp()
+    final = directory / timestamp
+    if final.exists():
+        raise BackupError(f'Sharded backup {final} already exists')
+
+    partial = directory / f'{timestamp}.partial'
+    if partial.exists():
+        shutil.rmtree(partial)
+    partial.mkdir(parents=True)
+
+    shards = list_media_shards(media_root)
+    jobs = [
+        (str(media_root), shard, shards, str(partial / _shard_archive_name(shard)))
+        for shard in shards
+    ]
+    results = dict(_run_parallel(archive_shard, jobs, workers or default_workers()))
+
+    manifest = {'created_at': timestamp, 'shards': results}
+    with open(partial / MANIFEST_NAME, 'w') as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    partial.rename(final)
+
+    return {
+        'path': final,
+        'shards': len(results),
+        'files': sum(len(entry['files']) for entry in results.values()),
+    }
+
+
+def verify_sharded_backup(backup, workers=None):
+    """Verify every shard archive of ``backup`` in parallel. Returns a list of problems."""
+    backup = Path(backup)
+    shards = load_manifest(backup)['shards']
+    jobs = [
+        (str(backup / entry['archive']), entry)
+        for _, entry in sorted(shards.items())
+    ]
+    results = _run_parallel(verify_shard, jobs, workers or default_workers())
+    return [problem for problems in results for problem in problems]
+
+
+# ---------------------------------------------------------------------------
+# Streaming database dumps
+# ---------------------------------------------------------------------------
+
+def _dump_command(db):
+    """Return ``(argv, env)`` for the native dump tool of ``db`` (a DATABASES entry)."""
+    engine = db['ENGINE']
+    env = os.environ.copy()
+    if 'mysql' in engine:
+        argv = [
+            'mysqldump', '--single-transaction', '--quick', '--routines',
+            '--default-character-set=utf8mb4',
+            '-h', db.get('HOST') or 'localhost', '-P', str(db.get('PORT') or 3306),
+            '-u', db.get('USER', ''), db['NAME'],
+        ]
+        env['MYSQL_PWD'] = db.get('PASSWORD', '')
+        return argv, env
+    if 'postgresql' in engine:
+        argv = [
+            'pg_dump', '--no-owner',
+            '-h', db.get('HOST') or 'localhost', '-p', str(db.get('PORT') or 5432),
+            '-U', db.get('USER', ''), db['NAME'],
+        ]
+        env['PGPASSWORD'] = db.get('PASSWORD', '')
+        return argv, env
+    raise BackupError(f'No streaming dump support for {engine}')
+
+
+def _stream_native_dump(db, gz):
+    argv, env = _dump_command(db)
+    # stderr goes to a file: a second pipe that is only read after stdout's EOF
+    # would block the dump tool once its warnings fill the pipe buffer.
+    with tempfile.TemporaryFile() as errors:
+        with subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=errors, env=env) as proc:
+            for chunk in iter(lambda: proc.stdout.read(CHUNK_SIZE), b''):
+                gz.write(chunk)
+        if proc.returncode != 0:
+            errors.seek(0)
+            stderr = errors.read(500).decode(errors='replace')
+            raise BackupError(f'{argv[0]} exited with {proc.returncode}: {stderr}')
+
+
+def _stream_sqlite_dump(connection, gz):
+    connection.ensure_connection()
+    for line in connection.connection.iterdump():
+        gz.write(f'{line}\n'.encode())
+
+
+def dump_database(dest=None, using='default', timestamp=None):
+    """
+    Stream a gzip-compressed SQL dump of ``using`` to disk.
+
+    The dump tool's output is compressed chunk by chunk and never held in
+    memory. The sha256 of the compressed file is written next to it for
+    ``verify_db_dump``.
+
+    :return: Path of the ``.sql.gz`` file.
+    """
+    dest = Path(dest or db_dumps_dir() / f'{timestamp or new_timestamp()}.sql.gz')
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    partial = dest.with_name(dest.name + '.partial')
+    connection = connections[using]
+
+    try:
+        with open(partial, 'wb') as raw:
+            writer = _HashingWriter(raw)
+            with gzip.GzipFile(fileobj=writer, mode='wb') as gz:
+                if connection.vendor == 'sqlite':
+                    _stream_sqlite_dump(connection, gz)
+                else:
+                    _stream_native_dump(connection.settings_dict, gz)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    partial.rename(dest)
+    dest.with_name(dest.name + '.sha256').write_text(f'{writer.digest.hexdigest()}  {dest.name}\n')
+    return dest
+
+
+def verify_db_dump(path):
+    """Return True when ``path`` matches the checksum recorded next to it."""
+    path = Path(path)
+    sidecar = path.with_name(path.name + '.sha256')
+    if not sidecar.exists():
+        return False
+    return sidecar.read_text().split()[0] == file_sha256(path)
+
+
+def prune_db_dumps(keep, directory=None):
+    directory = Path(directory or db_dumps_dir())
+    dumps = sorted(directory.glob('*.sql.gz')) if directory.exists() else []
+    removed = dumps[:-keep] if keep > 0 else []
+    for path in removed:
+        path.unlink()
+        path.with_name(path.name + '.sha256').unlink(missing_ok=True)
+    return [p.name for p in removed]
@@ -0,0 +1,221 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` marks safe (GET/HEAD/OPTIONS) requests as
+replica-readable;
+``ReplicaRouter`` then sends their reads to the ``DATABASE_REPLICAS`` aliases
+in round-robin. Everything else reads from ``default``:
+
+- unsafe methods, and code outside a request (shell, Huey) unless wrapped
+  in ``replica_reads()``;
+- reads after a write within the same request, or inside a transaction;
+- a client that wrote within the last ``DATABASE_REPLICA_PIN_SECONDS``
+  (read-your-writes). A signed-in client is pinned by user id in the default
+  cache, so the pin holds across workers and across token rotation; sign in
+  and refresh pin the user they issue tokens for (``pin_to_primary``). An
+  anonymous writer gets a short-lived ``db_pin`` cookie instead, so clients
+  sharing an IP do not pin each other;
+- while every replica is unhealthy. Each replica's connection is re-checked
+  at most every ``DATABASE_REPLICA_HEALTH_CHECK_SECONDS``.
+
+All writes and migrations go to ``default``. The middleware runs natively in
+async mode; its cache calls go to a worker thread only for signed-in clients
+and writes.
+"""
+
+import contextvars
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+PIN_COOKIE = 'db_pin'
+
+
+class _Routing:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+        self.pinned_user_ids = set()
+
+
+_routing = contextvars.ContextVar('db_routing', default=None)
+
+
+@contextmanager
+def replica_reads():
+    """Route reads in this block to a replica (for reports and other read-only jobs)."""
+    token = _routing.set(_Routing(use_replica=True))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+def pin_to_primary(user):
+    """Pin ``user``'s reads to the primary after this request, e.g. when issuing them tokens."""
+    routing = _routing.get()
+    if routing is not None:
+        routing.pinned_user_ids.add(user.pk)
+
+
+class ReplicaHealth:
+    """Per-process replica health, re-checked at most every ``DATABASE_REPLICA_HEALTH_CHECK_SECONDS``."""
+
+    def __init__(self):
+        self._checked = {}
+        self._counter = itertools.count()
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        healthy, checked_at = self._checked.get(alias, (True, None))
+        if checked_at is not None and now - checked_at < settings.DATABASE_REPLICA_HEALTH_CHECK_SECONDS:
+            return healthy
+        try:
+            connection = connections[alias]
+            connection.ensure_connection()
+            healthy = connection.is_usable()
+        except DatabaseError:
+            healthy = False
+        if not healthy:
+            logger.warning('Replica %s is unhealthy; reading from %s', alias, DEFAULT_DB_ALIAS)
+        self._checked[alias] = (healthy, now)
+        return healthy
+
+    def next_replica(self):
+        """Next healthy replica alias in round-robin, or None."""
+        aliases = settings.DATABASE_REPLICAS
+        if not aliases:
+            return None
+        # itertools.count() is atomic under the GIL, so threads share one rotation.
+        start = next(self._counter) % len(aliases)
+        for alias in aliases[start:] + aliases[:start]:
+            if self.is_healthy(alias):
+                return alias
+        return None
+
+    def reset(self):
+        self._checked.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or not routing.use_replica or routing.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica_health.next_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _pin_key(user_id):
+    return f'db-pin:user:{user_id}'
+
+
+def _token_user_id(request):
+    """User id of a valid access token in the ``Authorization`` header, or None."""
+    scheme, _, raw = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if scheme not in api_settings.AUTH_HEADER_TYPES or not raw.strip():
+        return None
+    try:
+        return AccessToken(raw.strip()).get(api_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+
+def _request_user_id(request):
+    """Id of the user this request authenticated, without triggering a lazy session lookup."""
+    # DRF copies the user it authenticated onto the Django request.
+    user = request.__dict__.get('user')
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return None
+    return user.pk if user.is_authenticated else None
+
+
+class ReplicaRoutingMiddleware:
+    """Allow replica reads for safe requests of clients that have not written recently."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user_id = _token_user_id(request)
+        safe = request.method in SAFE_METHODS
+        pinned = PIN_COOKIE in request.COOKIES or (user_id is not None and cache.get(_pin_key(user_id)))
+        routing = _Routing(use_replica=safe and not pinned)
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote or not safe:
+            self.pin(request, response, routing, user_id)
+        return response
+
+    async def __acall__(self, request):
+        user_id = _token_user_id(request)
+        safe = request.method in SAFE_METHODS
+        pinned = PIN_COOKIE in request.COOKIES
+        if not pinned and user_id is not None:
+            # Cache calls only: no need to queue behind the shared sync thread.
+            pinned = await sync_to_async(cache.get, thread_sensitive=False)(_pin_key(user_id))
+        routing = _Routing(use_replica=safe and not pinned)
+        token = _routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote or not safe:
+            await sync_to_async(self.pin, thread_sensitive=False)(request, response, routing, user_id)
+        return response
+
+    def pin(self, request, response, routing, user_id):
+        user_ids = set(routing.pinned_user_ids)
+        if user_id is not None:
+            user_ids.add(user_id)
+        request_user_id = _request_user_id(request)
+        if request_user_id is not None:
+            user_ids.add(request_user_id)
+        timeout = settings.DATABASE_REPLICA_PIN_SECONDS
+        if user_ids:
+            cache.set_many({_pin_key(pk): 1 for pk in user_ids}, timeout=timeout)
+        else:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=timeout, secure=request.is_secure(), httponly=True, samesite='Lax',
+            )
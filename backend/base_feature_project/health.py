@@ -0,0 +1,178 @@
+"""
+Deep health check: ``/api/health/deep/``.
+
+Probes the database (``SELECT 1``), Redis (the Huey broker), a cache
+round-trip and a media storage write/read concurrently, each bounded by
+``HEALTH_CHECK_TIMEOUT_SECONDS``, and reports per-dependency latency.
+Answers 200 when every probe passed and 503 otherwise.
+
+The result is memoized per process for ``HEALTH_CHECK_CACHE_SECONDS``, and
+concurrent callers share a single run, so a load balancer polling every
+second costs at most one probe round per worker per interval. While a round
+runs, other callers get the previous result instead of waiting for it. The
+memo is kept in process memory rather than the cache, which is one of the
+probed dependencies.
+
+A probe that hangs cannot be cancelled. It keeps its thread and is not
+started again until it returns; meanwhile each round reports it as timed
+out, and the other probes still get a thread of their own.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+
+def service_identity():
+    # 'environment' reads the SETTING first: DJANGO_ENV lives in backend/.env
+    # (read by the settings module), while systemd only exports
+    # DJANGO_SETTINGS_MODULE — os.getenv alone reports 'development' in
+    # production. The setting is what the app itself believes it is.
+    # 'project' (the clone dir name == canonical fleet name) and 'environment'
+    # let external probes verify WHO answered — a dead staging domain can fall
+    # through DNS/nginx to another app (measured: /qa pilot #3, F24).
+    return {
+        'project': settings.BASE_DIR.parent.name,
+        'environment': getattr(settings, 'DJANGO_ENV', os.getenv('DJANGO_ENV', 'development')),
+    }
+
+
+def probe_database():
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    finally:
+        # Probes run in pool threads, each with its own connection.
+        connection.close()
+
+
+def probe_redis():
+    from huey.contrib.djhuey import HUEY
+
+    HUEY.storage.conn.ping()
+
+
+def probe_cache():
+    key = f'health:{uuid.uuid4().hex}'
+    cache.set(key, '1', timeout=10)
+    try:
+        if cache.get(key) != '1':
+            raise RuntimeError('cache round-trip returned a different value')
+    finally:
+        cache.delete(key)
+
+
+def probe_storage():
+    name = default_storage.save(f'health/{uuid.uuid4().hex}.txt', ContentFile(b'ok'))
+    try:
+        with default_storage.open(name) as fh:
+            if fh.read() != b'ok':
+                raise RuntimeError('storage read returned different content')
+    finally:
+        default_storage.delete(name)
+
+
+PROBES = {
+    'database': probe_database,
+    'redis': probe_redis,
+    'cache': probe_cache,
+    'storage': probe_storage,
+}
+
+_executor = ThreadPoolExecutor(max_workers=len(PROBES), thread_name_prefix='health')
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_memo = {'expires': 0.0, 'result': None}
+# Last future per probe; a probe whose future is still running is not resubmitted.
+_running = {}
+
+
+def _timed(name, probe):
+    start = time.perf_counter()
+    try:
+        probe()
+    except Exception as exc:
+        # The endpoint is public: report the exception type only, log the rest.
+        logger.warning('Health probe %s failed', name, exc_info=True)
+        return {'ok': False, 'latency_ms': _ms_since(start), 'error': type(exc).__name__}
+    return {'ok': True, 'latency_ms': _ms_since(start)}
+
+
+def _ms_since(start):
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def run_probes(timeout=None):
+    """Run every probe concurrently; a probe still running at ``timeout`` is reported failed."""
+    timeout = settings.HEALTH_CHECK_TIMEOUT_SECONDS if timeout is None else timeout
+    futures = {}
+    with _lock:
+        for name, probe in PROBES.items():
+            future = _running.get(name)
+            if future is None or future.done():
+                future = _running[name] = _executor.submit(_timed, name, probe)
+            futures[name] = future
+    wait(futures.values(), timeout=timeout)
+    checks = {}
+    for name, future in futures.items():
+        if future.done():
+            checks[name] = future.result()
+        else:
+            checks[name] = {'ok': False, 'latency_ms': timeout * 1000, 'error': 'timed out'}
+    return checks
+
+
+def deep_health(now=None):
+    """Memoized probe results: ``(checks, checked_at)``."""
+    now = time.time() if now is None else now
+    with _lock:
+        if _memo['result'] is not None and now < _memo['expires']:
+            return _memo['result']
+        stale = _memo['result']
+    # Only the first caller runs the probes; later ones wait only if there is no result yet.
+    if not _refresh_lock.acquire(blocking=stale is None):
+        return stale
+    try:
+        with _lock:
+            if _memo['result'] is not None and now < _memo['expires']:
+                return _memo['result']
+        result = (run_probes(), now)
+        with _lock:
+            _memo['result'] = result
+            _memo['expires'] = now + settings.HEALTH_CHECK_CACHE_SECONDS
+        return result
+    finally:
+        _refresh_lock.release()
+
+
+def clear_health_memo():
+    with _lock:
+        _memo['result'] = None
+        _memo['expires'] = 0.0
+
+
+def deep_health_check(request):
+    checks, checked_at = deep_health()
+    healthy = all(check['ok'] for check in checks.values())
+    return JsonResponse(
+        {
+            'status': 'ok' if healthy else 'degraded',
+            **service_identity(),
+            'checked_at': checked_at,
+            'checks': checks,
+        },
+        status=200 if healthy else 503,
+    )
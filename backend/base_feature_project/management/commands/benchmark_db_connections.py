@@ -0,0 +1,124 @@
+"""
+Management command to measure what persistent DB connections save per request.
+
+Replays ``--requests`` simulated requests against a dedicated connection,
+reproducing Django's request cycle: ``close_old_connections`` on
+``request_started`` and ``request_finished`` around ``--queries`` ``SELECT 1``
+queries. Runs the cycle with a new connection per request
+(``CONN_MAX_AGE=0``), a persistent connection, and a persistent connection
+with ``CONN_HEALTH_CHECKS``.
+
+Run it against the production database engine (e.g. a local MySQL) to see the
+TCP + authentication handshake cost. ``--stand-in`` uses a throwaway SQLite
+file instead; it only shows the local connect overhead, a lower bound.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.utils import ConnectionHandler
+
+from base_feature_project.query_report import percentile
+
+MODES = (
+    ('new connection per request', {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}),
+    ('persistent', {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': False}),
+    ('persistent + health checks', {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True}),
+)
+
+
+def simulate_requests(settings_dict, requests, queries):
+    """
+    Run ``requests`` request cycles on a fresh connection built from ``settings_dict``.
+
+    :return: ``(per-request latencies in ms, number of connections opened)``
+    """
+    handler = ConnectionHandler({'default': settings_dict})
+    conn = handler['default']
+    latencies = []
+    connects = 0
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            conn.close_if_unusable_or_obsolete()  # request_started
+            if conn.connection is None:
+                connects += 1
+            with conn.cursor() as cursor:
+                for _ in range(queries):
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+            conn.close_if_unusable_or_obsolete()  # request_finished
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        conn.close()
+    return latencies, connects
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-request latency with and without persistent database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Database alias whose settings are benchmarked (default: default)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Simulated requests per mode (default: 500)',
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=1,
+            help='SELECT 1 queries per request (default: 1)',
+        )
+        parser.add_argument(
+            '--stand-in',
+            action='store_true',
+            help='Benchmark a temporary SQLite file instead of the configured database',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            if options['stand_in']:
+                base = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(Path(tmp) / 'stand-in.sqlite3')}
+            else:
+                if options['database'] not in settings.DATABASES:
+                    raise CommandError(f"Unknown database alias {options['database']!r}")
+                base = dict(settings.DATABASES[options['database']])
+                # A pool manages its own connections; benchmark the plain connect path.
+                base['OPTIONS'] = {k: v for k, v in base.get('OPTIONS', {}).items() if k != 'pool'}
+
+            self.stdout.write(
+                f"{options['requests']} requests x {options['queries']} queries on "
+                f"{base['ENGINE'].rsplit('.', 1)[-1]}{' (SQLite stand-in)' if options['stand_in'] else ''}"
+            )
+            self.stdout.write(f"{'mode':<28} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'connects':>9}")
+
+            means = {}
+            for label, overrides in MODES:
+                latencies, connects = simulate_requests(
+                    {**base, **overrides}, options['requests'], options['queries'],
+                )
+                means[label] = sum(latencies) / len(latencies)
+                latencies.sort()
+                self.stdout.write(
+                    f"{label:<28} {means[label]:>8.3f} {percentile(latencies, 50):>8.3f} "
+                    f"{percentile(latencies, 95):>8.3f} {connects:>9}"
+                )
+
+        baseline = means[MODES[0][0]]
+        saved = baseline - means[MODES[2][0]]
+        self.stdout.write(self.style.SUCCESS(
+            f"Persistent connections with health checks save {saved:.3f} ms per request "
+            f"({saved / baseline * 100 if baseline else 0:.0f}%)"
+        ))
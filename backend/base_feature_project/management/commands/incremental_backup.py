@@ -0,0 +1,58 @@
+"""
+Management command for incremental backups (BACKUP_MODE='incremental').
+
+Streams a compressed database dump and takes a hard-link media snapshot that
+only copies new or changed files. See base_feature_project/backups.py.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from base_feature_project import backups
+
+
+class Command(BaseCommand):
+    help = 'Streaming DB dump + incremental (hard-link) media snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-db',
+            action='store_true',
+            help='Do not dump the database',
+        )
+        parser.add_argument(
+            '--skip-media',
+            action='store_true',
+            help='Do not snapshot MEDIA_ROOT',
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=settings.DBBACKUP_CLEANUP_KEEP_MEDIA,
+            help='Snapshots/dumps to keep (default: DBBACKUP_CLEANUP_KEEP_MEDIA)',
+        )
+
+    def handle(self, *args, **options):
+        timestamp = backups.new_timestamp()
+        keep = options['keep']
+
+        try:
+            if not options['skip_db']:
+                dump = backups.dump_database(timestamp=timestamp)
+                self.stdout.write(f"Database dump: {dump} ({dump.stat().st_size} bytes)")
+                for name in backups.prune_db_dumps(keep):
+                    self.stdout.write(f"  - Pruned dump {name}")
+
+            if not options['skip_media']:
+                result = backups.create_media_snapshot(timestamp=timestamp)
+                self.stdout.write(
+                    f"Media snapshot: {result['path']} — {result['files']} files, "
+                    f"{result['copied']} copied ({result['bytes_copied']} bytes), "
+                    f"{result['linked']} hard-linked"
+                )
+                for name in backups.prune_snapshots(keep):
+                    self.stdout.write(f"  - Pruned snapshot {name}")
+        except backups.BackupError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS("Incremental backup completed"))
@@ -0,0 +1,42 @@
+"""
+Management command for sharded media backups (BACKUP_MODE='sharded').
+
+Archives each attachments/<pk%256> shard in a process pool and writes a
+global manifest with archive and per-file checksums.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from base_feature_project import backups
+
+
+class Command(BaseCommand):
+    help = 'Back up MEDIA_ROOT as per-shard tar.gz archives built in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Worker processes (default: BACKUP_WORKERS, or CPU count)',
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=settings.DBBACKUP_CLEANUP_KEEP_MEDIA,
+            help='Sharded backups to keep (default: DBBACKUP_CLEANUP_KEEP_MEDIA)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = backups.create_sharded_backup(workers=options['workers'])
+        except backups.BackupError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            f"Sharded media backup: {result['path']} — {result['shards']} shards, {result['files']} files"
+        )
+        for name in backups.prune_snapshots(options['keep'], directory=backups.sharded_dir()):
+            self.stdout.write(f"  - Pruned backup {name}")
+        self.stdout.write(self.style.SUCCESS("Sharded media backup completed"))
@@ -1,10 +1,17 @@
 """
 Management command to clean old Silk profiling data.
 Default retention: 7 days.
+
+Rows are deleted oldest first in short batches (each cascading to its
+SQLQuery/Profile/Response rows in its own transaction), with a pause between
+batches and an overall runtime budget, so the purge never holds long locks
+on the silk tables while production traffic is writing to them.
 """
 
+import time
 from datetime import timedelta
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
@@ -24,12 +31,34 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be deleted without deleting',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.SILK_GC_BATCH_SIZE,
+            help=f'Requests deleted per batch (default: {settings.SILK_GC_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=settings.SILK_GC_SLEEP_SECONDS,
+            help=f'Seconds to pause between batches (default: {settings.SILK_GC_SLEEP_SECONDS})',
+        )
+        parser.add_argument(
+            '--max-runtime',
+            type=float,
+            default=settings.SILK_GC_MAX_RUNTIME_SECONDS,
+            help='Stop starting new batches after N seconds; 0 = no limit '
+                 f'(default: {settings.SILK_GC_MAX_RUNTIME_SECONDS})',
+        )
 
     def handle(self, *args, **options):
         from silk.models import Request
 
         days = options['days']
         dry_run = options['dry_run']
+        batch_size = max(1, options.get('batch_size') or settings.SILK_GC_BATCH_SIZE)
+        pause = options.get('sleep', settings.SILK_GC_SLEEP_SECONDS)
+        max_runtime = options.get('max_runtime', settings.SILK_GC_MAX_RUNTIME_SECONDS)
         cutoff = timezone.now() - timedelta(days=days)
 
         old_requests = Request.objects.filter(start_time__lt=cutoff)
@@ -42,8 +71,38 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.WARNING("DRY RUN: Nothing was deleted")
             )
-        else:
-            deleted, _ = old_requests.delete()
+            return
+
+        started = time.monotonic()
+        deleted = 0
+        requests_done = 0
+        batch = 0
+        while True:
+            pks = list(
+                old_requests.order_by('start_time').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+
+            batch_deleted, _ = old_requests.filter(pk__in=pks).delete()
+            deleted += batch_deleted
+            requests_done += len(pks)
+            batch += 1
             self.stdout.write(
-                self.style.SUCCESS(f"Deleted {deleted} records")
+                f"  - Batch {batch}: {len(pks)} requests ({batch_deleted} rows), "
+                f"{requests_done}/{count} done"
             )
+
+            if len(pks) < batch_size:
+                break
+            if max_runtime and time.monotonic() - started >= max_runtime:
+                self.stdout.write(self.style.WARNING(
+                    f"Max runtime of {max_runtime:g}s reached; remaining requests are left for the next run"
+                ))
+                break
+            if pause:
+                time.sleep(pause)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} records")
+        )
@@ -0,0 +1,45 @@
+"""
+Management command to verify a sharded media backup in parallel.
+
+Each worker checks one shard archive's checksum and re-hashes its members
+against the global manifest.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base_feature_project import backups
+
+
+class Command(BaseCommand):
+    help = 'Verify a sharded media backup against its manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'backup',
+            nargs='?',
+            help='Backup timestamp (default: latest)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Worker processes (default: BACKUP_WORKERS, or CPU count)',
+        )
+
+    def handle(self, *args, **options):
+        available = backups.list_snapshots(backups.sharded_dir())
+        if options['backup']:
+            backup = backups.sharded_dir() / options['backup']
+            if backup not in available:
+                raise CommandError(f"Sharded backup {options['backup']} not found")
+        elif available:
+            backup = available[-1]
+        else:
+            raise CommandError("No sharded backups found")
+
+        problems = backups.verify_sharded_backup(backup, workers=options['workers'])
+        for problem in problems:
+            self.stderr.write(f"  - {problem}")
+        if problems:
+            raise CommandError(f"Sharded backup {backup.name} failed verification ({len(problems)} problem(s))")
+        self.stdout.write(self.style.SUCCESS(f"Sharded backup {backup.name}: all shards verified"))
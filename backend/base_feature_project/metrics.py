@@ -0,0 +1,390 @@
+"""
+Prometheus-style metrics aggregated across worker processes.
+
+Each process keeps counters/histograms/gauges in memory and writes them to
+``METRICS_DIR/<host>-<pid>.json`` at most every ``METRICS_FLUSH_SECONDS``
+(atomically, from the request that crosses the interval). ``/api/metrics/``
+flushes its own process, sums every process file and renders the Prometheus
+text exposition format, so a scrape sees all gunicorn workers and the Huey
+consumer no matter which worker answers it.
+
+Counters and histograms from exited processes are kept: a scrape that finds
+the file of a dead pid on its own host folds it into ``archive.json`` and
+deletes it, so worker restarts neither reset the totals nor pile up files.
+Gauges are only reported for live processes.
+
+Metrics:
+- http_requests_total{view,method,status}
+- http_request_duration_seconds{view,method} (histogram)
+- db_queries_per_request{view} (histogram), db_query_duration_seconds_total{view}
+- cache_requests_total{cache,result}
+- huey_task_duration_seconds{task,outcome} (histogram), huey_queue_depth
+- process_resident_memory_bytes{pid}
+"""
+
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from base_feature_project.profiling import write_json_atomic
+from base_feature_project.query_hooks import instrument_queries
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+TASK_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+ARCHIVE_NAME = 'archive.json'
+
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP responses by URL name, method and status.'),
+    'http_request_duration_seconds': ('histogram', 'Request latency by URL name and method.'),
+    'db_queries_per_request': ('histogram', 'SQL queries executed per request.'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in SQL queries.'),
+    'cache_requests_total': ('counter', 'Cache lookups by cache and result (hit/miss).'),
+    'huey_task_duration_seconds': ('histogram', 'Huey task run time by task and outcome.'),
+    'huey_queue_depth': ('gauge', 'Tasks waiting in the Huey queue.'),
+    'process_resident_memory_bytes': ('gauge', 'Resident set size per process.'),
+}
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for key, value in sorted(labels.items())
+    )
+
+
+def _empty_data():
+    return {'counter': {}, 'histogram': {}, 'gauge': {}}
+
+
+class Registry:
+    """In-memory metrics of one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = _empty_data()
+        self._last_flush = 0.0
+
+    def inc(self, name, labels=None, value=1):
+        key = _labels(labels)
+        with self._lock:
+            series = self._data['counter'].setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = _labels(labels)
+        with self._lock:
+            series = self._data['histogram'].setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {'le': list(buckets), 'counts': [0] * len(buckets), 'sum': 0, 'count': 0}
+            for i, bound in enumerate(hist['le']):
+                if value <= bound:
+                    hist['counts'][i] += 1
+            hist['sum'] += value
+            hist['count'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+    def flush_due(self):
+        return time.monotonic() - self._last_flush >= settings.METRICS_FLUSH_SECONDS
+
+    def flush(self, directory=None, force=False):
+        """Write this process' metrics file if the flush interval has passed."""
+        if not force and not self.flush_due():
+            return None
+        self._last_flush = time.monotonic()
+        data = self.snapshot()
+        data['gauge']['process_resident_memory_bytes'] = {
+            _labels({'pid': os.getpid()}): resident_memory_bytes(),
+        }
+        data['pid'] = os.getpid()
+        path = Path(directory or settings.METRICS_DIR) / f'{socket.gethostname()}-{os.getpid()}.json'
+        write_json_atomic(path, data)
+        return path
+
+
+registry = Registry()
+
+
+def resident_memory_bytes():
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        # ru_maxrss is KiB on Linux; only reached off-Linux, where it is the peak RSS.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _load(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(merged, data):
+    for name, series in data['counter'].items():
+        target = merged['counter'].setdefault(name, {})
+        for key, value in series.items():
+            target[key] = target.get(key, 0) + value
+    for name, series in data['histogram'].items():
+        target = merged['histogram'].setdefault(name, {})
+        for key, hist in series.items():
+            current = target.get(key)
+            if current is None:
+                target[key] = hist
+            else:
+                current['counts'] = [a + b for a, b in zip(current['counts'], hist['counts'])]
+                current['sum'] += hist['sum']
+                current['count'] += hist['count']
+    for name, series in data['gauge'].items():
+        merged['gauge'].setdefault(name, {}).update(series)
+
+
+def _dead_local_files(directory):
+    host = socket.gethostname()
+    dead = []
+    for path in directory.glob(f'{host}-*.json'):
+        pid = path.stem[len(host) + 1:]
+        if pid.isdigit() and not _pid_alive(int(pid)):
+            dead.append(path)
+    return dead
+
+
+def archive_dead_processes(directory=None):
+    """
+    Fold the counters and histograms of exited processes on this host into
+    ``archive.json`` and delete their files. Concurrent scrapes serialize on
+    a lock file, so each dead file is archived once.
+    """
+    directory = Path(directory or settings.METRICS_DIR)
+    if not directory.exists() or not _dead_local_files(directory):
+        return []
+    archive_path = directory / ARCHIVE_NAME
+    with open(directory / '.archive.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        dead = _dead_local_files(directory)
+        archive = _load(archive_path) or _empty_data()
+        for path in dead:
+            data = _load(path)
+            if data is not None:
+                data['gauge'] = {}
+                _merge(archive, data)
+        write_json_atomic(archive_path, archive)
+        for path in dead:
+            path.unlink(missing_ok=True)
+    return dead
+
+
+def collect(directory=None):
+    """Sum the metrics files of every process (and the archive) into one data dict."""
+    directory = Path(directory or settings.METRICS_DIR)
+    merged = _empty_data()
+    archive_dead_processes(directory)
+    for path in sorted(directory.glob('*.json')) if directory.exists() else []:
+        data = _load(path)
+        if data is not None:
+            _merge(merged, data)
+    return merged
+
+
+def _series(name, key, extra=''):
+    labels = ','.join(part for part in (key, extra) if part)
+    return f'{name}{{{labels}}}' if labels else name
+
+
+def render(data):
+    """Render collected data in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for kind in ('counter', 'gauge', 'histogram'):
+        for name in sorted(data[kind]):
+            help_text = METRICS.get(name, (kind, name))[1]
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key, value in sorted(data[kind][name].items()):
+                if kind != 'histogram':
+                    lines.append(f'{_series(name, key)} {value}')
+                    continue
+                for bound, count in zip(value['le'], value['counts']):
+                    lines.append('{} {}'.format(_series(name + '_bucket', key, 'le="%s"' % bound), count))
+                lines.append('{} {}'.format(_series(name + '_bucket', key, 'le="+Inf"'), value['count']))
+                lines.append('{} {}'.format(_series(name + '_sum', key), value['sum']))
+                lines.append('{} {}'.format(_series(name + '_count', key), value['count']))
+    return '\n'.join(lines) + '\n'
+
+
+def record_cache_lookup(cache_name, hit):
+    if settings.METRICS_ENABLED:
+        registry.inc('cache_requests_total', {'cache': cache_name, 'result': 'hit' if hit else 'miss'})
+
+
+def huey_queue_depth():
+    try:
+        from huey.contrib.djhuey import HUEY
+        return HUEY.pending_count()
+    except Exception:  # broker down: report nothing rather than fail the scrape
+        return None
+
+
+_task_starts = {}
+
+
+def _on_huey_signal(signal, task, exc=None):
+    from huey.signals import SIGNAL_ERROR, SIGNAL_EXECUTING
+
+    if signal == SIGNAL_EXECUTING:
+        _task_starts[task.id] = time.monotonic()
+        return
+    start = _task_starts.pop(task.id, None)
+    if start is None:
+        return
+    outcome = 'error' if signal == SIGNAL_ERROR else 'complete'
+    registry.observe(
+        'huey_task_duration_seconds', time.monotonic() - start,
+        {'task': task.name, 'outcome': outcome}, buckets=TASK_BUCKETS,
+    )
+    # Tasks are rare compared to requests: write through so a scrape sees them.
+    registry.flush(force=True)
+
+
+def connect_huey_signals(huey):
+    from huey.signals import SIGNAL_COMPLETE, SIGNAL_ERROR, SIGNAL_EXECUTING
+
+    huey.signal(SIGNAL_EXECUTING, SIGNAL_COMPLETE, SIGNAL_ERROR)(_on_huey_signal)
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """Record request latency and DB usage (every alias) per URL name into the process registry."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with instrument_queries(_QueryCounter()) as counter:
+            response = self.get_response(request)
+        self.record(request, response, start, counter)
+        registry.flush()
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with instrument_queries(_QueryCounter()) as counter:
+            response = await self.get_response(request)
+        self.record(request, response, start, counter)
+        if registry.flush_due():
+            # The flush writes a file; keep that off the event loop.
+            await sync_to_async(registry.flush, thread_sensitive=False)()
+        return response
+
+    def record(self, request, response, start, counter):
+        duration = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or 'unresolved'
+        registry.inc('http_requests_total', {'view': view, 'method': request.method, 'status': response.status_code})
+        registry.observe('http_request_duration_seconds', duration, {'view': view, 'method': request.method})
+        registry.observe('db_queries_per_request', counter.count, {'view': view}, buckets=QUERY_COUNT_BUCKETS)
+        registry.inc('db_query_duration_seconds_total', {'view': view}, counter.seconds)
+
+
+class InstrumentedCacheMixin:
+    """Count hits/misses of ``get``/``get_many`` as ``cache_requests_total``."""
+
+    _miss = object()
+    # BaseCache.get_many() loops over get(); don't count those lookups twice.
+    _in_get_many = threading.local()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._miss, version=version)
+        if not getattr(self._in_get_many, 'active', False):
+            record_cache_lookup('default', value is not self._miss)
+        return default if value is self._miss else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        self._in_get_many.active = True
+        try:
+            found = super().get_many(keys, version=version)
+        finally:
+            self._in_get_many.active = False
+        if settings.METRICS_ENABLED:
+            hits = len(found)
+            registry.inc('cache_requests_total', {'cache': 'default', 'result': 'hit'}, hits)
+            registry.inc('cache_requests_total', {'cache': 'default', 'result': 'miss'}, len(keys) - hits)
+        return found
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires ``Authorization: Bearer <METRICS_TOKEN>``
+    when METRICS_TOKEN is set; 404 unless METRICS_ENABLED.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=403)
+
+    registry.flush(force=True)
+    data = collect()
+    depth = huey_queue_depth()
+    if depth is not None:
+        data['gauge']['huey_queue_depth'] = {'': depth}
+    return HttpResponse(render(data), content_type='text/plain; version=0.0.4; charset=utf-8')
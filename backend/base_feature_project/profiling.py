@@ -0,0 +1,310 @@
+"""
+Low-overhead sampling request/query profiler (production-safe Silk alternative).
+
+``SamplingProfilerMiddleware`` records a random ``PROFILING_SAMPLE_RATE``
+fraction of requests. Unsampled requests only pay for one ``random()`` call.
+For a sampled request it times the request and every SQL query on every
+database alias (through ``query_hooks``) and appends a compact sample to a
+per-process ring buffer. It never writes to the database. The middleware
+runs natively in async mode, so async views pay no thread hop for it.
+
+Every ``PROFILING_FLUSH_SECONDS`` the buffer is aggregated into
+- per-view latency histograms and query counts;
+- the top ``PROFILING_TOP_SQL`` SQL fingerprints by total time.
+
+The aggregate is written as a spool file. The ``aggregate_profiling_data``
+Huey task merges the spool files of all workers into a daily
+``logs/profiling/profile-YYYY-MM-DD.json``.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from base_feature_project.query_hooks import instrument_queries
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint_sql(sql):
+    """
+    Normalize ``sql`` so queries differing only in literals share one fingerprint.
+
+    String and numeric literals become ``%s`` (Django's placeholder).
+    ``IN (...)`` lists collapse to ``IN (...)``.
+    """
+    sql = _STRING_RE.sub('%s', sql)
+    sql = _NUMBER_RE.sub('%s', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def bucket_index(duration_ms):
+    for i, bound in enumerate(LATENCY_BUCKETS_MS):
+        if duration_ms <= bound:
+            return i
+    return len(LATENCY_BUCKETS_MS)
+
+
+def empty_profile():
+    return {'samples': 0, 'views': {}, 'sql': {}}
+
+
+def _empty_view():
+    return {
+        'count': 0,
+        'total_ms': 0.0,
+        'max_ms': 0.0,
+        'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        'queries': 0,
+        'max_queries': 0,
+        'db_ms': 0.0,
+        'n_plus_one': 0,
+    }
+
+
+def _trim_sql(sql_stats, top_n):
+    if len(sql_stats) <= top_n:
+        return sql_stats
+    ranked = sorted(sql_stats.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+    return dict(ranked[:top_n])
+
+
+def merge_profiles(target, other, top_n=None):
+    """Add the aggregate ``other`` into ``target`` (in place) and return it."""
+    target['samples'] += other['samples']
+    for name, stats in other['views'].items():
+        view = target['views'].setdefault(name, _empty_view())
+        view['count'] += stats['count']
+        view['total_ms'] += stats['total_ms']
+        view['max_ms'] = max(view['max_ms'], stats['max_ms'])
+        view['buckets'] = [a + b for a, b in zip(view['buckets'], stats['buckets'])]
+        view['queries'] += stats['queries']
+        view['max_queries'] = max(view['max_queries'], stats['max_queries'])
+        view['db_ms'] += stats['db_ms']
+        view['n_plus_one'] += stats['n_plus_one']
+    for fingerprint, stats in other['sql'].items():
+        entry = target['sql'].setdefault(
+            fingerprint, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'view': stats['view']},
+        )
+        entry['count'] += stats['count']
+        entry['total_ms'] += stats['total_ms']
+        if stats['max_ms'] >= entry['max_ms']:
+            entry['max_ms'] = stats['max_ms']
+            entry['view'] = stats['view']
+    target['sql'] = _trim_sql(target['sql'], top_n or settings.PROFILING_TOP_SQL)
+    return target
+
+
+def write_json_atomic(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, 'w') as fh:
+        json.dump(data, fh, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+class _QueryCollector:
+    """``execute_wrapper`` hook timing each query of one request."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - start) * 1000))
+
+
+class ProfileBuffer:
+    """
+    Per-process ring buffer of request samples.
+
+    A sample is ``(view_name, duration_ms, [(sql, ms), ...])``. When flushes
+    fall behind, the oldest samples are dropped instead of growing memory.
+    """
+
+    def __init__(self, size):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, view_name, duration_ms, queries):
+        self._samples.append((view_name, duration_ms, queries))
+
+    def drain(self):
+        """Aggregate and clear the buffered samples."""
+        samples = []
+        with self._lock:
+            self._last_flush = time.monotonic()
+            # popleft() instead of clear() so samples appended meanwhile are kept.
+            while self._samples:
+                samples.append(self._samples.popleft())
+        return aggregate_samples(samples)
+
+    def flush_due(self):
+        return time.monotonic() - self._last_flush >= settings.PROFILING_FLUSH_SECONDS
+
+    def flush(self, spool_dir=None):
+        """Write the aggregated samples to a spool file. Returns its path, or None if empty."""
+        profile = self.drain()
+        if not profile['samples']:
+            return None
+        spool_dir = Path(spool_dir or settings.PROFILING_SPOOL_DIR)
+        path = spool_dir / f'{socket.gethostname()}-{os.getpid()}-{time.time_ns()}.json'
+        write_json_atomic(path, profile)
+        return path
+
+
+def aggregate_samples(samples):
+    profile = empty_profile()
+    threshold = settings.N_PLUS_ONE_THRESHOLD
+    sql_stats = {}
+    for view_name, duration_ms, queries in samples:
+        view = profile['views'].setdefault(view_name, _empty_view())
+        view['count'] += 1
+        view['total_ms'] += duration_ms
+        view['max_ms'] = max(view['max_ms'], duration_ms)
+        view['buckets'][bucket_index(duration_ms)] += 1
+        view['queries'] += len(queries)
+        view['max_queries'] = max(view['max_queries'], len(queries))
+
+        repeats = Counter()
+        for sql, ms in queries:
+            fingerprint = fingerprint_sql(sql)
+            repeats[fingerprint] += 1
+            view['db_ms'] += ms
+            entry = sql_stats.setdefault(
+                fingerprint, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'view': view_name},
+            )
+            entry['count'] += 1
+            entry['total_ms'] += ms
+            if ms >= entry['max_ms']:
+                entry['max_ms'] = ms
+                entry['view'] = view_name
+        if repeats and max(repeats.values()) >= threshold:
+            view['n_plus_one'] += 1
+
+    profile['samples'] = len(samples)
+    profile['sql'] = _trim_sql(sql_stats, settings.PROFILING_TOP_SQL)
+    return profile
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ProfileBuffer(settings.PROFILING_RING_SIZE)
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+class SamplingProfilerMiddleware:
+    """Profile a random sample of requests into the per-process ring buffer."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with instrument_queries(_QueryCollector()) as collector:
+            response = self.get_response(request)
+        self.record(request, start, collector)
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        with instrument_queries(_QueryCollector()) as collector:
+            response = await self.get_response(request)
+        self.record(request, start, collector)
+        return response
+
+    def record(self, request, start, collector):
+        duration_ms = (time.perf_counter() - start) * 1000
+        buffer = get_buffer()
+        buffer.record(_view_name(request), duration_ms, collector.queries)
+        if buffer.flush_due():
+            buffer.flush()
+
+
+def collect_spool(spool_dir=None, reports_dir=None, day=None):
+    """
+    Merge every spool file into the daily summary and delete the spool files.
+
+    :return: ``(files merged, summary path or None)``
+    """
+    spool_dir = Path(spool_dir or settings.PROFILING_SPOOL_DIR)
+    reports_dir = Path(reports_dir or settings.PROFILING_REPORTS_DIR)
+    spool_files = sorted(spool_dir.glob('*.json')) if spool_dir.exists() else []
+    if not spool_files:
+        return 0, None
+
+    summary_path = reports_dir / f'profile-{day or time.strftime("%Y-%m-%d")}.json'
+    summary = empty_profile()
+    if summary_path.exists():
+        with open(summary_path) as fh:
+            summary = json.load(fh)
+
+    merged = 0
+    for path in spool_files:
+        try:
+            with open(path) as fh:
+                merge_profiles(summary, json.load(fh))
+            merged += 1
+        except ValueError:
+            logger.warning('Discarding unreadable profiling spool file %s', path)
+
+    write_json_atomic(summary_path, summary)
+    for path in spool_files:
+        path.unlink(missing_ok=True)
+    return merged, summary_path
@@ -0,0 +1,107 @@
+"""
+Per-view SQL query budgets.
+
+A view declares the most queries one request may run::
+
+    @query_budget(4)
+    @api_view(['GET'])
+    def product_list(request):
+        ...
+
+``QueryBudgetMiddleware`` counts the queries of every request and compares
+them with the budget of the view that handled it. ``QUERY_BUDGET_MODE``
+decides what happens on a violation:
+
+- ``raise``: raise ``QueryBudgetExceeded`` (DEBUG and the test suite, so an
+  N+1 fails the request and CI);
+- ``log``: log a warning on the ``query_budget`` logger;
+- ``off``: the middleware is not installed (the default without DEBUG).
+
+Views without a budget are counted but never checked. Queries on every
+database alias count (see ``query_hooks``), and the middleware runs natively
+in async mode, so async views pay no thread hop for it.
+"""
+
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from base_feature_project.query_hooks import instrument_queries
+
+logger = logging.getLogger('query_budget')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more SQL queries than its view's budget."""
+
+
+def query_budget(max_queries):
+    """
+    Declare the query budget of a view.
+
+    Apply it outside ``@api_view`` (or to an ``APIView``/``View`` class) so
+    the budget lands on the callable the URLconf resolves to.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def get_query_budget(view_func):
+    """Budget declared on a resolved view function or its class, or None."""
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is not None:
+        return budget
+    view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+    return getattr(view_class, 'query_budget', None)
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware:
+    """Enforce the ``@query_budget`` of the resolved view."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with instrument_queries(_QueryCounter()) as counter:
+            response = self.get_response(request)
+        return self.check_budget(request, response, counter)
+
+    async def __acall__(self, request):
+        with instrument_queries(_QueryCounter()) as counter:
+            response = await self.get_response(request)
+        return self.check_budget(request, response, counter)
+
+    def check_budget(self, request, response, counter):
+        match = getattr(request, 'resolver_match', None)
+        budget = get_query_budget(match.func) if match else None
+        if budget is None or len(counter.queries) <= budget:
+            return response
+
+        view = match.view_name or match._func_path
+        message = (
+            f'{request.method} {request.path} ({view}) ran {len(counter.queries)} queries, '
+            f'budget is {budget}'
+        )
+        if settings.QUERY_BUDGET_MODE == 'raise':
+            raise QueryBudgetExceeded(message + ':\n' + '\n'.join(counter.queries))
+        logger.warning(message)
+        return response
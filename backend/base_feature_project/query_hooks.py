@@ -0,0 +1,62 @@
+"""
+Per-request SQL hooks that see every database alias, under WSGI and ASGI.
+
+``connection.execute_wrapper`` only wraps one alias in the current thread.
+Queries routed to a replica use another alias, and under ASGI the async ORM
+runs queries on the request's executor thread, whose connections the
+middleware never touches. Instead, one dispatcher is installed on every
+connection when it connects, and ``instrument_queries`` activates a wrapper
+through a context variable. asgiref copies the context into
+``sync_to_async`` threads, so the wrapper follows the request without a
+thread hop.
+
+Queries run in threads started outside asgiref (e.g. a
+``ThreadPoolExecutor``) are not seen.
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_active_wrappers = ContextVar('query_hooks_active_wrappers', default=())
+
+
+def _dispatch(execute, sql, params, many, context):
+    wrappers = _active_wrappers.get()
+    # Same nesting as Connection.execute_wrappers: the first wrapper is outermost.
+    for wrapper in reversed(wrappers):
+        execute = functools.partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def _install(connection):
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dispatch)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _install(connection)
+
+
+connection_created.connect(_on_connection_created, dispatch_uid='query_hooks')
+
+
+@contextmanager
+def instrument_queries(wrapper):
+    """
+    Call ``wrapper`` (an ``execute_wrapper`` hook) for every query of the block, on every alias.
+
+    Usable around ``get_response`` in sync and async middleware alike.
+    """
+    # Connections opened before this module was imported never sent
+    # connection_created to our receiver.
+    for connection in connections.all(initialized_only=True):
+        _install(connection)
+    token = _active_wrappers.set(_active_wrappers.get() + (wrapper,))
+    try:
+        yield wrapper
+    finally:
+        _active_wrappers.reset(token)
@@ -0,0 +1,94 @@
+"""
+Aggregation behind ``weekly_slow_queries_report``.
+
+Queries are grouped by SQL fingerprint (literals stripped, see
+``profiling.fingerprint_sql``) with count, total time and p50/p95/p99.
+A fingerprint executed ``N_PLUS_ONE_THRESHOLD`` or more times within a
+single request is reported as an N+1 together with the view that issued it.
+"""
+
+from collections import Counter, defaultdict
+
+from base_feature_project.profiling import fingerprint_sql
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list (0 for an empty list)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def build_query_report(rows, slow_threshold_ms, n_plus_one_threshold, limit=50):
+    """
+    Aggregate ``rows`` of ``(request_id, view_name, path, sql, time_ms)``.
+
+    Rows must be ordered by ``request_id`` so each request's queries can be
+    checked for repeats as they stream by.
+
+    :return: JSON-serializable dict with ``totals``, ``slow_fingerprints``
+        (max time above the threshold, by total time) and ``n_plus_one``.
+    """
+    times = defaultdict(list)
+    views = defaultdict(Counter)
+    n_plus_one = {}
+    totals = {'requests': 0, 'queries': 0}
+
+    current_request = object()
+    current_view = None
+    repeats = Counter()
+
+    def close_request():
+        for fingerprint, count in repeats.items():
+            if count < n_plus_one_threshold:
+                continue
+            entry = n_plus_one.setdefault(
+                (current_view, fingerprint),
+                {'view': current_view, 'fingerprint': fingerprint, 'requests': 0, 'max_repeats': 0},
+            )
+            entry['requests'] += 1
+            entry['max_repeats'] = max(entry['max_repeats'], count)
+
+    for request_id, view_name, path, sql, time_ms in rows:
+        if request_id != current_request:
+            close_request()
+            repeats.clear()
+            current_request = request_id
+            current_view = view_name or path
+            totals['requests'] += 1
+        fingerprint = fingerprint_sql(sql)
+        repeats[fingerprint] += 1
+        times[fingerprint].append(time_ms or 0.0)
+        views[fingerprint][current_view] += 1
+        totals['queries'] += 1
+    close_request()
+
+    slow = []
+    for fingerprint, values in times.items():
+        values.sort()
+        if values[-1] < slow_threshold_ms:
+            continue
+        slow.append({
+            'fingerprint': fingerprint,
+            'count': len(values),
+            'total_ms': round(sum(values), 2),
+            'p50_ms': round(percentile(values, 50), 2),
+            'p95_ms': round(percentile(values, 95), 2),
+            'p99_ms': round(percentile(values, 99), 2),
+            'max_ms': round(values[-1], 2),
+            'views': [view for view, _ in views[fingerprint].most_common(3)],
+        })
+    slow.sort(key=lambda entry: entry['total_ms'], reverse=True)
+
+    suspects = sorted(
+        n_plus_one.values(),
+        key=lambda entry: (entry['requests'], entry['max_repeats']),
+        reverse=True,
+    )
+
+    return {
+        'totals': {**totals, 'fingerprints': len(times)},
+        'slow_fingerprints': slow[:limit],
+        'n_plus_one': suspects[:limit],
+    }
@@ -29,6 +29,8 @@ load_dotenv(BASE_DIR / '.env')
 DJANGO_ENV = os.getenv('DJANGO_ENV', 'development')
 IS_PRODUCTION = DJANGO_ENV == 'production'
 ENABLE_SILK = os.getenv('ENABLE_SILK', 'false').lower() in {'1', 'true', 'yes', 'on'}
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() in {'1', 'true', 'yes', 'on'}
+METRICS_ENABLED = os.getenv('DJANGO_METRICS_ENABLED', 'false').lower() in {'1', 'true', 'yes', 'on'}
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', 'change-me')
@@ -36,6 +38,13 @@ SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', 'change-me')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DJANGO_DEBUG', 'true').lower() in {'1', 'true', 'yes', 'on'}
 
+# Per-view query budgets (@query_budget): 'raise' fails the request, 'log'
+# warns on the query_budget logger (the production default), 'off' skips the
+# middleware.
+QUERY_BUDGET_MODE = os.getenv('QUERY_BUDGET_MODE', 'raise' if DEBUG else 'log').strip().lower()
+if QUERY_BUDGET_MODE not in {'raise', 'log', 'off'}:
+    raise ValueError(f"QUERY_BUDGET_MODE must be 'raise', 'log' or 'off', got {QUERY_BUDGET_MODE!r}")
+
 ALLOWED_HOSTS = [h.strip() for h in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',') if h.strip()]
 
 
@@ -57,6 +66,7 @@ INSTALLED_APPS = [
     'django_cleanup.apps.CleanupConfig',
     'dbbackup',
     'huey.contrib.djhuey',
+    'base_feature_project',
 ]
 
 if ENABLE_SILK:
@@ -75,8 +85,14 @@ THUMBNAIL_ALIASES = {
 THUMBNAIL_DEFAULT_STORAGE = 'default'
 
 MIDDLEWARE = []
+if METRICS_ENABLED:
+    MIDDLEWARE.append('base_feature_project.metrics.MetricsMiddleware')
 if ENABLE_SILK:
     MIDDLEWARE.append('silk.middleware.SilkyMiddleware')
+if PROFILING_ENABLED:
+    MIDDLEWARE.append('base_feature_project.profiling.SamplingProfilerMiddleware')
+if QUERY_BUDGET_MODE != 'off':
+    MIDDLEWARE.append('base_feature_project.query_budget.QueryBudgetMiddleware')
 MIDDLEWARE += [
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -118,15 +134,81 @@ CSRF_TRUSTED_ORIGINS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'base_feature_app.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 }
 
+# ---------------------------------------------------------------------------
+# Pagination — list API views paginate when called with ?page= (page_size
+# overrides the size up to the max). Unfiltered counts of tables with at least
+# ESTIMATED_COUNT_THRESHOLD rows come from table statistics instead of
+# COUNT(*) (MySQL/PostgreSQL; SQLite always counts exactly).
+# ---------------------------------------------------------------------------
+API_PAGE_SIZE = int(os.getenv('DJANGO_API_PAGE_SIZE', '50'))
+API_MAX_PAGE_SIZE = int(os.getenv('DJANGO_API_MAX_PAGE_SIZE', '500'))
+ESTIMATED_COUNT_THRESHOLD = int(os.getenv('DJANGO_ESTIMATED_COUNT_THRESHOLD', '100000'))
+
 GOOGLE_OAUTH_CLIENT_ID = os.getenv('DJANGO_GOOGLE_CLIENT_ID', '').strip()
 
+# ---------------------------------------------------------------------------
+# Async views (ASGI) — route hot endpoints to async-native views.
+# Password hashing in async views runs on a bounded pool; requests beyond
+# workers + queue are shed with 503 instead of piling up.
+# ---------------------------------------------------------------------------
+ASYNC_VIEWS_ENABLED = os.getenv('DJANGO_ASYNC_VIEWS', 'false').lower() in {'1', 'true', 'yes', 'on'}
+PASSWORD_HASHING_WORKERS = int(os.getenv('DJANGO_PASSWORD_HASHING_WORKERS', '4'))
+PASSWORD_HASHING_MAX_QUEUE = int(os.getenv('DJANGO_PASSWORD_HASHING_MAX_QUEUE', '32'))
+
+# ---------------------------------------------------------------------------
+# Cache — shared Redis cache when DJANGO_CACHE_URL is set, locmem otherwise.
+# ---------------------------------------------------------------------------
+_cache_url = os.getenv('DJANGO_CACHE_URL', '').strip()
+if _cache_url:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': _cache_url,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+if METRICS_ENABLED:
+    # Same backends, counting get/get_many hits and misses for /api/metrics/.
+    CACHES['default']['BACKEND'] = (
+        'base_feature_project.metrics.InstrumentedRedisCache' if _cache_url
+        else 'base_feature_project.metrics.InstrumentedLocMemCache'
+    )
+
+# ---------------------------------------------------------------------------
+# Rate limiting (sliding window, per IP and per email) for auth endpoints.
+# Rates use the '<count>/<s|m|h|d>' format. RATE_LIMIT_PROXY_COUNT is the
+# number of trusted reverse proxies appending to X-Forwarded-For (nginx: 1).
+# ---------------------------------------------------------------------------
+RATE_LIMIT_ENABLED = os.getenv('DJANGO_RATE_LIMIT_ENABLED', 'true').lower() in {'1', 'true', 'yes', 'on'}
+RATE_LIMIT_CACHE_ALIAS = 'default'
+RATE_LIMIT_PROXY_COUNT = int(os.getenv('DJANGO_RATE_LIMIT_PROXY_COUNT', '0'))
+RATE_LIMITS = {
+    'sign_in': {
+        'ip': os.getenv('DJANGO_RATE_LIMIT_SIGN_IN_IP', '30/m'),
+        'email': os.getenv('DJANGO_RATE_LIMIT_SIGN_IN_EMAIL', '10/m'),
+    },
+    'send_passcode': {
+        'ip': os.getenv('DJANGO_RATE_LIMIT_SEND_PASSCODE_IP', '20/h'),
+        'email': os.getenv('DJANGO_RATE_LIMIT_SEND_PASSCODE_EMAIL', '5/h'),
+    },
+    'verify_passcode': {
+        'ip': os.getenv('DJANGO_RATE_LIMIT_VERIFY_PASSCODE_IP', '30/h'),
+        'email': os.getenv('DJANGO_RATE_LIMIT_VERIFY_PASSCODE_EMAIL', '10/h'),
+    },
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(
         minutes=int(os.getenv('DJANGO_JWT_ACCESS_MINUTES', '15'))
@@ -137,8 +219,17 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'base_feature_app.serializers.token.ClaimsTokenObtainPairSerializer',
+    # Rotated refresh tokens are revoked in BlacklistedRefreshToken (hashed jti).
+    'TOKEN_REFRESH_SERIALIZER': 'base_feature_app.serializers.token.BlacklistTokenRefreshSerializer',
 }
 
+# Seconds a User row fetched by JWT authentication is reused per process
+# (0 disables), and how many users each process keeps at most (least recently
+# used are evicted). Saves/deletes in the same process invalidate immediately.
+JWT_USER_CACHE_TTL = int(os.getenv('DJANGO_JWT_USER_CACHE_TTL', '30'))
+JWT_USER_CACHE_MAX_SIZE = int(os.getenv('DJANGO_JWT_USER_CACHE_MAX_SIZE', '10000'))
+
 ROOT_URLCONF = 'base_feature_project.urls'
 
 TEMPLATES = [
@@ -176,6 +267,11 @@ if 'sqlite3' not in _db_engine:
         'PORT': os.getenv('DB_PORT', '3306'),
     })
 DATABASES = {'default': _db_config}
+# Read replicas (aliases in DATABASES) used by base_feature_project.db_routers;
+# settings_prod builds them from DJANGO_DB_REPLICA_HOSTS.
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DJANGO_DB_REPLICA_PIN_SECONDS', '5'))
+DATABASE_REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv('DJANGO_DB_REPLICA_HEALTH_CHECK_SECONDS', '10'))
 
 
 # Password validation
@@ -223,6 +319,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Store attachment uploads under their SHA-256 (attachments/sha256/ab/cd/<digest>.<ext>)
+# so identical files are stored and thumbnailed once; a file is deleted when the
+# last attachment referencing it is gone. Existing files keep their names.
+ATTACHMENTS_CONTENT_ADDRESSED = os.getenv('DJANGO_ATTACHMENTS_CONTENT_ADDRESSED', 'false').lower() in {'1', 'true', 'yes', 'on'}
+
+# Chunked (resumable) attachment uploads are assembled here. On the same filesystem
+# as MEDIA_ROOT the completed file is moved into place instead of copied.
+ATTACHMENTS_CHUNKED_UPLOAD_DIR = os.getenv('DJANGO_ATTACHMENTS_CHUNKED_UPLOAD_DIR', '') or None
+ATTACHMENTS_UPLOAD_CHUNK_SIZE = int(os.getenv('DJANGO_ATTACHMENTS_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+ATTACHMENTS_CHUNKED_UPLOAD_EXPIRY = int(os.getenv('DJANGO_ATTACHMENTS_CHUNKED_UPLOAD_EXPIRY', str(24 * 3600)))
+ATTACHMENTS_CHUNKED_UPLOAD_MAX_SIZE = int(os.getenv('DJANGO_ATTACHMENTS_CHUNKED_UPLOAD_MAX_SIZE', str(2 * 1024 * 1024 * 1024)))
+
 STORAGES = {
     'default': {
         'BACKEND': 'django.core.files.storage.FileSystemStorage',
@@ -302,6 +410,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'query_budget': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
 
@@ -314,6 +427,14 @@ DBBACKUP_FILENAME_TEMPLATE = '{datetime}.sql'
 DBBACKUP_MEDIA_FILENAME_TEMPLATE = '{datetime}.tar'
 DBBACKUP_CLEANUP_KEEP = 4
 DBBACKUP_CLEANUP_KEEP_MEDIA = 4
+# 'full': dbbackup + mediabackup tarballs. 'incremental': streaming gzip DB
+# dump + hard-link media snapshots (manage.py incremental_backup / restore_backup).
+# 'sharded': streaming gzip DB dump + per-shard media archives built by
+# BACKUP_WORKERS processes (manage.py parallel_media_backup / verify_media_backup).
+BACKUP_MODE = os.getenv('DJANGO_BACKUP_MODE', 'full').strip().lower()
+if BACKUP_MODE not in {'full', 'incremental', 'sharded'}:
+    raise ValueError(f"DJANGO_BACKUP_MODE must be 'full', 'incremental' or 'sharded', got {BACKUP_MODE!r}")
+BACKUP_WORKERS = int(os.getenv('DJANGO_BACKUP_WORKERS', '0'))  # 0 = CPU count
 
 # ---------------------------------------------------------------------------
 # Task Queue (Huey)
@@ -324,6 +445,9 @@ HUEY = RedisHuey(
     immediate=not IS_PRODUCTION,
 )
 
+PASSWORD_CODE_PURGE_BATCH_SIZE = int(os.getenv('DJANGO_PASSWORD_CODE_PURGE_BATCH_SIZE', '1000'))
+BLACKLISTED_TOKEN_PRUNE_BATCH_SIZE = int(os.getenv('DJANGO_BLACKLISTED_TOKEN_PRUNE_BATCH_SIZE', '5000'))
+
 # ---------------------------------------------------------------------------
 # Query Profiling (django-silk) — enabled via ENABLE_SILK env var
 # Production-only: DB recording for slow-query and N+1 monitoring.
@@ -360,6 +484,40 @@ if ENABLE_SILK:
 
 SLOW_QUERY_THRESHOLD_MS = int(os.getenv('SLOW_QUERY_THRESHOLD_MS', '500'))
 N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '10'))
+# silk_garbage_collect deletes in batches with a pause between them and
+# stops starting new batches once the runtime budget is spent.
+SILK_GC_BATCH_SIZE = int(os.getenv('SILK_GC_BATCH_SIZE', '500'))
+SILK_GC_SLEEP_SECONDS = float(os.getenv('SILK_GC_SLEEP_SECONDS', '0.5'))
+SILK_GC_MAX_RUNTIME_SECONDS = float(os.getenv('SILK_GC_MAX_RUNTIME_SECONDS', '900'))
+
+# ---------------------------------------------------------------------------
+# Sampling profiler (PROFILING_ENABLED) — in-memory, no DB writes per request.
+# Workers flush aggregated samples to PROFILING_SPOOL_DIR; the
+# aggregate_profiling_data Huey task merges them into daily JSON summaries.
+# ---------------------------------------------------------------------------
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0.01'))
+PROFILING_RING_SIZE = int(os.getenv('PROFILING_RING_SIZE', '1000'))
+PROFILING_FLUSH_SECONDS = int(os.getenv('PROFILING_FLUSH_SECONDS', '60'))
+PROFILING_TOP_SQL = int(os.getenv('PROFILING_TOP_SQL', '50'))
+PROFILING_REPORTS_DIR = LOGS_DIR / 'profiling'
+PROFILING_SPOOL_DIR = PROFILING_REPORTS_DIR / 'spool'
+
+# ---------------------------------------------------------------------------
+# Metrics (DJANGO_METRICS_ENABLED) — Prometheus text format at /api/metrics/.
+# Each process writes its metrics to METRICS_DIR every METRICS_FLUSH_SECONDS;
+# a scrape sums all files (gunicorn workers + Huey consumer) and folds files of
+# exited processes into archive.json. Production requires DJANGO_METRICS_TOKEN
+# (Bearer auth).
+# ---------------------------------------------------------------------------
+METRICS_DIR = Path(os.getenv('DJANGO_METRICS_DIR', str(LOGS_DIR / 'metrics')))
+METRICS_FLUSH_SECONDS = float(os.getenv('DJANGO_METRICS_FLUSH_SECONDS', '5'))
+METRICS_TOKEN = os.getenv('DJANGO_METRICS_TOKEN', '').strip()
+
+# ---------------------------------------------------------------------------
+# Deep health check (/api/health/deep/) — probe timeout and per-process memo.
+# ---------------------------------------------------------------------------
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv('HEALTH_CHECK_TIMEOUT_SECONDS', '2'))
+HEALTH_CHECK_CACHE_SECONDS = float(os.getenv('HEALTH_CHECK_CACHE_SECONDS', '5'))
 
 # ---------------------------------------------------------------------------
 # Frontend
@@ -8,6 +8,7 @@ lives in settings.py; this file only contains production overrides and
 validations.
 """
 
+import copy
 import os
 
 from .settings import BASE_DIR  # noqa: F401
@@ -27,6 +28,16 @@ if not os.getenv('DJANGO_SECRET_KEY'):
 if not os.getenv('DJANGO_ALLOWED_HOSTS'):
     raise ValueError("DJANGO_ALLOWED_HOSTS is required in production")
 
+# Rate limit counters live in the default cache. With the locmem fallback every
+# worker process would count on its own, multiplying each limit by the number
+# of workers.
+if RATE_LIMIT_ENABLED and not os.getenv('DJANGO_CACHE_URL', '').strip():  # noqa: F405
+    raise ValueError("DJANGO_CACHE_URL is required in production when DJANGO_RATE_LIMIT_ENABLED is on")
+
+# Without a token /api/metrics/ is served to anyone who can reach it.
+if METRICS_ENABLED and not METRICS_TOKEN:  # noqa: F405
+    raise ValueError("DJANGO_METRICS_TOKEN is required in production when DJANGO_METRICS_ENABLED is on")
+
 # ---------------------------------------------------------------------------
 # Security hardening
 # ---------------------------------------------------------------------------
@@ -52,12 +63,52 @@ _db_config = {
     'PASSWORD': os.getenv('DB_PASSWORD', ''),
     'HOST': os.getenv('DB_HOST', 'localhost'),
     'PORT': os.getenv('DB_PORT', '3306'),
-    'OPTIONS': {
-        'charset': 'utf8mb4',
-    },
+    'OPTIONS': {'charset': 'utf8mb4'} if 'mysql' in _db_engine else {},
+    # Reuse each worker's connection for DJANGO_DB_CONN_MAX_AGE seconds instead
+    # of a TCP + auth handshake per request (keep it below MySQL's
+    # wait_timeout). Health checks ping a reused connection once per request so
+    # a server-side disconnect is reconnected instead of failing the request.
+    # Under ASGI (DJANGO_ASYNC_VIEWS) persistent connections are kept per
+    # thread and pile up, so the default there is 0.
+    'CONN_MAX_AGE': int(os.getenv('DJANGO_DB_CONN_MAX_AGE', '0' if ASYNC_VIEWS_ENABLED else '60')),  # noqa: F405
+    'CONN_HEALTH_CHECKS': os.getenv('DJANGO_DB_CONN_HEALTH_CHECKS', 'true').lower() in {'1', 'true', 'yes', 'on'},
 }
+# Under ASGI, use a connection pool instead of persistent connections (Django's
+# built-in pool is PostgreSQL-only and needs `pip install "psycopg[pool]"` —
+# for MySQL keep DJANGO_DB_CONN_MAX_AGE=0 behind an external pooler such as ProxySQL).
+if os.getenv('DJANGO_DB_POOL', 'false').lower() in {'1', 'true', 'yes', 'on'}:
+    if 'postgresql' not in _db_engine:
+        raise ValueError("DJANGO_DB_POOL requires DJANGO_DB_ENGINE=django.db.backends.postgresql")
+    _db_config['CONN_MAX_AGE'] = 0  # pooled connections are returned after each request
+    _db_config['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DJANGO_DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DJANGO_DB_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.getenv('DJANGO_DB_POOL_TIMEOUT', '10')),
+    }
 DATABASES = {'default': _db_config}
 
+# ---------------------------------------------------------------------------
+# Read replicas — GET requests (and replica_reads() blocks such as the weekly
+# query report) read from DJANGO_DB_REPLICA_HOSTS in round-robin; see
+# base_feature_project/db_routers.py. Replicas share the primary's settings
+# unless DJANGO_DB_REPLICA_USER / DJANGO_DB_REPLICA_PASSWORD are set.
+# ---------------------------------------------------------------------------
+_replica_hosts = [h.strip() for h in os.getenv('DJANGO_DB_REPLICA_HOSTS', '').split(',') if h.strip()]
+for _index, _replica_host in enumerate(_replica_hosts, start=1):
+    _host, _, _port = _replica_host.partition(':')
+    DATABASES[f'replica{_index}'] = {
+        **copy.deepcopy(_db_config),
+        'HOST': _host,
+        'PORT': _port or _db_config['PORT'],
+        'USER': os.getenv('DJANGO_DB_REPLICA_USER', _db_config['USER']),
+        'PASSWORD': os.getenv('DJANGO_DB_REPLICA_PASSWORD', _db_config['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['base_feature_project.db_routers.ReplicaRouter']
+    MIDDLEWARE = ['base_feature_project.db_routers.ReplicaRoutingMiddleware', *MIDDLEWARE]  # noqa: F405
+
 # ---------------------------------------------------------------------------
 # Production email — require SMTP backend
 # ---------------------------------------------------------------------------
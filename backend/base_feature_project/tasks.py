@@ -6,6 +6,7 @@ Tasks:
 - silk_garbage_collection: Daily cleanup of Silk profiling data (4:00 AM)
 - weekly_slow_queries_report: Weekly performance report (Mondays 8:00 AM)
 - silk_reports_cleanup: Monthly cleanup of Silk report files older than 6 months
+- aggregate_profiling_data: Merge sampling-profiler spool files every 5 minutes
 """
 
 import logging
@@ -16,15 +17,22 @@ from pathlib import Path
 from django.conf import settings
 from django.utils import timezone
 from huey import crontab
-from huey.contrib.djhuey import db_periodic_task
+from huey.contrib.djhuey import HUEY, db_periodic_task
 
 logger = logging.getLogger('backups')
 
+if getattr(settings, 'METRICS_ENABLED', False):
+    from base_feature_project.metrics import connect_huey_signals
+
+    connect_huey_signals(HUEY)
+
 
 @db_periodic_task(crontab(day_of_week='0', hour='3', minute='0'))
 def scheduled_backup():
     """
     Automated weekly backup of database and media files (Sunday 03:00 UTC).
+    BACKUP_MODE selects full dbbackup/mediabackup archives, an incremental
+    snapshot or sharded parallel archives (see base_feature_project/backups.py).
     Storage: configured via BACKUP_STORAGE_PATH env var.
     Retention: 4 weeks (~1 month).
     """
@@ -32,9 +40,24 @@ def scheduled_backup():
 
     timestamp = timezone.now().strftime('%Y-%m-%d_%H%M%S')
 
-    logger.info('=== Starting scheduled backup %s ===', timestamp)
+    logger.info('=== Starting scheduled backup %s (%s) ===', timestamp, settings.BACKUP_MODE)
 
     try:
+        if settings.BACKUP_MODE == 'incremental':
+            output = StringIO()
+            call_command('incremental_backup', stdout=output)
+            logger.info(output.getvalue())
+            logger.info('=== Backup completed successfully ===')
+            return True
+
+        if settings.BACKUP_MODE == 'sharded':
+            output = StringIO()
+            call_command('incremental_backup', '--skip-media', stdout=output)
+            call_command('parallel_media_backup', stdout=output)
+            logger.info(output.getvalue())
+            logger.info('=== Backup completed successfully ===')
+            return True
+
         logger.info('Running database backup...')
         output = StringIO()
         call_command('dbbackup', '--compress', '--clean', stdout=output)
@@ -73,65 +96,76 @@ def silk_garbage_collection():
 @db_periodic_task(crontab(day_of_week='1', hour='8', minute='0'))
 def weekly_slow_queries_report():
     """
-    Weekly report of slow queries and potential N+1 patterns.
-    Output: backend/logs/silk-reports/silk-report-YYYY-MM-DD.log
+    Weekly report of slow query fingerprints and N+1 patterns.
+    Output: backend/logs/silk-reports/silk-report-YYYY-MM-DD.log and a
+    machine-readable .json twin (diffable week over week).
     Only runs if Silk is enabled.
     """
     if not getattr(settings, 'ENABLE_SILK', False):
         return
 
-    from django.db.models import Count
+    import json
 
     try:
-        from silk.models import Request, SQLQuery
+        from silk.models import SQLQuery
     except (ImportError, RuntimeError):
         logger.warning('django-silk is not installed or not enabled; skipping report.')
         return
 
+    from base_feature_project.db_routers import replica_reads
+    from base_feature_project.query_report import build_query_report
+
     week_ago = timezone.now() - timedelta(days=7)
     threshold_ms = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 500)
     n_plus_one_threshold = getattr(settings, 'N_PLUS_ONE_THRESHOLD', 10)
 
-    slow_queries = SQLQuery.objects.filter(
+    rows = SQLQuery.objects.filter(
         request__start_time__gte=week_ago,
-        time_taken__gte=threshold_ms,
-    ).select_related('request').order_by('-time_taken')[:50]
-
-    n_plus_one_suspects = Request.objects.filter(
-        start_time__gte=week_ago,
-    ).annotate(
-        query_count=Count('queries'),
-    ).filter(
-        query_count__gte=n_plus_one_threshold,
-    ).order_by('-query_count')[:20]
+    ).order_by('request_id').values_list(
+        'request_id', 'request__view_name', 'request__path', 'query', 'time_taken',
+    ).iterator(chunk_size=2000)
+
+    # A week of Silk rows is a long scan: keep it off the primary when replicas exist.
+    with replica_reads():
+        data = build_query_report(rows, threshold_ms, n_plus_one_threshold)
+    slow = data['slow_fingerprints']
+    suspects = data['n_plus_one']
+    report_date = timezone.now().strftime('%Y-%m-%d')
 
     report_lines = [
         '=' * 60,
-        f'WEEKLY QUERY REPORT - {timezone.now().strftime("%Y-%m-%d")}',
+        f'WEEKLY QUERY REPORT - {report_date}',
         '=' * 60,
         '',
-        f'## SLOW QUERIES (>{threshold_ms}ms)',
+        f"{data['totals']['requests']} requests, {data['totals']['queries']} queries, "
+        f"{data['totals']['fingerprints']} distinct fingerprints",
+        '',
+        f'## SLOW QUERY FINGERPRINTS (>{threshold_ms}ms)',
         '-' * 40,
     ]
 
-    if slow_queries:
-        for sq in slow_queries:
+    if slow:
+        for entry in slow:
             report_lines.append(
-                f'[{sq.time_taken:.0f}ms] {sq.request.path} - {sq.query[:100]}...'
+                f"[{entry['count']}x total {entry['total_ms']:.0f}ms "
+                f"p50 {entry['p50_ms']:.0f}ms p95 {entry['p95_ms']:.0f}ms "
+                f"p99 {entry['p99_ms']:.0f}ms max {entry['max_ms']:.0f}ms] "
+                f"{', '.join(str(v) for v in entry['views'])} - {entry['fingerprint'][:200]}"
             )
     else:
         report_lines.append('No slow queries found this week')
 
     report_lines.extend([
         '',
-        f'## POTENTIAL N+1 (>{n_plus_one_threshold} queries/request)',
+        f'## POTENTIAL N+1 (same fingerprint >={n_plus_one_threshold}x in one request)',
         '-' * 40,
     ])
 
-    if n_plus_one_suspects:
-        for req in n_plus_one_suspects:
+    if suspects:
+        for entry in suspects:
             report_lines.append(
-                f'[{req.query_count} queries] {req.path}'
+                f"[{entry['max_repeats']}x in one request, {entry['requests']} request(s)] "
+                f"{entry['view']} - {entry['fingerprint'][:200]}"
             )
     else:
         report_lines.append('No N+1 patterns detected this week')
@@ -141,16 +175,23 @@ def weekly_slow_queries_report():
 
     reports_dir = Path(settings.BASE_DIR) / 'logs' / 'silk-reports'
     reports_dir.mkdir(parents=True, exist_ok=True)
-    report_date = timezone.now().strftime('%Y-%m-%d')
     log_path = reports_dir / f'silk-report-{report_date}.log'
 
     with open(log_path, 'w') as f:
         f.write(report + '\n')
 
+    with open(reports_dir / f'silk-report-{report_date}.json', 'w') as f:
+        json.dump({
+            'date': report_date,
+            'slow_query_threshold_ms': threshold_ms,
+            'n_plus_one_threshold': n_plus_one_threshold,
+            **data,
+        }, f, indent=2)
+
     logger.info(
-        'Weekly report generated. Slow queries: %d, N+1 suspects: %d',
-        slow_queries.count(),
-        n_plus_one_suspects.count(),
+        'Weekly report generated. Slow fingerprints: %d, N+1 suspects: %d',
+        len(slow),
+        len(suspects),
     )
 
     return report
@@ -159,7 +200,7 @@ def weekly_slow_queries_report():
 @db_periodic_task(crontab(day='1', hour='5', minute='0'))
 def silk_reports_cleanup():
     """
-    Monthly cleanup of Silk report files older than 6 months.
+    Monthly cleanup of Silk report files (.log and .json) older than 6 months.
     Runs on the 1st of each month at 5:00 AM.
     Only runs when Silk is enabled.
     """
@@ -175,7 +216,7 @@ def silk_reports_cleanup():
     cutoff = timezone.now().date() - timedelta(days=180)
     deleted = 0
 
-    for report_file in reports_dir.glob('silk-report-*.log'):
+    for report_file in reports_dir.glob('silk-report-*'):
         try:
             date_str = report_file.stem.replace('silk-report-', '')
             file_date = datetime.strptime(date_str, '%Y-%m-%d').date()
@@ -188,3 +229,21 @@ def silk_reports_cleanup():
 
     if deleted:
         logger.info('Silk reports cleanup: deleted %d file(s) older than %s.', deleted, cutoff)
+
+
+@db_periodic_task(crontab(minute='*/5'))
+def aggregate_profiling_data():
+    """
+    Merge the sampling profiler's per-worker spool files into the daily
+    summary (logs/profiling/profile-YYYY-MM-DD.json).
+    Only runs when PROFILING_ENABLED is True.
+    """
+    if not getattr(settings, 'PROFILING_ENABLED', False):
+        return
+
+    from base_feature_project.profiling import collect_spool
+
+    merged, summary_path = collect_spool(day=timezone.now().strftime('%Y-%m-%d'))
+    if merged:
+        logger.info('Profiling: merged %d spool file(s) into %s.', merged, summary_path)
+    return merged
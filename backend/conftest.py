@@ -6,6 +6,8 @@ import os
 import tempfile
 from pathlib import Path
 
+import pytest
+
 # ── ANSI colours ────────────────────────────────────────────────────────────
 _GREEN = "\033[32m"
 _YELLOW = "\033[33m"
@@ -286,3 +288,26 @@ def pytest_sessionstart(session) -> None:
         if impl.plugin is cov_plugin:
             impl.function = lambda *args, **kw: None
             break
+
+
+# ── Query budgets ───────────────────────────────────────────────────────────
+_QUERY_BUDGET_MIDDLEWARE = "base_feature_project.query_budget.QueryBudgetMiddleware"
+
+
+def pytest_configure(config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "no_query_budget: do not fail requests that exceed their view's @query_budget",
+    )
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(request, settings):
+    """
+    Fail any request that runs more queries than its view's ``@query_budget``,
+    whatever QUERY_BUDGET_MODE the environment would give. Tests marked
+    ``no_query_budget`` only log violations.
+    """
+    settings.QUERY_BUDGET_MODE = "log" if request.node.get_closest_marker("no_query_budget") else "raise"
+    if _QUERY_BUDGET_MIDDLEWARE not in settings.MIDDLEWARE:
+        settings.MIDDLEWARE = [_QUERY_BUDGET_MIDDLEWARE, *settings.MIDDLEWARE]
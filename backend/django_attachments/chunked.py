@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk assembly of chunked attachment uploads.
+
+A large file is sent as a series of short requests (``chunk_init``,
+``chunk_append``, ``chunk_complete``; see ``AttachmentEditableMixin``), so no
+worker is held for the whole transfer and a dropped connection resumes from
+the last stored offset instead of starting over.
+
+Chunks are appended to ``<upload_id>.part`` in ``get_upload_dir()``. A chunk
+that Django spooled to a temporary file is appended in the kernel
+(``copy_file_range``, else ``sendfile``) without passing through Python. The
+completed part file is handed to the upload form as a temporary file, so
+``FileSystemStorage`` moves it into place instead of copying it when both
+directories are on the same filesystem.
+"""
+import errno
+import fcntl
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import tempfile
+import time
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+
+UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+# Chunk size suggested to clients by ``chunk_init`` (ATTACHMENTS_UPLOAD_CHUNK_SIZE).
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Uploads untouched for this long are purged (ATTACHMENTS_CHUNKED_UPLOAD_EXPIRY, seconds).
+DEFAULT_UPLOAD_EXPIRY = 24 * 3600
+
+# Largest file ``chunk_init`` accepts (ATTACHMENTS_CHUNKED_UPLOAD_MAX_SIZE, bytes).
+DEFAULT_MAX_UPLOAD_SIZE = 2 * 1024 * 1024 * 1024
+
+# Errors after which a kernel copy is retried with the next method.
+KERNEL_COPY_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+
+def get_upload_dir():
+	"""``ATTACHMENTS_CHUNKED_UPLOAD_DIR``, default ``django_attachments_chunks`` in the upload temp dir."""
+	directory = getattr(settings, 'ATTACHMENTS_CHUNKED_UPLOAD_DIR', None)
+	if directory:
+		return directory
+	return os.path.join(settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir(), 'django_attachments_chunks')
+
+
+def file_sha256(fileobj):
+	"""Hex SHA-256 of an ``UploadedFile`` or a path."""
+	digest = hashlib.sha256()
+	if isinstance(fileobj, str):
+		with open(fileobj, 'rb') as fh:
+			for data in iter(lambda: fh.read(1024 * 1024), b''):
+				digest.update(data)
+	else:
+		for data in fileobj.chunks():
+			digest.update(data)
+	return digest.hexdigest()
+
+
+def _kernel_copies():
+	if hasattr(os, 'copy_file_range'):
+		yield lambda src, dst, count: os.copy_file_range(src, dst, count)
+	if hasattr(os, 'sendfile'):
+		yield lambda src, dst, count: os.sendfile(dst, src, None, count)
+
+
+def _copy_in_kernel(src, dst, count):
+	"""Copy ``count`` bytes between the fds' positions; False if no kernel copy is supported."""
+	for copy in _kernel_copies():
+		copied = 0
+		try:
+			while copied < count:
+				sent = copy(src, dst, count - copied)
+				if sent == 0:
+					raise OSError(errno.EIO, 'Chunk is shorter than its declared size')
+				copied += sent
+		except OSError as e:
+			if copied or e.errno not in KERNEL_COPY_UNSUPPORTED:
+				raise
+			continue
+		return True
+	return False
+
+
+def append_file(fd, uploaded):
+	"""Write ``uploaded`` at the position of ``fd``."""
+	if hasattr(uploaded, 'temporary_file_path'):
+		src = os.open(uploaded.temporary_file_path(), os.O_RDONLY)
+		try:
+			if _copy_in_kernel(src, fd, uploaded.size):
+				return
+		finally:
+			os.close(src)
+	for data in uploaded.chunks():
+		view = memoryview(data)
+		while view:
+			view = view[os.write(fd, view):]
+
+
+class ChunkedUploadError(Exception):
+	def __init__(self, message, code, status=400, offset=None):
+		super().__init__(message)
+		self.message = message
+		self.code = code
+		self.status = status
+		self.offset = offset
+
+
+class AssembledFile(UploadedFile):
+	"""
+	A completed part file; storage moves it like a ``TemporaryUploadedFile``.
+
+	``sha256`` is the verified whole-file digest, or empty when no checksum
+	was sent.
+	"""
+
+	def __init__(self, file_path, name, size, sha256=''):
+		content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+		super().__init__(open(file_path, 'rb'), name=name, content_type=content_type, size=size)
+		self.file_path = file_path
+		self.sha256 = sha256
+
+	def temporary_file_path(self):
+		return self.file_path
+
+
+class ChunkedUpload(object):
+	"""
+	Partial upload ``upload_id``: ``<id>.json`` (library, filename, size,
+	sha256) and ``<id>.part`` (the bytes received so far, so its size is the
+	resume offset).
+	"""
+
+	def __init__(self, upload_id, directory=None):
+		self.upload_id = upload_id
+		self.directory = directory or get_upload_dir()
+		self.part_path = os.path.join(self.directory, upload_id + '.part')
+		self.meta_path = os.path.join(self.directory, upload_id + '.json')
+		self.meta = {}
+
+	@classmethod
+	def create(cls, library_id, filename, size, sha256=''):
+		upload = cls(uuid.uuid4().hex)
+		os.makedirs(upload.directory, exist_ok=True)
+		upload.meta = {'library': library_id, 'filename': filename, 'size': size, 'sha256': sha256}
+		with open(upload.meta_path, 'x') as fh:
+			json.dump(upload.meta, fh)
+		open(upload.part_path, 'xb').close()
+		return upload
+
+	@classmethod
+	def load(cls, upload_id, library_id):
+		upload = cls(upload_id)
+		try:
+			with open(upload.meta_path) as fh:
+				upload.meta = json.load(fh)
+		except (OSError, ValueError):
+			upload.meta = {}
+		if upload.meta.get('library') != library_id or not os.path.exists(upload.part_path):
+			raise ChunkedUploadError('Unknown or expired upload.', 'not_found', status=404)
+		return upload
+
+	@property
+	def size(self):
+		return self.meta['size']
+
+	@property
+	def offset(self):
+		try:
+			return os.path.getsize(self.part_path)
+		except FileNotFoundError:
+			raise ChunkedUploadError('Unknown or expired upload.', 'not_found', status=404)
+
+	def append(self, offset, chunk, sha256=''):
+		"""
+		Append ``chunk`` if it starts at the stored offset; returns the new offset.
+
+		One writer at a time: a concurrent append to the same upload gets a 409,
+		as does an ``offset`` that is not the current one (the client resumes
+		from the offset in the error).
+		"""
+		try:
+			fd = os.open(self.part_path, os.O_WRONLY)
+		except FileNotFoundError:
+			raise ChunkedUploadError('Unknown or expired upload.', 'not_found', status=404)
+		try:
+			try:
+				fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+			except BlockingIOError:
+				raise ChunkedUploadError('Another chunk of this upload is being written.', 'busy', status=409)
+			current = os.fstat(fd).st_size
+			if offset != current:
+				raise ChunkedUploadError('Chunk does not start at the current offset.', 'offset', status=409, offset=current)
+			if current + chunk.size > self.size:
+				raise ChunkedUploadError('Chunk exceeds the declared file size.', 'size')
+			if sha256 and file_sha256(chunk) != sha256.lower():
+				raise ChunkedUploadError('Chunk checksum mismatch.', 'checksum', offset=current)
+			os.lseek(fd, current, os.SEEK_SET)
+			try:
+				append_file(fd, chunk)
+			except BaseException:
+				os.ftruncate(fd, current)
+				raise
+			return current + chunk.size
+		finally:
+			os.close(fd)
+
+	def assemble(self, sha256=''):
+		"""The completed file as an ``AssembledFile``; the whole-file checksum is verified first."""
+		offset = self.offset
+		if offset != self.size:
+			raise ChunkedUploadError('Upload is incomplete.', 'incomplete', status=409, offset=offset)
+		expected = (sha256 or self.meta.get('sha256') or '').lower()
+		if expected and file_sha256(self.part_path) != expected:
+			self.discard()
+			raise ChunkedUploadError('File checksum mismatch, upload discarded.', 'checksum')
+		return AssembledFile(self.part_path, self.meta['filename'], self.size, sha256=expected)
+
+	def last_modified(self):
+		mtimes = []
+		for file_path in (self.part_path, self.meta_path):
+			try:
+				mtimes.append(os.path.getmtime(file_path))
+			except FileNotFoundError:
+				pass
+		return max(mtimes, default=0)
+
+	def discard(self):
+		for file_path in (self.part_path, self.meta_path):
+			try:
+				os.remove(file_path)
+			except FileNotFoundError:
+				pass
+
+
+def purge_stale_uploads(max_age, directory=None):
+	"""Discard uploads not appended to for ``max_age`` seconds; returns their number."""
+	directory = directory or get_upload_dir()
+	try:
+		names = os.listdir(directory)
+	except FileNotFoundError:
+		return 0
+	upload_ids = set()
+	for name in names:
+		upload_id, ext = os.path.splitext(name)
+		if ext in ('.json', '.part') and UPLOAD_ID_RE.match(upload_id):
+			upload_ids.add(upload_id)
+	cutoff = time.time() - max_age
+	purged = 0
+	for upload_id in sorted(upload_ids):
+		upload = ChunkedUpload(upload_id, directory)
+		if upload.last_modified() < cutoff:
+			upload.discard()
+			purged += 1
+	return purged
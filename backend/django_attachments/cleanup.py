@@ -1,63 +1,267 @@
+"""
+File cleanup for models with file fields (``register_cleaner_for_model``).
+
+Deleting a row or replacing its file does not touch storage inline: the old
+names are queued per transaction and handed to the ``delete_files_task`` Huey
+task on commit, one task per field and batch. The task skips names that a
+row still references (rolled back savepoints, content-addressed files shared
+by several attachments), removes the
+thumbnails, deletes the files in a thread pool and prunes empty directories
+once per batch.
+"""
 import logging
 import os
+import threading
+import weakref
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from django.core.files.storage import storages
-from django.db import models
-from django.db.models.signals import post_delete, pre_save
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from easy_thumbnails.conf import settings
-from easy_thumbnails.files import get_thumbnailer
+from easy_thumbnails.models import Source, Thumbnail
+from easy_thumbnails.utils import get_storage_hash
 
 logger = logging.getLogger('django.db.models')
 
-def delete_files(sender, instance, *args, **kwargs): #pylint: disable=unused-argument
-    for field in instance._meta.fields:
-        if not isinstance(field, models.FileField):
-            continue
-        file_to_delete = getattr(instance, field.name)
-        delete_file(file_to_delete)
+# Names per delete_files_task.
+FILE_CLEANUP_BATCH_SIZE = 1000
 
-def delete_old_files(sender, instance, *args, **kwargs): #pylint: disable=unused-argument
-    if not instance.pk:
-        return
+# Instance attribute holding the file names seen when the row was loaded/saved.
+ORIGINAL_FILES_ATTR = '_cleanup_original_files'
 
-    try:
-        old_instance = instance.__class__.objects.get(pk=instance.pk)
-    except instance.__class__.DoesNotExist:
+_pending = threading.local()
+
+
+class PendingDeletes:
+    """File names deleted in the current transaction, flushed as tasks on commit."""
+
+    def __init__(self):
+        self.names = defaultdict(list)
+        self.flushed = False
+
+    def add(self, model, field_name, names):
+        self.names[(model._meta.label, field_name)].extend(name for name in names if name)
+
+    def flush(self):
+        from .tasks import delete_files_task
+
+        self.flushed = True
+        names, self.names = self.names, defaultdict(list)
+        for (model_label, field_name), field_names in names.items():
+            for start in range(0, len(field_names), FILE_CLEANUP_BATCH_SIZE):
+                delete_files_task(model_label, field_name, field_names[start:start + FILE_CLEANUP_BATCH_SIZE])
+
+
+def schedule_file_deletions(model, field_name, names, using=DEFAULT_DB_ALIAS):
+    """
+    Delete stored files ``names`` of ``model.field_name`` once the current transaction commits.
+
+    All names scheduled within one transaction are sent in batches of
+    ``FILE_CLEANUP_BATCH_SIZE``; outside a transaction they are sent at once.
+    Only a weak reference to the batch is kept here: its ``on_commit`` flush
+    holds the strong one, so once Django runs that callback or discards it on
+    a rollback (of the transaction or of the savepoint it was registered in)
+    the next call starts a new batch.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    batches = getattr(_pending, 'batches', None)
+    if batches is None:
+        batches = _pending.batches = {}
+    batch = batches[using]() if using in batches else None
+    if batch is not None and not batch.flushed:
+        batch.add(model, field_name, names)
         return
+    batch = PendingDeletes()
+    batch.add(model, field_name, names)
+    batches[using] = weakref.ref(batch)
+    # robust: an unreachable queue must not fail the committed request.
+    transaction.on_commit(batch.flush, using=using, robust=True)
+
+
+def _file_fields(model):
+    return [field for field in model._meta.fields if isinstance(field, models.FileField)]
 
-    for field in instance._meta.fields:
-        if not isinstance(field, models.FileField):
+
+def capture_original_files(sender, instance, field_names=None, **kwargs): #pylint: disable=unused-argument
+    """from_db/post_save: remember the stored file names, so pre_save need not re-query."""
+    if field_names is None:
+        field_names = kwargs.get('update_fields')
+    original = instance.__dict__.setdefault(ORIGINAL_FILES_ATTR, {})
+    for field in _file_fields(sender):
+        if field_names is not None and field.name not in field_names:
             continue
-        old_file = getattr(old_instance, field.name)
-        new_file = getattr(instance, field.name)
-        if new_file != old_file:
-            delete_file(old_file)
+        if field.attname in instance.__dict__:  # deferred fields are not loaded
+            value = instance.__dict__[field.attname]
+            original[field.name] = getattr(value, 'name', value) or ''
+
+
+class OriginalFilesMixin:
+    """
+    Model mixin capturing the stored file names when a row is loaded.
+
+    A ``post_init`` receiver would do the same but turns off Django's fast
+    init path for every instance, including those never saved again.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        capture_original_files(cls, instance)
+        return instance
 
-def delete_file(file_instance):
-    if not file_instance.name:
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        capture_original_files(self.__class__, self, field_names=fields)
+
+def delete_files(sender, instance, *args, **kwargs): #pylint: disable=unused-argument
+    for field in _file_fields(sender):
+        name = getattr(instance, field.name).name
+        if name:
+            schedule_file_deletions(sender, field.name, [name], using=kwargs.get('using'))
+
+def delete_old_files(sender, instance, *args, **kwargs): #pylint: disable=unused-argument
+    if not instance.pk:
         return
-    thumbnailer = get_thumbnailer(file_instance)
-    thumbnailer.thumbnail_storage = storages[settings.THUMBNAIL_DEFAULT_STORAGE]
-    thumbnailer.delete_thumbnails()
-    storage = file_instance.storage
-    file_path = file_instance.path
-    
-    if storage and storage.exists(file_instance.name):
+
+    fields = _file_fields(sender)
+    original = instance.__dict__.get(ORIGINAL_FILES_ATTR, {})
+    if any(field.name not in original for field in fields):
+        # Not loaded from the database (or a deferred file field): fall back to a query.
         try:
-            storage.delete(file_instance.name)
-            # Check if the directory is empty and remove it if it is
-            remove_empty_directories(os.path.dirname(file_path))
-        except IOError:
-            logger.error('File not deleted: %s', file_instance.name)
+            old_instance = instance.__class__.objects.get(pk=instance.pk)
+        except instance.__class__.DoesNotExist:
+            return
+        original = {field.name: getattr(old_instance, field.name).name for field in fields}
+
+    for field in fields:
+        old_name = original[field.name]
+        new_name = getattr(instance, field.name).name
+        if old_name and new_name != old_name:
+            schedule_file_deletions(sender, field.name, [old_name], using=kwargs.get('using'))
 
 def remove_empty_directories(path):
     """Recursively remove empty directories."""
-    if not os.listdir(path):  # Check if the directory is empty
+    try:
+        if os.listdir(path):  # Check if the directory is empty
+            return
         os.rmdir(path)  # Remove the directory
-        parent_directory = os.path.dirname(path)
-        if parent_directory != path:  # Ensure we don't go beyond the root directory
-            remove_empty_directories(parent_directory)
+    except OSError:
+        return  # Removed or refilled by a concurrent delete
+    parent_directory = os.path.dirname(path)
+    if parent_directory != path:  # Ensure we don't go beyond the root directory
+        remove_empty_directories(parent_directory)
+
+def delete_thumbnail_records(storage, names, batch_size=1000):
+    """
+    Delete the thumbnail cache rows of source files ``names`` in ``storage``.
+
+    Returns the names of the thumbnail files (in the thumbnail storage) that
+    the caller still has to remove.
+    """
+    source_hash = get_storage_hash(storage)
+    thumbnail_hash = get_storage_hash(storages[settings.THUMBNAIL_DEFAULT_STORAGE])
+    thumbnail_names = []
+    names = list(names)
+    for start in range(0, len(names), batch_size):
+        sources = Source.objects.filter(storage_hash=source_hash, name__in=names[start:start + batch_size])
+        thumbnail_names.extend(
+            Thumbnail.objects.filter(source__in=sources, storage_hash=thumbnail_hash).values_list('name', flat=True)
+        )
+        sources.delete()
+    return thumbnail_names
+
+def _delete_stored_file(storage, name):
+    try:
+        storage.delete(name)
+    except IOError:
+        logger.error('File not deleted: %s', name)
+        return False
+    return True
+
+def _local_directories(storage, names):
+    try:
+        return {os.path.dirname(storage.path(name)) for name in names}
+    except NotImplementedError:  # remote storage, no directories to prune
+        return set()
+
+def unreferenced_names(model, field_name, names, batch_size=1000):
+    """``names`` that no row of ``model`` references in ``field_name`` (deduplicated, in order)."""
+    names = list(dict.fromkeys(name for name in names if name))
+    referenced = set()
+    for start in range(0, len(names), batch_size):
+        referenced.update(
+            model._default_manager
+            .filter(**{field_name + '__in': names[start:start + batch_size]})
+            .values_list(field_name, flat=True)
+        )
+    return [name for name in names if name not in referenced]
+
+def lock_file_names(names, using=DEFAULT_DB_ALIAS, batch_size=1000):
+    """
+    Lock the ``StoredFile`` rows of ``names``, created as needed, until the transaction ends.
+
+    Reusing a content-addressed file and deleting files both take these
+    locks, so the references counted by ``unreferenced_names`` cannot gain an
+    uncommitted row until the deleting transaction commits. Call it inside
+    ``transaction.atomic``.
+    """
+    from .models import StoredFile
+
+    stored_files = StoredFile.objects.using(using or DEFAULT_DB_ALIAS)
+    # Sorted, so that two transactions locking overlapping names cannot deadlock.
+    names = sorted(set(name for name in names if name))
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+        stored_files.bulk_create([StoredFile(name=name) for name in batch], ignore_conflicts=True)
+        list(stored_files.select_for_update().filter(name__in=batch).order_by('name').values_list('pk', flat=True))
+
+def delete_unreferenced_files(model, field_name, names, workers=8, batch_size=1000):
+    """
+    Delete the stored files ``names`` that no row of ``model`` references in ``field_name``.
+
+    Each batch is checked and deleted under ``lock_file_names``; returns the
+    number of files deleted (``delete_files_by_name``).
+    """
+    from .models import StoredFile
+
+    storage = model._meta.get_field(field_name).storage
+    names = list(dict.fromkeys(name for name in names if name))
+    deleted = 0
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+        with transaction.atomic():
+            lock_file_names(batch)
+            deleted += delete_files_by_name(storage, unreferenced_names(model, field_name, batch), workers=workers)
+            StoredFile.objects.filter(name__in=batch).delete()
+    return deleted
+
+def delete_files_by_name(storage, names, workers=8):
+    """
+    Delete the stored files ``names`` and their thumbnails.
+
+    Thumbnail records are removed in a few queries, then the source files and
+    their thumbnails are deleted by ``workers`` threads (file deletes are I/O
+    bound) and each emptied directory is pruned once. Returns the number of
+    files deleted.
+    """
+    names = list(dict.fromkeys(name for name in names if name))
+    if not names:
+        return 0
+    thumbnail_storage = storages[settings.THUMBNAIL_DEFAULT_STORAGE]
+    thumbnail_names = delete_thumbnail_records(storage, names)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        deleted = sum(pool.map(lambda name: _delete_stored_file(thumbnail_storage, name), thumbnail_names))
+        deleted += sum(pool.map(lambda name: _delete_stored_file(storage, name), names))
+    directories = _local_directories(storage, names) | _local_directories(thumbnail_storage, thumbnail_names)
+    # Deepest first, so a parent is only checked after its children are gone.
+    for directory in sorted(directories, key=lambda path: path.count(os.sep), reverse=True):
+        remove_empty_directories(directory)
+    return deleted
 
 def register_cleaner_for_model(model_cls):
+    """Clean up the files of ``model_cls``; mix in ``OriginalFilesMixin`` so replacing a file needs no query."""
+    post_save.connect(capture_original_files, sender=model_cls)
     post_delete.connect(delete_files, sender=model_cls)
     pre_save.connect(delete_old_files, sender=model_cls)
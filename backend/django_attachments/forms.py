@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 from django import forms
+from django.conf import settings
 from django.forms.models import modelformset_factory
 from django.utils.translation import gettext_lazy as _
 
+from .chunked import DEFAULT_MAX_UPLOAD_SIZE, UPLOAD_ID_RE
 from .models import Attachment
 
 
+SHA256_RE = r'^[0-9a-fA-F]{64}$'
+
+
 class AttachmentUploadForm(forms.ModelForm):
 	def __init__(self, *args, **kwargs):
 		self.library = kwargs.pop('library')
@@ -54,3 +59,31 @@ AttachmentUpdateFormSet = modelformset_factory(
 	can_delete=True,
 	extra=0
 )
+
+
+class ChunkInitForm(forms.Form):
+	filename = forms.CharField(max_length=255)
+	size = forms.IntegerField(min_value=1)
+	sha256 = forms.RegexField(regex=SHA256_RE, required=False)
+
+	def clean_size(self):
+		size = self.cleaned_data['size']
+		max_size = getattr(settings, 'ATTACHMENTS_CHUNKED_UPLOAD_MAX_SIZE', DEFAULT_MAX_UPLOAD_SIZE)
+		if size > max_size:
+			raise forms.ValidationError(
+				_("File is larger than %(max_size)d bytes."), code='max_size', params={'max_size': max_size})
+		return size
+
+
+class ChunkStatusForm(forms.Form):
+	upload_id = forms.RegexField(regex=UPLOAD_ID_RE)
+
+
+class ChunkAppendForm(ChunkStatusForm):
+	offset = forms.IntegerField(min_value=0)
+	chunk = forms.FileField(allow_empty_file=False)
+	sha256 = forms.RegexField(regex=SHA256_RE, required=False)
+
+
+class ChunkCompleteForm(ChunkStatusForm):
+	sha256 = forms.RegexField(regex=SHA256_RE, required=False)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_attachments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Name')),
+            ],
+            options={
+                'verbose_name': 'Stored file',
+                'verbose_name_plural': 'Stored files',
+            },
+        ),
+    ]
@@ -1,18 +1,25 @@
 # -*- coding: utf-8 -*-
 import mimetypes
-from io import BytesIO
 from os import path
 from uuid import uuid4
 
 from PIL import Image
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.db.models import F, Max, Subquery, OuterRef
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from easy_thumbnails.fields import ThumbnailerField
 
+from .chunked import file_sha256
+from .cleanup import OriginalFilesMixin, lock_file_names
 from .utils import parse_mimetype
 
+try:
+	from django_cleanup import cleanup as django_cleanup
+except ImportError:
+	django_cleanup = None
+
 
 class TimestampModelMixin(models.Model):
 	created = models.DateTimeField(_("Created"), editable=False, db_index=True)
@@ -28,7 +35,21 @@ class TimestampModelMixin(models.Model):
 		abstract = True
 
 
+def is_content_addressed():
+	"""``ATTACHMENTS_CONTENT_ADDRESSED``: store each distinct file content once."""
+	return getattr(settings, 'ATTACHMENTS_CONTENT_ADDRESSED', False)
+
+
+def content_addressed_name(digest, filename):
+	"""Storage name for content with SHA-256 hex ``digest``, keeping the extension of ``filename``."""
+	ext = path.splitext(filename)[1].lower()
+	return path.join('attachments', 'sha256', digest[:2], digest[2:4], digest + ext)
+
+
 def upload_path_handler(instance, filename):
+	digest = getattr(instance, '_content_sha256', None)
+	if digest:  # set by Attachment.save() in content-addressed mode
+		return content_addressed_name(digest, filename)
 	pk = instance.library.pk
 	filename = str(uuid4()) + path.splitext(filename)[1]
 	return path.join('attachments', "{0:02x}".format(pk % 256), str(pk), filename)
@@ -79,7 +100,7 @@ class AttachmentQuerySet(models.QuerySet):
 		return self.filter(image_width__isnull=False)
 
 
-class Attachment(TimestampModelMixin, models.Model):
+class Attachment(OriginalFilesMixin, TimestampModelMixin, models.Model):
 	objects = AttachmentQuerySet.as_manager()
 
 	library = models.ForeignKey(
@@ -167,20 +188,42 @@ class Attachment(TimestampModelMixin, models.Model):
 				self._rank_queryset().filter(rank__gte=self.rank).update(rank=F('rank')+1)
 		if self.file:
 			self.filesize = self.file.size
-			source = BytesIO(self.file.read())
 			try:
-				image = Image.open(source)
-				self.image_width, self.image_height = image.size
+				# Reads the image header only, not the whole file.
+				with Image.open(self.file) as image:
+					self.image_width, self.image_height = image.size
 			except IOError:
 				pass
 			finally:
 				self.file.seek(0)
+			if not self.file._committed and is_content_addressed():
+				using = kwargs.get('using')
+				with transaction.atomic(using=using):
+					self._store_content_addressed(using)
+					return super().save(*args, **kwargs)
 		else:
 			self.filesize = -1
 			self.image_width = None
 			self.image_height = None
 		return super().save(*args, **kwargs)
 
+	def _store_content_addressed(self, using=None):
+		"""
+		Name the new upload after its SHA-256 digest, reusing an identical stored file.
+
+		Attachments sharing a file are its reference count: the cleanup task
+		deletes a file only when no attachment references it anymore. The
+		file's ``StoredFile`` row stays locked until this row is committed, so
+		the cleanup cannot count references while the reuse is in flight.
+		"""
+		# A chunked upload whose checksum was verified on assembly is not hashed again.
+		self._content_sha256 = getattr(self.file.file, 'sha256', '') or file_sha256(self.file)
+		self.file.seek(0)
+		name = content_addressed_name(self._content_sha256, self.file.name)
+		lock_file_names([name], using=using)
+		if self.file.storage.exists(name):
+			self.file = name  # committed: nothing is written
+
 	def delete(self, *args, **kwargs):
 		self._rank_queryset().filter(rank__gt=self.rank).update(rank=F('rank')-1)
 		return super().delete(*args, **kwargs)
@@ -197,3 +240,31 @@ class Attachment(TimestampModelMixin, models.Model):
 
 	def _rank_queryset(self):
 		return Attachment.objects.filter(library=self.library).order_by('rank')
+
+
+class StoredFile(models.Model):
+	"""
+	Lock row of a stored file name (see ``cleanup.lock_file_names``).
+
+	Reusing a content-addressed file and deleting a file both lock its row
+	first, so a file is never deleted while an upload that reuses it is
+	still uncommitted.
+	"""
+	name = models.CharField(
+		verbose_name=_("Name"),
+		max_length=255,
+		unique=True
+	)
+
+	class Meta:
+		verbose_name = _("Stored file")
+		verbose_name_plural = _("Stored files")
+
+	def __str__(self):
+		return self.name
+
+
+if django_cleanup is not None:
+	# Attachment files are removed by .cleanup (batched, after commit, in the
+	# background); keep django-cleanup from deleting them inline as well.
+	django_cleanup.ignore(Attachment)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Background file cleanup (auto-discovered by djhuey).
+
+``delete_files_task`` is queued by ``cleanup.schedule_file_deletions`` after
+a transaction that deleted rows or replaced their files has committed;
+``purge_stale_chunked_uploads`` runs hourly.
+"""
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from huey import crontab
+from huey.contrib.djhuey import db_periodic_task, db_task
+
+from .chunked import DEFAULT_UPLOAD_EXPIRY, purge_stale_uploads
+from .cleanup import delete_unreferenced_files
+
+logger = logging.getLogger(__name__)
+
+
+@db_task()
+def delete_files_task(model_label, field_name, names):
+	"""
+	Delete the stored files ``names`` of ``model_label.field_name`` and their thumbnails.
+
+	Names that a row still references are kept: the deleting transaction may
+	have been a rolled back savepoint, or the file may be shared.
+	"""
+	deleted = delete_unreferenced_files(apps.get_model(model_label), field_name, names)
+	logger.info('File cleanup: deleted %d file(s) of %s.%s.', deleted, model_label, field_name)
+	return deleted
+
+
+@db_periodic_task(crontab(minute='30'))
+def purge_stale_chunked_uploads():
+	"""Hourly removal of chunked uploads that were abandoned before completion."""
+	expiry = getattr(settings, 'ATTACHMENTS_CHUNKED_UPLOAD_EXPIRY', DEFAULT_UPLOAD_EXPIRY)
+	purged = purge_stale_uploads(expiry)
+	if purged:
+		logger.info('Chunked uploads purge: removed %d stale upload(s).', purged)
+	return purged
@@ -1,13 +1,24 @@
 # -*- coding: utf-8 -*-
+import hashlib
 from io import BytesIO
 import os
+import shutil
+import tempfile
+import time
+from unittest import mock
 
 from easy_thumbnails.files import get_thumbnailer
 from PIL import Image
+from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.db import transaction
+from django.db.models.signals import post_init
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-from .models import Library, Attachment
+from . import chunked, cleanup, tasks
+from .cleanup import unreferenced_names
+from .models import Library, Attachment, StoredFile
 
 
 class AttachmentModelTest(TestCase):
@@ -145,7 +156,10 @@ class AttachmentModelTest(TestCase):
 		self.assertTrue(os.path.exists(attachment.file.path))
 		self.assertTrue(os.path.exists(thumbnail.path))
 
-		attachment.delete()
+		with self.captureOnCommitCallbacks(execute=True):
+			attachment.delete()
+			# Files are removed only after the transaction commits.
+			self.assertTrue(os.path.exists(attachment.file.path))
 		self.assertFalse(os.path.exists(attachment.file.path))
 		self.assertFalse(os.path.exists(thumbnail.path))
 
@@ -157,3 +171,273 @@ class AttachmentModelTest(TestCase):
 		Library.objects.filter(pk=library.pk).update_primary_image()
 		library.refresh_from_db()
 		self.assertEqual(library.primary_attachment, attachment)
+
+	def test_delete_batches_files_per_transaction(self):
+		library = self.create_library()
+		attachments = [self.create_attachment('upload.txt', b'data', library=library) for _ in range(3)]
+		names = [attachment.file.name for attachment in attachments]
+
+		with mock.patch.object(tasks, 'delete_files_task') as task:
+			with self.captureOnCommitCallbacks(execute=True):
+				with transaction.atomic():
+					for attachment in attachments:
+						attachment.delete()
+
+		task.assert_called_once_with('django_attachments.Attachment', 'file', names)
+
+	def test_delete_after_a_rolled_back_savepoint_starts_a_new_batch(self):
+		library = self.create_library()
+		first, second = [self.create_attachment('upload.txt', b'data', library=library) for _ in range(2)]
+
+		with mock.patch.object(tasks, 'delete_files_task') as task:
+			with self.captureOnCommitCallbacks(execute=True):
+				with transaction.atomic():
+					try:
+						with transaction.atomic():
+							first.delete()
+							raise RuntimeError
+					except RuntimeError:
+						pass
+					second.delete()
+
+		task.assert_called_once_with('django_attachments.Attachment', 'file', [second.file.name])
+
+	def test_rolled_back_delete_keeps_file(self):
+		attachment = self.create_attachment('upload.txt', b'data')
+
+		with self.captureOnCommitCallbacks(execute=True):
+			with transaction.atomic():
+				self.create_attachment('other.txt', b'data').delete()
+				try:
+					with transaction.atomic():
+						Attachment.objects.get(pk=attachment.pk).delete()
+						raise RuntimeError
+				except RuntimeError:
+					pass
+
+		self.assertTrue(os.path.exists(attachment.file.path))
+		attachment.delete()
+
+	def test_replaced_file_is_deleted_without_requery(self):
+		attachment = Attachment.objects.get(pk=self.create_attachment('old.txt', b'old').pk)
+		old_path = attachment.file.path
+
+		with mock.patch.object(Attachment.objects, 'get', side_effect=AssertionError('re-queried')):
+			with self.captureOnCommitCallbacks(execute=True):
+				attachment.file = SimpleUploadedFile('new.txt', b'new')
+				attachment.save()
+
+		self.assertFalse(os.path.exists(old_path))
+		self.assertTrue(os.path.exists(attachment.file.path))
+		with self.captureOnCommitCallbacks(execute=True):
+			attachment.delete()
+
+
+	def test_original_files_are_captured_without_post_init(self):
+		name = self.create_attachment('old.txt', b'old').file.name
+		attachment = Attachment.objects.get(file=name)
+		attachment.file = 'attachments/unsaved.txt'
+		attachment.refresh_from_db(fields=['rank'])
+
+		self.assertFalse(post_init.has_listeners(Attachment))
+		self.assertEqual(attachment.__dict__[cleanup.ORIGINAL_FILES_ATTR], {'file': name})
+		attachment.refresh_from_db()
+		with self.captureOnCommitCallbacks(execute=True):
+			attachment.delete()
+
+
+@override_settings(ATTACHMENTS_CONTENT_ADDRESSED=True)
+class ContentAddressedAttachmentTest(TestCase):
+	def create_attachment(self, filename, data):
+		library = Library(title='Test')
+		library.save()
+		attachment = Attachment(file=SimpleUploadedFile(filename, data), library=library)
+		attachment.save()
+		return attachment
+
+	def test_identical_uploads_share_one_file(self):
+		first = self.create_attachment('a.TXT', b'same')
+		second = self.create_attachment('b.txt', b'same')
+		other = self.create_attachment('c.txt', b'other')
+
+		self.assertEqual(first.file.name, second.file.name)
+		self.assertTrue(first.file.name.startswith('attachments/sha256/'))
+		self.assertTrue(first.file.name.endswith('.txt'))
+		self.assertNotEqual(first.file.name, other.file.name)
+		self.assertEqual(second.filesize, 4)
+
+		for attachment in (first, second, other):
+			with self.captureOnCommitCallbacks(execute=True):
+				attachment.delete()
+
+	def test_shared_file_is_deleted_with_its_last_reference(self):
+		first = self.create_attachment('a.txt', b'shared')
+		second = self.create_attachment('b.txt', b'shared')
+		file_path = first.file.path
+
+		with self.captureOnCommitCallbacks(execute=True):
+			first.delete()
+		self.assertTrue(os.path.exists(file_path))
+
+		with self.captureOnCommitCallbacks(execute=True):
+			second.delete()
+		self.assertFalse(os.path.exists(file_path))
+
+	def test_reused_file_is_locked_by_its_stored_file_row(self):
+		first = self.create_attachment('a.txt', b'shared')
+		second = self.create_attachment('b.txt', b'shared')
+
+		self.assertEqual(list(StoredFile.objects.values_list('name', flat=True)), [first.file.name])
+		for attachment in (first, second):
+			with self.captureOnCommitCallbacks(execute=True):
+				attachment.delete()
+		self.assertFalse(StoredFile.objects.exists())
+
+	def test_cleanup_counts_references_under_the_file_lock(self):
+		attachment = self.create_attachment('a.txt', b'data')
+		file_path = attachment.file.path
+		locked = []
+
+		def check_locked(model, field_name, names):
+			locked.append(StoredFile.objects.filter(name__in=names).count())
+			return unreferenced_names(model, field_name, names)
+
+		with mock.patch.object(cleanup, 'unreferenced_names', side_effect=check_locked):
+			with self.captureOnCommitCallbacks(execute=True):
+				attachment.delete()
+
+		self.assertEqual(locked, [1])
+		self.assertFalse(os.path.exists(file_path))
+
+
+class ChunkedUploadTest(TestCase):
+	def setUp(self):
+		self.upload_dir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, self.upload_dir, ignore_errors=True)
+		settings_override = override_settings(ATTACHMENTS_CHUNKED_UPLOAD_DIR=self.upload_dir)
+		settings_override.enable()
+		self.addCleanup(settings_override.disable)
+		user = get_user_model().objects.create_superuser(email='admin@example.com', password='x')
+		self.client.force_login(user)
+		self.library = Library.objects.create(title='Test')
+		self.url = reverse('admin:attachments_library_edit_api', args=(self.library.pk,))
+
+	def post(self, action, **data):
+		return self.client.post(self.url, {'action': action, **data}, HTTP_ACCEPT='application/json')
+
+	def append(self, upload_id, offset, data, **extra):
+		return self.post('chunk_append', upload_id=upload_id, offset=offset,
+			chunk=SimpleUploadedFile('blob', data), **extra)
+
+	def test_chunked_upload_creates_attachment_on_complete(self):
+		data = os.urandom(3000)
+		response = self.post('chunk_init', filename='data.bin', size=len(data), sha256=hashlib.sha256(data).hexdigest())
+		self.assertEqual(response.status_code, 200)
+		upload_id = response.json()['upload_id']
+		self.assertEqual(response.json()['offset'], 0)
+
+		for offset in range(0, len(data), 1000):
+			chunk = data[offset:offset + 1000]
+			response = self.append(upload_id, offset, chunk, sha256=hashlib.sha256(chunk).hexdigest())
+			self.assertEqual(response.json()['offset'], offset + len(chunk))
+		self.assertFalse(self.library.attachment_set.exists())
+
+		response = self.post('chunk_complete', upload_id=upload_id)
+		self.assertEqual(response.status_code, 200)
+		self.assertTrue(response.json()['attachments'][0]['is_new'])
+		attachment = self.library.attachment_set.get()
+		self.assertEqual(attachment.original_name, 'data.bin')
+		self.assertEqual(attachment.filesize, len(data))
+		with attachment.file.open('rb') as fh:
+			self.assertEqual(fh.read(), data)
+		self.assertEqual(os.listdir(self.upload_dir), [])
+		with self.captureOnCommitCallbacks(execute=True):
+			attachment.delete()
+
+	@override_settings(ATTACHMENTS_CONTENT_ADDRESSED=True)
+	def test_verified_upload_is_hashed_once(self):
+		data = b'content-addressed'
+		digest = hashlib.sha256(data).hexdigest()
+		upload_id = self.post('chunk_init', filename='a.txt', size=len(data), sha256=digest).json()['upload_id']
+		self.append(upload_id, 0, data)
+
+		with mock.patch.object(chunked, 'file_sha256', wraps=chunked.file_sha256) as assembly_hash, \
+				mock.patch('django_attachments.models.file_sha256', side_effect=AssertionError('hashed twice')):
+			self.post('chunk_complete', upload_id=upload_id)
+
+		attachment = self.library.attachment_set.get()
+		self.assertEqual(assembly_hash.call_count, 1)
+		self.assertIn(digest, attachment.file.name)
+		with self.captureOnCommitCallbacks(execute=True):
+			attachment.delete()
+
+	@override_settings(ATTACHMENTS_CHUNKED_UPLOAD_MAX_SIZE=10)
+	def test_chunk_init_rejects_files_over_the_max_size(self):
+		response = self.post('chunk_init', filename='a.txt', size=11)
+
+		self.assertEqual(response.status_code, 400)
+		self.assertEqual(response.json()['errors']['size'][0]['code'], 'max_size')
+		self.assertEqual(os.listdir(self.upload_dir), [])
+
+	def test_resume_after_offset_mismatch(self):
+		upload_id = self.post('chunk_init', filename='a.txt', size=6).json()['upload_id']
+		self.append(upload_id, 0, b'abc')
+
+		response = self.append(upload_id, 0, b'abc')
+		self.assertEqual(response.status_code, 409)
+		self.assertEqual(response.json()['offset'], 3)
+		self.assertEqual(self.post('chunk_status', upload_id=upload_id).json()['offset'], 3)
+
+		response = self.post('chunk_complete', upload_id=upload_id)
+		self.assertEqual(response.status_code, 409)
+
+		response = self.append(upload_id, 3, b'def', sha256='0' * 64)
+		self.assertEqual(response.status_code, 400)
+		self.assertEqual(response.json()['errors']['__all__'][0]['code'], 'checksum')
+		self.assertEqual(self.append(upload_id, 3, b'defg').status_code, 400)
+		self.assertEqual(self.append(upload_id, 3, b'def').json()['offset'], 6)
+
+		self.post('chunk_complete', upload_id=upload_id)
+		attachment = self.library.attachment_set.get()
+		with attachment.file.open('rb') as fh:
+			self.assertEqual(fh.read(), b'abcdef')
+		with self.captureOnCommitCallbacks(execute=True):
+			attachment.delete()
+
+	@override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+	def test_spooled_chunks_are_appended_in_kernel(self):
+		upload_id = self.post('chunk_init', filename='a.txt', size=8).json()['upload_id']
+		with mock.patch.object(chunked, '_copy_in_kernel', wraps=chunked._copy_in_kernel) as copy:
+			self.append(upload_id, 0, b'abcd')
+			self.append(upload_id, 4, b'efgh')
+		self.assertEqual(copy.call_count, 2)
+		with open(os.path.join(self.upload_dir, upload_id + '.part'), 'rb') as fh:
+			self.assertEqual(fh.read(), b'abcdefgh')
+
+	def test_upload_is_bound_to_its_library(self):
+		upload_id = self.post('chunk_init', filename='a.txt', size=3).json()['upload_id']
+		other = Library.objects.create(title='Other')
+		url = reverse('admin:attachments_library_edit_api', args=(other.pk,))
+		response = self.client.post(url, {'action': 'chunk_status', 'upload_id': upload_id})
+		self.assertEqual(response.status_code, 404)
+		self.assertEqual(self.post('chunk_status', upload_id='../' + upload_id).status_code, 400)
+
+	def test_whole_file_checksum_mismatch_discards_upload(self):
+		upload_id = self.post('chunk_init', filename='a.txt', size=3, sha256='0' * 64).json()['upload_id']
+		self.append(upload_id, 0, b'abc')
+		response = self.post('chunk_complete', upload_id=upload_id)
+		self.assertEqual(response.status_code, 400)
+		self.assertFalse(self.library.attachment_set.exists())
+		self.assertEqual(os.listdir(self.upload_dir), [])
+
+	def test_purge_stale_uploads(self):
+		stale = self.post('chunk_init', filename='a.txt', size=3).json()['upload_id']
+		fresh = self.post('chunk_init', filename='b.txt', size=3).json()['upload_id']
+		past = time.time() - 7200
+		for ext in ('.part', '.json'):
+			os.utime(os.path.join(self.upload_dir, stale + ext), (past, past))
+
+		self.assertEqual(tasks.purge_stale_chunked_uploads.call_local(), 0)
+		with override_settings(ATTACHMENTS_CHUNKED_UPLOAD_EXPIRY=3600):
+			self.assertEqual(tasks.purge_stale_chunked_uploads.call_local(), 1)
+		self.assertEqual(sorted(os.listdir(self.upload_dir)), [fresh + '.json', fresh + '.part'])
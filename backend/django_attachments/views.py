@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import json
 
+from django.conf import settings
 from django.core import signing
 from django.http import JsonResponse
 from django.http.response import HttpResponseRedirect
@@ -8,7 +9,15 @@ from django.utils.functional import cached_property
 from easy_thumbnails.exceptions import EasyThumbnailsError
 from easy_thumbnails.files import get_thumbnailer
 
-from .forms import AttachmentUploadForm, AttachmentUpdateFormSet
+from .chunked import DEFAULT_CHUNK_SIZE, ChunkedUpload, ChunkedUploadError
+from .forms import (
+	AttachmentUploadForm,
+	AttachmentUpdateFormSet,
+	ChunkAppendForm,
+	ChunkCompleteForm,
+	ChunkInitForm,
+	ChunkStatusForm,
+)
 from .models import Attachment
 from .utils import parse_mimetype, check_ajax
 
@@ -19,6 +28,13 @@ class AttachmentEditableMixin(object):
 	thumbnail_options = {
 		'thumbnail': {'crop': True, 'size': (100, 100)},
 	}
+	chunk_form_classes = {
+		'chunk_init': ChunkInitForm,
+		'chunk_status': ChunkStatusForm,
+		'chunk_append': ChunkAppendForm,
+		'chunk_complete': ChunkCompleteForm,
+		'chunk_abort': ChunkStatusForm,
+	}
 
 	def can_upload_attachment(self):
 		return True
@@ -85,6 +101,8 @@ class AttachmentEditableMixin(object):
 				return self.update_form_valid(self.update_form)
 			else:
 				return self.update_form_invalid(self.update_form)
+		if action in self.chunk_form_classes and self.can_upload_attachment():
+			return self.chunked_upload(action)
 		if action == 'mimetype':
 			filename = self.request.POST.get('filename')
 			mimetype = parse_mimetype(filename)
@@ -108,6 +126,59 @@ class AttachmentEditableMixin(object):
 			return JsonResponse({'attachments': attachments})
 		return HttpResponseRedirect(self.request.get_full_path())
 
+	def chunked_upload(self, action):
+		"""
+		Resumable upload of one file in several requests (see ``chunked``).
+
+		``chunk_init`` (filename, size, optional sha256) returns an
+		``upload_id``; ``chunk_append`` (upload_id, offset, chunk, optional
+		sha256 of the chunk) stores the chunk if offset is the current one;
+		``chunk_status`` returns the offset to resume from; ``chunk_complete``
+		creates the attachment like ``upload``; ``chunk_abort`` discards the
+		upload. Errors are ``{'errors': ...}`` with status 400/404/409, plus the
+		current ``offset`` when the client should resume from there.
+		"""
+		form = self.chunk_form_classes[action](self.request.POST, self.request.FILES)
+		if not form.is_valid():
+			return JsonResponse({'errors': json.loads(form.errors.as_json())}, status=400)
+		data = form.cleaned_data
+		library = self.get_library()
+		try:
+			if action == 'chunk_init':
+				if library.pk is None:
+					library.save()
+				upload = ChunkedUpload.create(library.pk, data['filename'], data['size'], data['sha256'])
+				return self.render_chunked_upload(upload, 0, chunk_size=getattr(
+					settings, 'ATTACHMENTS_UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+			upload = ChunkedUpload.load(data['upload_id'], library.pk)
+			if action == 'chunk_status':
+				return self.render_chunked_upload(upload, upload.offset)
+			if action == 'chunk_append':
+				return self.render_chunked_upload(upload, upload.append(data['offset'], data['chunk'], data['sha256']))
+			if action == 'chunk_abort':
+				upload.discard()
+				return JsonResponse({'upload_id': upload.upload_id})
+			return self.complete_chunked_upload(upload, data['sha256'])
+		except ChunkedUploadError as e:
+			response = {'errors': {'__all__': [{'message': e.message, 'code': e.code}]}}
+			if e.offset is not None:
+				response['offset'] = e.offset
+			return JsonResponse(response, status=e.status)
+
+	def render_chunked_upload(self, upload, offset, **extra):
+		return JsonResponse({'upload_id': upload.upload_id, 'offset': offset, 'size': upload.size, **extra})
+
+	def complete_chunked_upload(self, upload, sha256):
+		assembled = upload.assemble(sha256)
+		try:
+			form = self.upload_form_class(data={}, files={'file': assembled}, library=self.get_library())
+			if form.is_valid():
+				return self.upload_form_valid(form)
+			return self.upload_form_invalid(form)
+		finally:
+			assembled.close()
+			upload.discard()
+
 	def upload_form_invalid(self, form):
 		if check_ajax(self.request):
 			return JsonResponse({'errors': json.loads(form.errors.as_json())})
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Closed-loop HTTP load tester for comparing server setups (stdlib only).
+
+Each of ``--concurrency`` clients keeps one keep-alive connection and sends
+GET requests back to back for ``--duration`` seconds. Prints throughput and
+latency percentiles per URL, so the same endpoint can be compared across
+servers, e.g. sync gunicorn workers vs uvicorn workers with
+``DJANGO_ASYNC_VIEWS=true``:
+
+    gunicorn base_feature_project.wsgi -w 4 -b 127.0.0.1:8001
+    DJANGO_ASYNC_VIEWS=true gunicorn base_feature_project.asgi -w 4 \\
+        -k uvicorn.workers.UvicornWorker -b 127.0.0.1:8002
+
+    python scripts/load_test.py --concurrency 500 --duration 30 \\
+        sync=http://127.0.0.1:8001/api/products/ \\
+        async=http://127.0.0.1:8002/api/products/
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+@dataclass
+class Result:
+    label: str
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def percentile(self, pct: float) -> float:
+        values = sorted(self.latencies_ms)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies_ms) / self.elapsed if self.elapsed else 0.0
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = None
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _client(url: str, deadline: float, result: Result, timeout: float) -> None:
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        "Accept: application/json\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(parts.hostname, port, ssl=parts.scheme == "https"), timeout,
+                )
+            writer.write(request)
+            await writer.drain()
+            status = await asyncio.wait_for(_read_response(reader), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            result.errors += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        if status >= 400:
+            result.errors += 1
+        else:
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+    if writer is not None:
+        writer.close()
+
+
+async def run(label: str, url: str, concurrency: int, duration: float, timeout: float) -> Result:
+    result = Result(label)
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_client(url, deadline, result, timeout) for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare HTTP throughput/latency of one or more URLs.")
+    parser.add_argument("targets", nargs="+", help="URL or label=URL, run one after another")
+    parser.add_argument("--concurrency", type=int, default=200, help="concurrent clients (default: 200)")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per target (default: 20)")
+    parser.add_argument("--timeout", type=float, default=10, help="per-request timeout in seconds")
+    args = parser.parse_args(argv)
+
+    results = []
+    for target in args.targets:
+        label, sep, url = target.partition("=")
+        if not sep or "://" in label:
+            label, url = target, target
+        results.append(asyncio.run(run(label, url, args.concurrency, args.duration, args.timeout)))
+
+    print(f"{'target':<24} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for r in results:
+        print(
+            f"{r.label[:24]:<24} {r.throughput:>9.1f} {r.percentile(50):>8.1f} "
+            f"{r.percentile(95):>8.1f} {r.percentile(99):>8.1f} {r.errors:>7}"
+        )
+    return 1 if any(not r.latencies_ms for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())